@@ -0,0 +1,178 @@
+import os
+import math
+import time
+import threading
+import numpy as np
+from question_store import QUESTION_STORE_PATH, store_connection
+
+# Adaptive quiz engine based on the two-parameter logistic (2PL) IRT model,
+# with Elo-style incremental updates of learner ability and item difficulty.
+# Item parameters live in NumPy arrays covering the whole bank so the next
+# question can be chosen with a single vectorized information computation.
+DIFFICULTY_PRIORS = {'easy': -1.0, 'medium': 0.0, 'hard': 1.0}
+ABILITY_K = 0.6
+MIN_ABILITY_K = 0.15
+ITEM_K = 0.05
+ITEM_BANK_REFRESH_SECONDS = int(os.getenv("ITEM_BANK_REFRESH_SECONDS", "300"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS item_params (
+    question_id INTEGER PRIMARY KEY REFERENCES questions(id),
+    discrimination REAL NOT NULL,
+    difficulty REAL NOT NULL,
+    responses INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS learner_ability (
+    learner_id TEXT PRIMARY KEY,
+    theta REAL NOT NULL,
+    responses INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_banks = {}
+_banks_lock = threading.Lock()
+
+def load_item_bank(language="en", path=QUESTION_STORE_PATH):
+    """
+    Load item parameters for every question in a language into NumPy arrays.
+
+    Questions without fitted parameters start with discrimination 1.0 and a
+    difficulty taken from their difficulty label.
+
+    Returns:
+        dict: ids, discrimination (a), a squared, difficulty (b) and an id -> position index
+    """
+    with store_connection(path) as connection:
+        connection.executescript(SCHEMA)
+        rows = connection.execute(
+            """
+            SELECT q.id, q.difficulty, p.discrimination, p.difficulty
+            FROM questions q LEFT JOIN item_params p ON p.question_id = q.id
+            WHERE q.language = ?
+            ORDER BY q.id
+            """,
+            (language,)
+        ).fetchall()
+
+    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    a = np.fromiter((row[2] if row[2] is not None else 1.0 for row in rows), dtype=np.float64, count=len(rows))
+    b = np.fromiter(
+        (row[3] if row[3] is not None else DIFFICULTY_PRIORS.get(row[1], 0.0) for row in rows),
+        dtype=np.float64, count=len(rows)
+    )
+    return {
+        'ids': ids,
+        'a': a,
+        'a2': a * a,
+        'b': b,
+        'index': {int(question_id): position for position, question_id in enumerate(ids)},
+        'loaded_at': time.monotonic()
+    }
+
+def get_item_bank(language="en", path=QUESTION_STORE_PATH):
+    """Return the process-wide item bank, reloading it periodically to pick up new questions."""
+    key = (language, path)
+    with _banks_lock:
+        bank = _banks.get(key)
+        if bank is None or time.monotonic() - bank['loaded_at'] > ITEM_BANK_REFRESH_SECONDS:
+            bank = _banks[key] = load_item_bank(language, path)
+        return bank
+
+def probability_correct(theta, a, b):
+    """2PL probability that a learner of ability theta answers an item correctly."""
+    return 1.0 / (1.0 + math.exp(-a * (theta - b)))
+
+def select_next_question(bank, theta, exclude_ids=()):
+    """
+    Pick the unanswered question with maximum Fisher information at ability theta.
+
+    Information for a 2PL item is a^2 * p * (1 - p), computed here as
+    a^2 * e / (1 + e)^2 with e = exp(-a * (theta - b)), in place over the whole bank.
+
+    Args:
+        bank (dict): Item bank from get_item_bank
+        theta (float): Current ability estimate
+        exclude_ids (iterable): Question ids already asked in this quiz
+
+    Returns:
+        int: Id of the selected question, or None if every question is excluded
+    """
+    if len(bank['ids']) == 0:
+        return None
+    info = bank['b'] - theta
+    info *= bank['a']
+    np.clip(info, -30.0, 30.0, out=info)
+    np.exp(info, out=info)
+    denominator = info + 1.0
+    denominator *= denominator
+    info /= denominator
+    info *= bank['a2']
+
+    excluded = [bank['index'][question_id] for question_id in exclude_ids if question_id in bank['index']]
+    if excluded:
+        info[excluded] = -np.inf
+    position = int(np.argmax(info))
+    if info[position] == -np.inf:
+        return None
+    return int(bank['ids'][position])
+
+def ability_step(responses):
+    """Elo step size for a learner, shrinking as more answers are recorded."""
+    return max(MIN_ABILITY_K, ABILITY_K / math.sqrt(1 + responses))
+
+def load_learner_ability(learner_id, path=QUESTION_STORE_PATH):
+    """Return the stored (theta, responses) for a learner, or (0.0, 0) if unknown."""
+    with store_connection(path) as connection:
+        connection.executescript(SCHEMA)
+        row = connection.execute(
+            "SELECT theta, responses FROM learner_ability WHERE learner_id = ?", (learner_id,)
+        ).fetchone()
+    return (row[0], row[1]) if row else (0.0, 0)
+
+def record_response(bank, ability, question_id, is_correct, path=QUESTION_STORE_PATH):
+    """
+    Apply an incremental ability and item difficulty update after an answer.
+
+    Args:
+        bank (dict): Item bank from get_item_bank
+        ability (dict): Learner state with learner_id (or None), theta and responses
+        question_id (int): The answered question
+        is_correct (bool): Whether the answer was correct
+
+    Returns:
+        dict: The updated learner state
+    """
+    position = bank['index'].get(question_id)
+    if position is None:
+        return ability
+
+    a = float(bank['a'][position])
+    # The bank is shared by every session; update the difficulty and persist it under the lock
+    # so concurrent answers to the same item neither lose updates nor store them out of order
+    with _banks_lock:
+        b = float(bank['b'][position])
+        residual = float(is_correct) - probability_correct(ability['theta'], a, b)
+        new_b = b - ITEM_K * residual
+        bank['b'][position] = new_b
+        with store_connection(path) as connection, connection:
+            connection.execute(
+                """
+                INSERT INTO item_params (question_id, discrimination, difficulty, responses) VALUES (?, ?, ?, 1)
+                ON CONFLICT(question_id) DO UPDATE SET difficulty = excluded.difficulty, responses = responses + 1
+                """,
+                (question_id, a, new_b)
+            )
+
+    theta = ability['theta'] + ability_step(ability['responses']) * a * residual
+    updated = dict(ability, theta=theta, responses=ability['responses'] + 1)
+
+    if updated.get('learner_id'):
+        with store_connection(path) as connection, connection:
+            connection.execute(
+                """
+                INSERT INTO learner_ability (learner_id, theta, responses) VALUES (?, ?, ?)
+                ON CONFLICT(learner_id) DO UPDATE SET theta = excluded.theta, responses = excluded.responses
+                """,
+                (updated['learner_id'], theta, updated['responses'])
+            )
+    return updated
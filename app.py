@@ -1,3 +1,6 @@
+import time
+# Streamlit re-executes this script on every rerun; the profiler reports how long its imports took
+IMPORTS_STARTED = time.perf_counter()
 import streamlit as st
 from utils import create_sidebar_navigation
 from sections.PatientManagement import patient_management_page
@@ -5,6 +8,10 @@ from sections.MealPlanner import meal_planner_page
 from sections.EmotionalSupport import emotional_support_page
 from sections.Quiz import cancer_quiz_page
 from sections.ImageAnalysis import image_analysis_page
+from image_backends import warm_up_image_backend
+from follow_up_records import new_follow_up_buffer
+from profiler import profile_rerun, render_profiler_panel
+IMPORT_SECONDS = time.perf_counter() - IMPORTS_STARTED
 
 def home_page():
     # Create consistent navigation
@@ -87,29 +94,36 @@ def main():
         layout="wide"
     )
 
+    # Prepare the image model in the background so the first prediction doesn't pay for it
+    warm_up_image_backend()
+
     # Initialize session state variables
     if 'current_page' not in st.session_state:
         st.session_state.current_page = 'home'
     if 'follow_up_data' not in st.session_state:
-        st.session_state.follow_up_data = []
+        st.session_state.follow_up_data = new_follow_up_buffer()
     if 'reminders' not in st.session_state:
         st.session_state.reminders = []
     if 'patient_data' not in st.session_state:
         st.session_state.patient_data = {}
 
     # Route to the correct page based on navigation state
-    if st.session_state.current_page == 'home':
-        home_page()
-    elif st.session_state.current_page == 'patient_management':
-        patient_management_page()
-    elif st.session_state.current_page == 'meal_planner':
-        meal_planner_page()
-    elif st.session_state.current_page == 'emotional_support':
-        emotional_support_page()
-    elif st.session_state.current_page == 'quiz':
-        cancer_quiz_page()
-    elif st.session_state.current_page == 'image_analysis':
-        image_analysis_page()
+    with profile_rerun(f"page.{st.session_state.current_page}", IMPORT_SECONDS):
+        if st.session_state.current_page == 'home':
+            home_page()
+        elif st.session_state.current_page == 'patient_management':
+            patient_management_page()
+        elif st.session_state.current_page == 'meal_planner':
+            meal_planner_page()
+        elif st.session_state.current_page == 'emotional_support':
+            emotional_support_page()
+        elif st.session_state.current_page == 'quiz':
+            cancer_quiz_page()
+        elif st.session_state.current_page == 'image_analysis':
+            image_analysis_page()
+
+    # Opt-in timing panel (see profiler.py)
+    render_profiler_panel()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,547 @@
+"""
+Concurrent-session load test for the Streamlit app.
+
+Starts one real app server (streamlit run app.py, headless) and drives N
+browser-like sessions against it over Streamlit's websocket protocol, so
+the sessions share the server's script threads, caches, stores and thread
+pools as real users do. External services are replaced by local
+stand-ins: Groq by scripts/mock_groq_server.py (reached through the real
+Groq SDK via GROQ_BASE_URL) and image predictions by the mock backend.
+
+Each session is a thread of this process holding its own websocket. It
+sends widget states the way the frontend does (button triggers, text and
+option values, chat messages, file uploads through the upload endpoint),
+reruns only the fragment a clicked widget belongs to, and follows
+fragment auto-reruns while they are scheduled. Sessions repeat realistic
+flows (home, a quiz run, follow-up entry, meal planning, a support chat
+ending in a crisis message, single and batch image analysis) and every
+rerun is timed from the request to the server's script-finished message.
+One session first runs every flow unmeasured to warm the server up; all
+sessions of a level then start together behind a barrier.
+
+For each concurrency level the report gives rerun p50/p99 latency,
+throughput, server memory growth per session and errors. The saturation
+point is the first level whose throughput grows by less than
+--min-speedup over the previous level or whose p99 exceeds --p99-limit.
+The session threads only encode and decode messages, but they share the
+machine's CPUs with the server.
+
+Usage (from the repository root):
+    python -m benchmarks.load_test [--sessions 1,2,4,8] [--flows 6] [--groq-latency 0.5]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import traceback
+import urllib.request
+from io import BytesIO
+import numpy as np
+import requests
+from PIL import Image
+from websockets.sync.client import connect
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+REPOSITORY_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPOSITORY_PATH, "app.py")
+RERUN_TIMEOUT_SECONDS = 120
+SERVER_START_TIMEOUT_SECONDS = 60
+# Bounds the polling of a fragment that keeps rescheduling itself
+MAX_AUTO_RERUNS = 200
+MAX_QUIZ_QUESTIONS = 50
+BATCH_IMAGES = 4
+MEAL_PLAN_ALLERGIES = [[], ["Gluten"], ["Dairy"], ["Nuts"], ["Gluten", "Dairy"]]
+SUPPORT_MESSAGES = [
+    "I start chemotherapy next week and I'm scared of the side effects.",
+    "My family keeps telling me to stay positive, but some days I just can't.",
+    "I don't want to live like this anymore."
+]
+# Widget kinds whose value is sent as the selected or typed string
+STRING_WIDGETS = ('text_input', 'text_area', 'radio', 'selectbox')
+FINISHED = (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+            ForwardMsg.FINISHED_WITH_COMPILE_ERROR)
+
+def process_rss_bytes(pid):
+    """Return the resident memory of a process in bytes, or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+def free_port():
+    """Return a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def synthetic_image(seed):
+    """Return a small PNG of random noise, distinct per seed so predictions aren't cache hits."""
+    pixels = np.random.default_rng(seed).integers(0, 256, size=(128, 128, 3), dtype=np.uint8)
+    buffer = BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def new_session(base_url, websocket):
+    """Return the client-side state of a session connected over the websocket."""
+    return {
+        'base_url': base_url,
+        'websocket': websocket,
+        'session_id': None,
+        # Current page elements by delta path, with the fragment each was rendered in
+        'elements': {},
+        # Values the user has set, resent with every rerun as the frontend does
+        'values': {},
+        'auto_reruns': {},
+        'file_urls': {},
+        'exceptions': [],
+        'latencies': []
+    }
+
+def handle_message(session, message):
+    """
+    Apply one server message to the session's view of the page.
+
+    Returns:
+        int: The script-finished status, or None for any other message
+    """
+    kind = message.WhichOneof('type')
+    if kind == 'new_session':
+        session['session_id'] = message.new_session.initialize.session_id or session['session_id']
+        if not message.new_session.fragment_ids_this_run:
+            # A full run replaces the page and reschedules its fragments
+            session['elements'] = {}
+            session['auto_reruns'] = {}
+    elif kind == 'delta':
+        path = tuple(message.metadata.delta_path)
+        # Anything rendered at or below a replaced element or block is gone
+        for stale in [key for key in session['elements'] if key[:len(path)] == path]:
+            del session['elements'][stale]
+        if message.delta.WhichOneof('type') == 'new_element':
+            element = message.delta.new_element
+            element_kind = element.WhichOneof('type')
+            if element_kind == 'exception':
+                session['exceptions'].append(element.exception.message)
+            session['elements'][path] = (element_kind, getattr(element, element_kind), message.delta.fragment_id)
+    elif kind == 'auto_rerun':
+        session['auto_reruns'][message.auto_rerun.fragment_id] = message.auto_rerun.interval
+    elif kind == 'stop_auto_rerun':
+        for fragment_id in message.stop_auto_rerun.fragment_ids:
+            session['auto_reruns'].pop(fragment_id, None)
+    elif kind == 'file_urls_response':
+        session['file_urls'][message.file_urls_response.response_id] = list(message.file_urls_response.file_urls)
+    elif kind == 'script_finished':
+        return message.script_finished
+    return None
+
+def receive(session):
+    """Read and apply the next server message."""
+    message = ForwardMsg()
+    message.ParseFromString(session['websocket'].recv(timeout=RERUN_TIMEOUT_SECONDS))
+    return handle_message(session, message)
+
+def run_script(session, triggers=(), fragment_id="", is_auto_rerun=False):
+    """
+    Ask the server for a rerun, as the frontend does after an interaction, and wait for it to finish.
+
+    Args:
+        session (dict): The session to rerun
+        triggers (iterable): One-off widget states (button clicks, chat messages) for this rerun
+        fragment_id (str): Rerun only this fragment
+        is_auto_rerun (bool): Whether this is a scheduled fragment rerun
+    """
+    mounted = {widget.id for _, widget, _ in session['elements'].values() if getattr(widget, 'id', None)}
+    request = BackMsg()
+    request.rerun_script.query_string = ""
+    request.rerun_script.fragment_id = fragment_id
+    request.rerun_script.is_auto_rerun = is_auto_rerun
+    request.rerun_script.widget_states.widgets.extend(
+        [state for widget_id, state in session['values'].items() if widget_id in mounted] + list(triggers)
+    )
+    session['exceptions'] = []
+    start = time.perf_counter()
+    session['websocket'].send(request.SerializeToString())
+    # A script calling st.rerun finishes early and is followed by the new run
+    while receive(session) not in FINISHED:
+        pass
+    session['latencies'].append(time.perf_counter() - start)
+    if session['exceptions']:
+        raise RuntimeError(session['exceptions'][0])
+
+def find(session, kind, label=None):
+    """
+    Return the widget of the given kind (and label) on the current page.
+
+    Returns:
+        tuple: The widget's proto and the id of the fragment it belongs to
+    """
+    for element_kind, widget, fragment_id in session['elements'].values():
+        if element_kind == kind and (label is None or widget.label == label):
+            return widget, fragment_id
+    raise LookupError(f"No {kind} labelled {label!r}")
+
+def has(session, kind, label=None):
+    """Return whether the current page shows the given widget."""
+    try:
+        find(session, kind, label)
+        return True
+    except LookupError:
+        return False
+
+def click(session, label):
+    """Click a button, rerunning only its fragment if it is in one."""
+    widget, fragment_id = find(session, 'button', label)
+    run_script(session, [WidgetState(id=widget.id, trigger_value=True)], fragment_id=fragment_id)
+
+def set_value(session, kind, label, value):
+    """Set a widget's value; like the frontend, it is sent with the next rerun."""
+    widget, _ = find(session, kind, label)
+    state = WidgetState(id=widget.id)
+    if kind in STRING_WIDGETS:
+        state.string_value = value
+    elif kind == 'multiselect':
+        state.string_array_value.data.extend(value)
+    elif kind == 'checkbox':
+        state.bool_value = value
+    else:
+        raise ValueError(f"Setting {kind} widgets is not supported")
+    session['values'][widget.id] = state
+
+def change(session, kind, label, value):
+    """Set a widget's value and rerun, as an interaction outside a form does."""
+    set_value(session, kind, label, value)
+    run_script(session, fragment_id=find(session, kind, label)[1])
+
+def send_chat(session, text):
+    """Submit a message through the page's chat input."""
+    widget, fragment_id = find(session, 'chat_input')
+    state = WidgetState(id=widget.id)
+    state.chat_input_value.data = text
+    run_script(session, [state], fragment_id=fragment_id)
+
+def upload_files(session, label, files):
+    """
+    Upload files to a file uploader the way the frontend does, then rerun.
+
+    The server hands out upload URLs over the websocket, the files are PUT
+    to them, and the uploader's widget state then lists the uploaded files.
+    """
+    widget, fragment_id = find(session, 'file_uploader', label)
+    request_id = f"upload-{time.time_ns()}"
+    request = BackMsg()
+    request.file_urls_request.request_id = request_id
+    request.file_urls_request.session_id = session['session_id']
+    request.file_urls_request.file_names.extend(name for name, _ in files)
+    session['websocket'].send(request.SerializeToString())
+    while request_id not in session['file_urls']:
+        receive(session)
+
+    state = WidgetState(id=widget.id)
+    for (name, data), file_urls in zip(files, session['file_urls'].pop(request_id)):
+        response = requests.put(session['base_url'] + file_urls.upload_url, files={'file': (name, data)},
+                                timeout=RERUN_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        uploaded = state.file_uploader_state_value.uploaded_file_info.add()
+        uploaded.name, uploaded.size, uploaded.file_id = name, len(data), file_urls.file_id
+        uploaded.file_urls.CopyFrom(file_urls)
+    session['values'][widget.id] = state
+    run_script(session, fragment_id=fragment_id)
+
+def follow_auto_reruns(session):
+    """Run scheduled fragment reruns, as the frontend's timers would, until none is scheduled."""
+    for _ in range(MAX_AUTO_RERUNS):
+        if not session['auto_reruns']:
+            return
+        fragment_id, interval = next(iter(session['auto_reruns'].items()))
+        time.sleep(interval)
+        run_script(session, fragment_id=fragment_id, is_auto_rerun=True)
+    raise RuntimeError(f"A fragment was still polling after {MAX_AUTO_RERUNS} reruns")
+
+def navigate(session, title):
+    """Open a page with its sidebar button."""
+    click(session, title)
+    # The sidebar sets the page after the current one has rendered, so it shows from the next rerun
+    run_script(session)
+
+def home_flow(session, session_index, iteration):
+    """Open the home page and reload it."""
+    navigate(session, "🏥 Home")
+    run_script(session)
+
+def quiz_flow(session, session_index, iteration):
+    """Take a full quiz with the default answers, then return to the start screen."""
+    navigate(session, "📚 Learn & Quiz")
+    click(session, "Start Quiz")
+    for _ in range(MAX_QUIZ_QUESTIONS):
+        if has(session, 'button', "Take Another Quiz"):
+            break
+        click(session, "Submit Answer")
+        run_script(session)
+        click(session, "Next Question")
+    click(session, "Take Another Quiz")
+
+def follow_up_flow(session, session_index, iteration):
+    """Record three follow-ups and set a reminder on the monitoring tab."""
+    navigate(session, "📋 Patient Records")
+    for visit in range(3):
+        set_value(session, 'text_input', "Blood Pressure (e.g., 120/80)", f"{118 + visit}/{78 + session_index % 5}")
+        click(session, "Record Follow-up")
+    set_value(session, 'text_input', "Reminder Note", f"Blood test for session {session_index}")
+    click(session, "Set Reminder")
+
+def meal_plan_flow(session, session_index, iteration):
+    """Generate a recipe-database plan with AI notes, then a fully AI-generated plan."""
+    navigate(session, "🍽️ Nutrition Guide")
+    for mode in ["Recipe database with AI notes", "AI-generated"]:
+        set_value(session, 'radio', "Planning Mode", mode)
+        set_value(session, 'multiselect', "Dietary Restrictions & Allergies",
+                  MEAL_PLAN_ALLERGIES[session_index % len(MEAL_PLAN_ALLERGIES)])
+        click(session, "Generate Meal Plan")
+
+def emotional_support_flow(session, session_index, iteration):
+    """Hold a support conversation ending in a crisis message, then send a one-off message."""
+    navigate(session, "💝 Support Chat")
+    change(session, 'checkbox', "Conversation mode", True)
+    for message in SUPPORT_MESSAGES:
+        send_chat(session, message)
+    click(session, "Start a new conversation")
+    change(session, 'checkbox', "Conversation mode", False)
+    set_value(session, 'text_area', "Share what's on your mind...", SUPPORT_MESSAGES[session_index % 2])
+    click(session, "Get Support")
+
+def image_analysis_flow(session, session_index, iteration):
+    """Analyze one image as a background job, following its polling fragment, then a batch."""
+    navigate(session, "🔬 Image Analysis")
+    change(session, 'radio', "Mode", "Single image")
+    seed = (session_index * 1000 + iteration) * 100
+    upload_files(session, "Choose an image file", [(f"scan-{seed}.png", synthetic_image(seed))])
+    click(session, "Get Prediction")
+    follow_auto_reruns(session)
+    click(session, "Clear Results")
+
+    change(session, 'radio', "Mode", "Batch")
+    upload_files(session, "Choose image files",
+                 [(f"batch-{seed + index}.png", synthetic_image(seed + index)) for index in range(1, BATCH_IMAGES + 1)])
+    click(session, f"Analyze {BATCH_IMAGES} Images")
+    change(session, 'radio', "Mode", "Single image")
+
+FLOWS = {
+    'home': home_flow,
+    'quiz': quiz_flow,
+    'follow_up': follow_up_flow,
+    'meal_plan': meal_plan_flow,
+    'emotional_support': emotional_support_flow,
+    'image_analysis': image_analysis_flow
+}
+
+def run_session(base_url, session_index, flows, started, finished, reports):
+    """Session thread: open a session, wait for the others, run its flows, then wait for the memory sample."""
+    report = {'session': session_index, 'latencies': [], 'flows': 0, 'errors': []}
+    try:
+        start = time.perf_counter()
+        with connect(base_url.replace("http", "ws", 1) + "/_stcore/stream",
+                     subprotocols=["streamlit"], max_size=None) as websocket:
+            session = new_session(base_url, websocket)
+            run_script(session)
+            report['cold_start_s'] = time.perf_counter() - start
+            session['latencies'].clear()
+            started.wait()
+
+            names = list(FLOWS)
+            flows_started = time.perf_counter()
+            for iteration in range(flows):
+                name = names[(session_index + iteration) % len(names)]
+                try:
+                    FLOWS[name](session, session_index, iteration)
+                    report['flows'] += 1
+                except Exception as error:
+                    report['errors'].append(f"{name}: {error}")
+            report['elapsed_s'] = time.perf_counter() - flows_started
+            report['latencies'] = session['latencies']
+            # The server's memory is sampled once every session is done but still connected
+            finished.wait()
+    except Exception:
+        report['errors'].append(traceback.format_exc(limit=3))
+        started.abort()
+        finished.abort()
+    reports.append(report)
+
+def run_level(base_url, server_pid, sessions, flows):
+    """Run the given number of concurrent sessions against the server and summarize their reruns."""
+    rss = [process_rss_bytes(server_pid)]
+    started = threading.Barrier(sessions)
+    finished = threading.Barrier(sessions, action=lambda: rss.append(process_rss_bytes(server_pid)))
+    reports = []
+    threads = [threading.Thread(target=run_session, args=(base_url, index, flows, started, finished, reports))
+               for index in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies = np.array([latency for report in reports for latency in report['latencies']])
+    elapsed = max(report.get('elapsed_s', 0) for report in reports)
+    cold_starts = [report['cold_start_s'] for report in reports if 'cold_start_s' in report]
+    measured = len(rss) == 2 and None not in rss
+    return {
+        'sessions': sessions,
+        'reruns': len(latencies),
+        'flows': sum(report['flows'] for report in reports),
+        'throughput_rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_s': float(np.percentile(latencies, 50)) if len(latencies) else None,
+        'p99_s': float(np.percentile(latencies, 99)) if len(latencies) else None,
+        'max_s': float(latencies.max()) if len(latencies) else None,
+        'cold_start_s': float(np.median(cold_starts)) if cold_starts else None,
+        'memory_per_session_mb': (rss[1] - rss[0]) / sessions / 2 ** 20 if measured else None,
+        'errors': [error for report in reports for error in report['errors']]
+    }
+
+def find_saturation(levels, min_speedup, p99_limit):
+    """
+    Return the first level at which the app is saturated.
+
+    Returns:
+        dict: The saturated level, or None if no level reached saturation
+    """
+    for previous, level in zip([None] + levels, levels):
+        if level['p99_s'] is None or level['p99_s'] > p99_limit:
+            return level
+        if previous and level['throughput_rps'] < previous['throughput_rps'] * min_speedup:
+            return level
+    return None
+
+def accepts_connections(port):
+    """Return whether a local server listens on the port."""
+    try:
+        socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+        return True
+    except OSError:
+        return False
+
+def is_healthy(port):
+    """Return whether the app server on the port reports healthy."""
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+def wait_until_ready(server, ready, name):
+    """Wait until a started server process is ready, by the given check."""
+    deadline = time.time() + SERVER_START_TIMEOUT_SECONDS
+    while time.time() < deadline and server.poll() is None:
+        if ready():
+            return server
+        time.sleep(0.1)
+    server.kill()
+    raise RuntimeError(f"The {name} did not start")
+
+def start_mock_groq(port, latency):
+    """Start the mock Groq server and wait until it accepts connections."""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "scripts.mock_groq_server", "--port", str(port), "--latency", str(latency)],
+        cwd=REPOSITORY_PATH, stdout=subprocess.DEVNULL
+    )
+    return wait_until_ready(server, lambda: accepts_connections(port), "mock Groq server")
+
+def start_app_server(port):
+    """Start the app with streamlit run and wait until it reports healthy."""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP_PATH, "--server.headless", "true",
+         "--server.address", "127.0.0.1", "--server.port", str(port), "--server.fileWatcherType", "none",
+         "--browser.gatherUsageStats", "false", "--logger.level", "error",
+         # The sessions upload files without the browser's XSRF cookie
+         "--server.enableXsrfProtection", "false"],
+        cwd=REPOSITORY_PATH, stdout=subprocess.DEVNULL
+    )
+    return wait_until_ready(server, lambda: is_healthy(port), "app server")
+
+def stop_server(server):
+    """Terminate a server process, killing it if it does not exit."""
+    server.terminate()
+    try:
+        server.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test one app server with concurrent sessions.")
+    parser.add_argument("--sessions", default="1,2,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--flows", type=int, default=len(FLOWS), help="Flows run by each session")
+    parser.add_argument("--groq-latency", type=float, default=0.5, help="Mock Groq latency per request in seconds")
+    parser.add_argument("--image-latency", type=float, default=0.05, help="Mock image model latency in seconds")
+    parser.add_argument("--p99-limit", type=float, default=2.0, help="Rerun p99 in seconds that counts as saturated")
+    parser.add_argument("--min-speedup", type=float, default=1.1,
+                        help="Throughput growth per level below which the app counts as saturated")
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    args = parser.parse_args()
+
+    # Keep the stores the flows write to out of the repository's data directory
+    data_dir = tempfile.mkdtemp(prefix="cancerapp-load-")
+    groq_port, app_port = free_port(), free_port()
+    os.environ.update({
+        'GROQ_API_KEY': "mock",
+        'GROQ_BASE_URL': f"http://127.0.0.1:{groq_port}",
+        'IMAGE_BACKEND': "mock",
+        'MOCK_LATENCY_SECONDS': str(args.image_latency),
+        'QUESTION_STORE_PATH': os.path.join(data_dir, "questions.db"),
+        'QUIZ_EVENT_LOG_PATH': os.path.join(data_dir, "quiz_events.jsonl"),
+        'QUIZ_AGGREGATES_PATH': os.path.join(data_dir, "quiz_aggregates.json"),
+        'MEAL_PLAN_STORE_PATH': os.path.join(data_dir, "meal_plans.db"),
+        'PREDICTION_CACHE_PATH': os.path.join(data_dir, "predictions.db")
+    })
+
+    groq_server = start_mock_groq(groq_port, args.groq_latency)
+    app_server = None
+    levels = []
+    try:
+        app_server = start_app_server(app_port)
+        base_url = f"http://127.0.0.1:{app_port}"
+        # One unmeasured pass through every flow, so the first level doesn't pay for lazy imports and cold caches
+        warm_up = run_level(base_url, app_server.pid, 1, len(FLOWS))
+        for error in warm_up['errors'][:3]:
+            print(f"Warm-up: {error.strip().splitlines()[-1]}")
+        print(f"{'sessions':>8} {'reruns':>7} {'rerun/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+              f"{'MB/session':>10} {'errors':>6}")
+        for sessions in [int(count) for count in args.sessions.split(",") if count]:
+            level = run_level(base_url, app_server.pid, sessions, args.flows)
+            levels.append(level)
+            p50, p99, peak = (f"{level[key] * 1000:8.0f}" if level[key] is not None else f"{'-':>8}"
+                              for key in ('p50_s', 'p99_s', 'max_s'))
+            memory = level['memory_per_session_mb']
+            print(f"{sessions:8d} {level['reruns']:7d} {level['throughput_rps']:8.2f} {p50} {p99} {peak} "
+                  f"{memory if memory is not None else float('nan'):10.1f} {len(level['errors']):6d}")
+            for error in level['errors'][:3]:
+                print(f"    {error.strip().splitlines()[-1]}")
+    finally:
+        if app_server is not None:
+            stop_server(app_server)
+        stop_server(groq_server)
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    saturated = find_saturation(levels, args.min_speedup, args.p99_limit)
+    if saturated is None:
+        print("\nNo saturation reached; try more sessions")
+    else:
+        print(f"\nSaturated at {saturated['sessions']} concurrent sessions "
+              f"(p99 {saturated['p99_s'] * 1000:.0f} ms, {saturated['throughput_rps']:.2f} reruns/s)"
+              if saturated['p99_s'] is not None else f"\nNo successful reruns at {saturated['sessions']} sessions")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump({'settings': vars(args), 'levels': levels,
+                       'saturated_at': saturated['sessions'] if saturated else None}, output_file, indent=2)
+        print(f"Wrote {args.output}")
+    return 1 if any(level['errors'] for level in levels) else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
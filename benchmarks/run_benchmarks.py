@@ -0,0 +1,203 @@
+"""
+Benchmark suite for the data-path functions.
+
+Times the monitoring chart builders on synthetic follow-up buffers of 10, 1k,
+100k and 1M records, parse_blood_pressure, get_random_questions on question
+stores of growing size, and the LLM prompt builders. Results are written as
+JSON and compared against a baseline file; any benchmark whose median is
+more than --tolerance slower than its baseline fails the run.
+
+Usage (from the repository root):
+    python -m benchmarks.run_benchmarks [--sizes 10,1000] [--tolerance 0.5]
+    python -m benchmarks.run_benchmarks --update-baseline
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+from datetime import datetime
+
+# The question store benchmark fills a throwaway store, so point the app's store there before importing it
+BENCHMARK_DIR = tempfile.mkdtemp(prefix="cancerapp-bench-")
+os.environ["QUESTION_STORE_PATH"] = os.path.join(BENCHMARK_DIR, "questions.db")
+
+import numpy as np
+from question_store import QUESTION_STORE_PATH, add_questions, count_questions
+from follow_up_records import parse_blood_pressure
+from chat_memory import new_conversation, add_turn, build_summary_prompt, build_chat_messages
+from recipes import build_weekly_plan
+from sections.PatientManagement import (
+    create_symptom_tracker_chart, create_vitals_tracker_charts, create_health_metrics_chart,
+    build_treatment_plan_prompt
+)
+from sections.MealPlanner import build_day_prompt, build_plan_notes_prompt
+from sections.Quiz import get_random_questions, build_insight_prompt
+from sections.EmotionalSupport import SUPPORT_SYSTEM_PROMPT
+from scripts.generate_questions import build_generation_prompt
+from benchmarks.synthetic import synthetic_follow_up_buffer, synthetic_blood_pressures, synthetic_questions
+
+BENCHMARKS_PATH = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE_PATH = os.path.join(BENCHMARKS_PATH, "baseline.json")
+DEFAULT_OUTPUT_PATH = os.path.join(BENCHMARKS_PATH, "results.json")
+DEFAULT_SIZES = "10,1000,100000,1000000"
+DEFAULT_QUESTION_STORE_SIZES = "10,1000,100000"
+MIN_SECONDS = 0.2
+MAX_REPEATS = 2000
+MIN_REPEATS = 3
+# Differences below this are timer noise, whatever the ratio
+NOISE_FLOOR_SECONDS = 50e-6
+
+PATIENT = {
+    'age': 58, 'gender': 'Female', 'cancer_type': 'Breast', 'stage': 'Stage II',
+    'current_treatment': ['Chemotherapy', 'Radiation'], 'symptoms': ['Fatigue', 'Nausea'],
+    'medical_history': {
+        'comorbidities': ['Hypertension'], 'allergies': 'Penicillin', 'smoking_status': 'Former Smoker',
+        'current_medications': 'Lisinopril 10mg', 'family_history': 'Mother, breast cancer at 62',
+        'additional_notes': 'Concerned about hair loss'
+    }
+}
+PREFERENCES = {
+    'allergies': ['Nuts'], 'diet_type': ['Vegetarian'], 'budget': 'Medium', 'taste_preferences': ['All'],
+    'batch_cooking': True, 'easy_prep': True, 'leftovers': False
+}
+
+def measure(fn, *args):
+    """
+    Time repeated calls of fn(*args).
+
+    Returns:
+        dict: median_s, min_s and repeats
+    """
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < MIN_REPEATS or (time.perf_counter() - started < MIN_SECONDS and len(timings) < MAX_REPEATS):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return {'median_s': float(np.median(timings)), 'min_s': float(min(timings)), 'repeats': len(timings)}
+
+def parse_many(values):
+    """Parse a batch of blood pressure strings."""
+    for value in values:
+        parse_blood_pressure(value)
+
+def conversation_with_turns(turns):
+    """Return a chat conversation holding the given number of turns."""
+    conversation = new_conversation()
+    for index in range(turns):
+        add_turn(conversation, f"Message {index}: I'm worried about my next scan. " * 3,
+                 f"Reply {index}: It's understandable to feel that way. " * 8)
+    return conversation
+
+def run_benchmarks(sizes, question_store_sizes):
+    """Run every benchmark and return results keyed by benchmark name."""
+    results = {}
+
+    def record(name, fn, *args):
+        results[name] = measure(fn, *args)
+        print(f"  {name:<48} {results[name]['median_s'] * 1000:10.3f} ms  ({results[name]['repeats']} runs)")
+
+    for size in sizes:
+        buffer = synthetic_follow_up_buffer(size)
+        record(f"charts.symptom_tracker[n={size}]", create_symptom_tracker_chart, buffer)
+        record(f"charts.vitals_tracker[n={size}]", create_vitals_tracker_charts, buffer)
+        record(f"charts.health_metrics[n={size}]", create_health_metrics_chart, buffer)
+
+    blood_pressures = synthetic_blood_pressures(10000)
+    record("parse_blood_pressure[x10000]", parse_many, blood_pressures)
+
+    for size in question_store_sizes:
+        # Grow the store to the next size, then sample from it
+        missing = size - count_questions(QUESTION_STORE_PATH)
+        if missing > 0:
+            add_questions(synthetic_questions(missing, start=count_questions(QUESTION_STORE_PATH)))
+        record(f"get_random_questions[store={count_questions(QUESTION_STORE_PATH)}]", get_random_questions)
+
+    plan = build_weekly_plan(PREFERENCES)
+    conversation = conversation_with_turns(10)
+    record("prompt.treatment_plan", build_treatment_plan_prompt, PATIENT)
+    record("prompt.meal_plan_day", build_day_prompt, PREFERENCES, 3)
+    record("prompt.meal_plan_notes", build_plan_notes_prompt, PREFERENCES, plan)
+    record("prompt.quiz_insight", build_insight_prompt, "early detection of breast cancer")
+    record("prompt.question_generation", build_generation_prompt, "screening", 10, "medium")
+    record("prompt.chat_summary", build_summary_prompt, "Earlier summary.", conversation['turns'][:4])
+    record("prompt.chat_messages[turns=10]", build_chat_messages, conversation, SUPPORT_SYSTEM_PROMPT,
+           "I couldn't sleep again last night.")
+    return results
+
+def compare_with_baseline(results, baseline, tolerance):
+    """
+    Print each benchmark against its baseline.
+
+    Returns:
+        list: Names of benchmarks that regressed beyond the tolerance
+    """
+    regressions = []
+    print(f"\n{'benchmark':<48} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<48} {'-':>12} {result['median_s'] * 1000:12.3f} {'new':>7}")
+            continue
+        before, after = baseline[name]['median_s'], result['median_s']
+        ratio = after / before if before else float('inf')
+        regressed = ratio > 1 + tolerance and after - before > NOISE_FLOOR_SECONDS
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<48} {before * 1000:12.3f} {after * 1000:12.3f} {ratio:6.2f}x{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the data-path benchmark suite.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated follow-up record counts")
+    parser.add_argument("--question-store-sizes", default=DEFAULT_QUESTION_STORE_SIZES,
+                        help="Comma-separated question store sizes")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH, help="Baseline results to compare against")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_PATH, help="Where to write the results")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Allowed slowdown relative to the baseline (0.5 = 50%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    question_store_sizes = [int(size) for size in args.question_store_sizes.split(",") if size]
+    try:
+        results = run_benchmarks(sizes, question_store_sizes)
+    finally:
+        shutil.rmtree(BENCHMARK_DIR, ignore_errors=True)
+
+    report = {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__
+        },
+        'results': results
+    }
+    output_path = args.baseline if args.update_baseline else args.output
+    with open(output_path, 'w', encoding='utf-8') as output_file:
+        json.dump(report, output_file, indent=2, sort_keys=True)
+    print(f"\nWrote {output_path}")
+    if args.update_baseline:
+        return 0
+
+    try:
+        with open(args.baseline, 'r', encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)['results']
+    except FileNotFoundError:
+        print("No baseline to compare against; create one with --update-baseline")
+        return 0
+
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} benchmarks regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
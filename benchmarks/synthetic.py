@@ -0,0 +1,62 @@
+"""
+Synthetic data generators for the benchmark suite.
+
+Generators are seeded and vectorized, so a million follow-up records can be
+built in well under a second.
+"""
+from datetime import date
+import numpy as np
+from follow_up_records import SYMPTOMS, METRIC_LEVELS, new_follow_up_buffer
+from question_store import DIFFICULTY_LEVELS
+
+TOPICS = ["screening", "nutrition", "risk factors", "treatment", "symptoms", "prevention"]
+
+def synthetic_follow_up_buffer(records, seed=0):
+    """
+    Build a columnar follow-up buffer with one record per day.
+
+    About a third of the symptoms are reported on each visit and one in
+    twenty blood pressure readings is missing.
+    """
+    rng = np.random.default_rng(seed)
+    buffer = new_follow_up_buffer(records)
+    start = date(2020, 1, 1).toordinal()
+    buffer['date'][:] = start + np.arange(records)
+    buffer['weight'][:] = rng.normal(70, 8, records).clip(30, 200)
+    buffer['temperature'][:] = rng.normal(36.9, 0.4, records).clip(35, 42)
+    missing = rng.random(records) < 0.05
+    buffer['systolic'][:] = np.where(missing, 0, rng.integers(95, 160, records))
+    buffer['diastolic'][:] = np.where(missing, 0, rng.integers(55, 100, records))
+    for metric, levels in METRIC_LEVELS.items():
+        buffer[metric][:] = rng.integers(0, len(levels), records)
+    reported = rng.random((records, len(SYMPTOMS))) < 0.33
+    buffer['symptoms'][:] = np.where(reported, rng.integers(1, 11, (records, len(SYMPTOMS))), 0)
+    buffer['notes'] = [""] * records
+    buffer['size'] = records
+    return buffer
+
+def synthetic_blood_pressures(count, seed=0):
+    """Return blood pressure strings as typed into the form, including a few invalid ones."""
+    rng = np.random.default_rng(seed)
+    values = [f"{systolic}/{diastolic}" for systolic, diastolic in
+              zip(rng.integers(80, 190, count), rng.integers(50, 120, count))]
+    for index in range(0, count, 20):
+        values[index] = "n/a"
+    return values
+
+def synthetic_questions(count, start=0, seed=0):
+    """Return distinct quiz questions in the question store format."""
+    rng = np.random.default_rng(seed + start)
+    topics = rng.integers(0, len(TOPICS), count)
+    difficulties = rng.integers(0, len(DIFFICULTY_LEVELS), count)
+    return [
+        {
+            "question": f"Synthetic question {start + index} about {TOPICS[topic]}?",
+            "options": ["Option A", "Option B", "Option C", "Option D"],
+            "correct": int(index % 4),
+            "explanation": "Synthetic explanation.",
+            "tags": [TOPICS[topic]],
+            "difficulty": DIFFICULTY_LEVELS[difficulty]
+        }
+        for index, (topic, difficulty) in enumerate(zip(topics, difficulties))
+    ]
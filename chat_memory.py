@@ -0,0 +1,142 @@
+import os
+import re
+
+# Bounded conversation memory for multi-turn chats: the last CHAT_RECENT_TURNS
+# exchanges are kept verbatim and older ones are folded into a rolling summary,
+# so the prompt stays roughly the same size however long the conversation gets.
+CHAT_RECENT_TURNS = int(os.getenv("CHAT_RECENT_TURNS", "6"))
+# Extra turns allowed to accumulate before compaction, so the summary is
+# updated once per few turns instead of on every turn
+CHAT_SUMMARY_BATCH_TURNS = 3
+CHAT_PROMPT_TOKEN_BUDGET = int(os.getenv("CHAT_PROMPT_TOKEN_BUDGET", "3000"))
+CHAT_SUMMARY_MAX_TOKENS = 400
+# Rough token estimate for English text; no tokenizer is available for the Groq models
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+# The newest message is always sent; when it alone overflows the budget, at least this much of its end is kept
+CHAT_MIN_USER_MESSAGE_TOKENS = 200
+
+def estimate_tokens(text):
+    """Estimate the number of tokens in a piece of text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def estimate_message_tokens(messages):
+    """Estimate the prompt tokens of a list of chat messages."""
+    return sum(estimate_tokens(message['content']) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+def truncate_to_tokens(text, max_tokens, keep='start'):
+    """Cut text down to roughly max_tokens, keeping its start or its end."""
+    max_chars = max(max_tokens, 0) * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars] if keep == 'start' else text[-max_chars:]
+
+def strip_reasoning(response):
+    """Remove <think> reasoning blocks from a model response."""
+    return re.sub(r'<think>.*?</think>', '', response, flags=re.DOTALL).strip()
+
+def new_conversation():
+    """Return an empty conversation state."""
+    return {'summary': '', 'turns': [], 'summarized_turns': 0, 'last_prompt_tokens': 0}
+
+def add_turn(conversation, user_message, assistant_message):
+    """Append a completed exchange to the conversation."""
+    conversation['turns'].append({'user': user_message, 'assistant': strip_reasoning(assistant_message)})
+
+def build_summary_prompt(summary, turns):
+    """Build the prompt that folds older turns into the running summary."""
+    transcript = "\n\n".join(f"User: {turn['user']}\nCompanion: {turn['assistant']}" for turn in turns)
+    return f"""
+    You maintain a running summary of a supportive conversation between a person
+    affected by cancer and their companion.
+
+    Current summary:
+    {summary or "(none yet)"}
+
+    Newer part of the conversation:
+    {transcript}
+
+    Write an updated summary in at most 150 words. Keep the person's situation,
+    feelings, concerns, names and details they shared, and the coping strategies
+    already suggested. Respond with only the summary.
+    """
+
+def compact_conversation(conversation, summarize, recent_turns=CHAT_RECENT_TURNS,
+                         batch_turns=CHAT_SUMMARY_BATCH_TURNS):
+    """
+    Fold turns older than the recent window into the rolling summary.
+
+    Compaction only runs once more than recent_turns + batch_turns turns are
+    held, and then evicts down to recent_turns with a single summarize call
+    over the previous summary and the evicted turns. If summarizing fails the
+    turns are kept and build_chat_messages drops them from the prompt instead.
+
+    Args:
+        conversation (dict): Conversation state from new_conversation
+        summarize (callable): Maps a summary prompt to summary text
+        recent_turns (int): Number of turns to keep verbatim
+        batch_turns (int): Extra turns allowed before compacting
+
+    Returns:
+        bool: Whether the summary was updated
+    """
+    turns = conversation['turns']
+    if len(turns) <= recent_turns + batch_turns:
+        return False
+
+    evicted = turns[:len(turns) - recent_turns]
+    summary = summarize(build_summary_prompt(conversation['summary'], evicted))
+    if not summary or summary.startswith("Error"):
+        return False
+
+    conversation['summary'] = truncate_to_tokens(strip_reasoning(summary), CHAT_SUMMARY_MAX_TOKENS)
+    conversation['turns'] = turns[len(evicted):]
+    conversation['summarized_turns'] += len(evicted)
+    return True
+
+def build_chat_messages(conversation, system_prompt, user_message, token_budget=CHAT_PROMPT_TOKEN_BUDGET):
+    """
+    Assemble the chat messages for the next turn within the token budget.
+
+    The system prompt and the new message are always included; if the new
+    message alone would exceed what is left, its end is kept, but never less
+    than CHAT_MIN_USER_MESSAGE_TOKENS. The summary is trimmed to the space
+    that remains, then as many of the most recent turns as fit are added.
+
+    Args:
+        conversation (dict): Conversation state from new_conversation
+        system_prompt (str): Instructions for the assistant
+        user_message (str): The new user message
+        token_budget (int): Maximum estimated prompt tokens
+
+    Returns:
+        list: Chat messages for get_chat_response
+    """
+    remaining = token_budget - estimate_tokens(system_prompt) - 2 * MESSAGE_OVERHEAD_TOKENS
+    user_message = truncate_to_tokens(user_message, max(remaining - 1, CHAT_MIN_USER_MESSAGE_TOKENS), keep='end')
+    remaining -= estimate_tokens(user_message)
+
+    system_content = system_prompt
+    summary_heading = "\n\nSummary of the earlier conversation:\n"
+    summary_budget = remaining - estimate_tokens(summary_heading) - 1
+    if conversation['summary'] and summary_budget > 0:
+        summary = truncate_to_tokens(conversation['summary'], summary_budget)
+        system_content += summary_heading + summary
+        remaining -= estimate_tokens(summary_heading) + estimate_tokens(summary)
+    head = [{'role': 'system', 'content': system_content}]
+
+    history = []
+    for turn in reversed(conversation['turns']):
+        exchange = [
+            {'role': 'user', 'content': turn['user']},
+            {'role': 'assistant', 'content': turn['assistant']}
+        ]
+        cost = estimate_message_tokens(exchange)
+        if cost > remaining:
+            break
+        history = exchange + history
+        remaining -= cost
+
+    messages = head + history + [{'role': 'user', 'content': user_message}]
+    conversation['last_prompt_tokens'] = estimate_message_tokens(messages)
+    return messages
@@ -0,0 +1,7 @@
+import os
+
+# Writable data files (stores, logs, profiles) live in the repository's data
+# directory by default, whatever the working directory; DATA_DIR moves them
+# all at once. Datasets bundled with the code (data/recipes.json,
+# data/crisis_messages.jsonl) are always read from the repository.
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
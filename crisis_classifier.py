@@ -0,0 +1,54 @@
+import re
+
+# Local lexicon classifier for crisis and self-harm language, run before any
+# LLM call so the support page can surface crisis resources immediately.
+# Patterns favour recall on explicit phrasing; the labelled set in
+# data/crisis_messages.jsonl and scripts/benchmark_crisis_classifier.py
+# track precision, recall and latency.
+CRISIS_LEXICON = {
+    'suicidal': [
+        r"suicid(?:e|al)",
+        r"(?:kill|killing|end|ending|take|taking)\s+(?:myself|my\s+(?:own\s+)?life)(?!\s+back)",
+        # "I don't want to die" is fear of dying, not intent
+        r"(?<!n't\s)(?<!not\s)(?<!dont\s)(?<!never\s)(?:want|wanna|wish|plan|planning)\s+(?:to\s+)?(?:die|be\s+dead)",
+        r"(?:don'?t|do\s+not|no\s+longer)\s+want\s+to\s+(?:live|be\s+alive|be\s+here|wake\s+up|go\s+on)",
+        r"wish\s+i\s+(?:was|were)\s+(?:dead|never\s+born)",
+        r"wish\s+i\s+(?:wouldn'?t|would\s+not|didn'?t)\s+wake\s+up",
+        r"no\s+(?:reason|point)\s+(?:to|in)\s+(?:live|living|go(?:ing)?\s+on|stay(?:ing)?\s+alive)",
+        r"(?:life|living)\s+(?:is\s+)?not\s+worth\s+(?:it|living)",
+        r"better\s+off\s+(?:dead|without\s+me)",
+        r"(?:can'?t|cannot)\s+(?:go\s+on|do\s+this\s+anymore|take\s+(?:it|this)\s+anymore)",
+        r"end\s+it\s+all",
+        r"(?:suicide|goodbye)\s+(?:note|letter)",
+    ],
+    'self_harm': [
+        r"self[-\s]?harm",
+        r"(?:hurt|hurting|harm|harming|cut|cutting|burn|burning|punish|punishing)\s+myself",
+        r"overdos(?:e|ing)\s+on",
+        r"(?:take|taking|swallow|swallowing)\s+(?:all|every\s+one)\s+(?:of\s+)?(?:my|the|these)\s+(?:pills|meds|tablets)",
+        r"(?:stockpil\w*|saving\s+up|hoarding)\s+(?:my\s+)?(?:pain\s+|sleeping\s+)?(?:pills|meds|medications?|painkillers)",
+    ],
+}
+
+CRISIS_PATTERN = re.compile(
+    "|".join(
+        rf"(?P<{category}>\b(?:{'|'.join(patterns)})\b)"
+        for category, patterns in CRISIS_LEXICON.items()
+    ),
+    re.IGNORECASE
+)
+
+def classify_message(message):
+    """
+    Check a message for crisis or self-harm language.
+
+    Args:
+        message (str): User's message
+
+    Returns:
+        dict: crisis (bool), category ("suicidal", "self_harm" or None) and the matched phrase
+    """
+    match = CRISIS_PATTERN.search(message.replace("’", "'"))
+    if match is None:
+        return {'crisis': False, 'category': None, 'matched': None}
+    return {'crisis': True, 'category': match.lastgroup, 'matched': match.group(0)}
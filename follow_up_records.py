@@ -0,0 +1,95 @@
+import sys
+from datetime import date as Date
+import numpy as np
+
+# Columnar in-memory buffers for follow-up records. Each field is a NumPy
+# array grown by doubling: ordinal metrics are int8 codes, symptom severities
+# an int8 vector over a fixed symptom index, blood pressure parsed uint8
+# values (0 when missing) and dates day ordinals. Only free-text notes stay
+# Python strings.
+SYMPTOM_GROUPS = [
+    ["Pain", "Fatigue", "Nausea", "Fever", "Infection", "Bleeding"],
+    ["Breathing Difficulties", "Sleep Issues", "Anxiety/Depression", "Loss of Appetite", "Diarrhea"],
+    ["Constipation", "Skin Changes", "Memory Issues", "Numbness/Tingling", "Other Symptoms"]
+]
+SYMPTOMS = [symptom for group in SYMPTOM_GROUPS for symptom in group]
+
+METRIC_LEVELS = {
+    'energy_level': ["Very Low", "Low", "Moderate", "Good", "Excellent"],
+    'appetite': ["Poor", "Fair", "Normal", "Good", "Excellent"],
+    'mobility': ["Bed-bound", "Limited", "With Assistance", "Independent", "Fully Active"],
+    'sleep_quality': ["Very Poor", "Poor", "Fair", "Good", "Excellent"],
+    'mood': ["Very Low", "Low", "Neutral", "Good", "Excellent"]
+}
+
+COLUMN_TYPES = {
+    'date': np.int32,
+    'weight': np.float32,
+    'temperature': np.float32,
+    'systolic': np.uint8,
+    'diastolic': np.uint8,
+    **{metric: np.int8 for metric in METRIC_LEVELS}
+}
+INITIAL_CAPACITY = 8
+UNIX_EPOCH_ORDINAL = Date(1970, 1, 1).toordinal()
+
+def parse_blood_pressure(bp_string):
+    """Parse blood pressure string and return systolic and diastolic values."""
+    try:
+        systolic, diastolic = map(int, bp_string.strip().split('/'))
+        if 60 <= systolic <= 200 and 40 <= diastolic <= 130:
+            return systolic, diastolic
+        return None, None
+    except (ValueError, AttributeError):
+        return None, None
+
+def new_follow_up_buffer(capacity=INITIAL_CAPACITY):
+    """Return an empty columnar follow-up buffer."""
+    buffer = {'size': 0, 'notes': []}
+    for column, dtype in COLUMN_TYPES.items():
+        buffer[column] = np.zeros(capacity, dtype=dtype)
+    buffer['symptoms'] = np.zeros((capacity, len(SYMPTOMS)), dtype=np.int8)
+    return buffer
+
+def append_follow_up(buffer, record):
+    """
+    Append a follow-up record to the buffer, growing its columns when full.
+
+    Args:
+        buffer (dict): Buffer from new_follow_up_buffer
+        record (dict): date, weight, blood_pressure (e.g. "120/80"), temperature,
+            symptom_levels (symptom name -> 0-10), the METRIC_LEVELS labels and notes
+    """
+    index = buffer['size']
+    if index == len(buffer['date']):
+        for column in list(COLUMN_TYPES) + ['symptoms']:
+            grown = np.zeros((2 * index,) + buffer[column].shape[1:], dtype=buffer[column].dtype)
+            grown[:index] = buffer[column]
+            buffer[column] = grown
+
+    systolic, diastolic = parse_blood_pressure(record['blood_pressure'])
+    buffer['date'][index] = record['date'].toordinal()
+    buffer['weight'][index] = record['weight']
+    buffer['temperature'][index] = record['temperature']
+    buffer['systolic'][index] = systolic or 0
+    buffer['diastolic'][index] = diastolic or 0
+    for metric, levels in METRIC_LEVELS.items():
+        buffer[metric][index] = levels.index(record[metric])
+    buffer['symptoms'][index] = 0
+    for symptom, level in record['symptom_levels'].items():
+        buffer['symptoms'][index, SYMPTOMS.index(symptom)] = level
+    buffer['notes'].append(record['notes'])
+    buffer['size'] = index + 1
+
+def follow_up_columns(buffer):
+    """Return views of the filled part of each column, with dates as datetime64 values."""
+    size = buffer['size']
+    columns = {column: buffer[column][:size] for column in list(COLUMN_TYPES) + ['symptoms']}
+    columns['date'] = (columns['date'] - UNIX_EPOCH_ORDINAL).astype('datetime64[D]')
+    columns['notes'] = buffer['notes']
+    return columns
+
+def buffer_nbytes(buffer):
+    """Return the bytes held by the buffer's arrays, the notes list and its strings."""
+    arrays = sum(buffer[column].nbytes for column in list(COLUMN_TYPES) + ['symptoms'])
+    return arrays + sys.getsizeof(buffer['notes']) + sum(sys.getsizeof(note) for note in buffer['notes'])
@@ -0,0 +1,155 @@
+import re
+from fractions import Fraction
+import numpy as np
+import pandas as pd
+from profiler import timed
+
+# Grocery list aggregation: ingredient rows from every meal of a plan are
+# normalized to base units (g, ml or a count) and summed per item and
+# category with a single pandas groupby.
+GROCERY_CATEGORIES = ["Produce", "Proteins", "Grains and starches", "Pantry items", "Herbs and spices"]
+
+# Keywords identifying each category in free-form LLM output; anything else is a pantry item
+CATEGORY_KEYWORDS = {
+    "produce": "Produce", "fruit": "Produce", "vegetable": "Produce",
+    "protein": "Proteins", "meat": "Proteins", "fish": "Proteins", "seafood": "Proteins",
+    "grain": "Grains and starches", "starch": "Grains and starches", "bread": "Grains and starches",
+    "pantry": "Pantry items",
+    "herb": "Herbs and spices", "spice": "Herbs and spices"
+}
+
+# Spelled-out unit -> canonical unit
+UNIT_ALIASES = {
+    "": "piece", "g": "g", "gram": "g", "grams": "g", "kg": "kg", "kilogram": "kg", "kilograms": "kg",
+    "oz": "oz", "ounce": "oz", "ounces": "oz", "lb": "lb", "lbs": "lb", "pound": "lb", "pounds": "lb",
+    "ml": "ml", "milliliter": "ml", "milliliters": "ml", "millilitre": "ml", "millilitres": "ml",
+    "l": "l", "liter": "l", "liters": "l", "litre": "l", "litres": "l",
+    "cup": "cup", "cups": "cup", "tbsp": "tbsp", "tablespoon": "tbsp", "tablespoons": "tbsp",
+    "tsp": "tsp", "teaspoon": "tsp", "teaspoons": "tsp",
+    "piece": "piece", "pieces": "piece", "pc": "piece", "pcs": "piece", "whole": "piece",
+    "slice": "slice", "slices": "slice", "clove": "clove", "cloves": "clove"
+}
+
+# Canonical unit -> (base unit, factor to the base unit)
+UNIT_CONVERSIONS = {
+    "g": ("g", 1.0), "kg": ("g", 1000.0), "oz": ("g", 28.35), "lb": ("g", 453.6),
+    "ml": ("ml", 1.0), "l": ("ml", 1000.0), "cup": ("ml", 240.0), "tbsp": ("ml", 15.0), "tsp": ("ml", 5.0),
+    "piece": ("piece", 1.0), "slice": ("slice", 1.0), "clove": ("clove", 1.0)
+}
+
+# Structured line requested from the LLM for every ingredient of a meal
+INGREDIENT_PATTERN = re.compile(
+    r"^[ \t]*(?:[-*][ \t]*)?INGREDIENT:[ \t]*(?P<quantity>[^|\n]*)\|(?P<unit>[^|\n]*)\|(?P<item>[^|\n]*)"
+    r"(?:\|(?P<category>[^|\n]*))?[ \t]*$",
+    re.IGNORECASE | re.MULTILINE
+)
+
+def parse_quantity(text):
+    """
+    Parse a quantity such as "2", "0.5", "1/2", "1 1/2" or "2-3" (the upper bound is used).
+
+    Returns:
+        float: The quantity, or None if the text is not a number
+    """
+    text = text.strip().replace(",", ".")
+    if "-" in text:
+        text = text.split("-")[-1].strip()
+    try:
+        return float(sum(Fraction(part) for part in text.split()))
+    except (ValueError, ZeroDivisionError):
+        return None
+
+def normalize_category(category):
+    """Map a free-form category label onto one of the grocery categories."""
+    label = (category or "").strip().lower()
+    for keyword, name in CATEGORY_KEYWORDS.items():
+        if keyword in label:
+            return name
+    return "Pantry items"
+
+def parse_ingredient_lines(text):
+    """
+    Extract the structured INGREDIENT lines from generated meal plan text.
+
+    Returns:
+        list: Ingredient dicts with item, quantity, unit and category keys
+    """
+    return [
+        {
+            'item': match.group('item').strip(),
+            'quantity': parse_quantity(match.group('quantity')),
+            'unit': match.group('unit').strip(),
+            'category': normalize_category(match.group('category'))
+        }
+        for match in INGREDIENT_PATTERN.finditer(text)
+        if match.group('item').strip()
+    ]
+
+def render_ingredient_lines(text):
+    """Replace the structured INGREDIENT lines in meal plan text with readable bullet points."""
+    def render(match):
+        quantity = match.group('quantity').strip()
+        unit = match.group('unit').strip()
+        return "- " + " ".join(part for part in (quantity, unit, match.group('item').strip()) if part)
+    return INGREDIENT_PATTERN.sub(render, text)
+
+@timed
+def aggregate_groceries(ingredients):
+    """
+    Sum ingredient quantities across all meals of a plan.
+
+    Units are normalized (kg/oz/lb to g, l/cups/tbsp/tsp to ml) and rows are
+    grouped by category, item and base unit. Totals of 1000 g or ml and more
+    are shown in kg or l. Ingredients without a parseable quantity are kept
+    with a NaN quantity.
+
+    Args:
+        ingredients (list): Ingredient dicts with item, quantity, unit and category keys
+
+    Returns:
+        DataFrame: Category, Item, Quantity and Unit columns, ordered by category and item
+    """
+    frame = pd.DataFrame(ingredients, columns=['item', 'quantity', 'unit', 'category'])
+    if frame.empty:
+        return pd.DataFrame(columns=['Category', 'Item', 'Quantity', 'Unit'])
+
+    frame['item'] = frame['item'].str.strip().str.lower().str.replace(r"\s+", " ", regex=True)
+    units = frame['unit'].str.strip().str.lower().str.rstrip('.')
+    canonical = units.map(UNIT_ALIASES).fillna(units)
+    frame['base_unit'] = canonical.map({unit: base for unit, (base, _) in UNIT_CONVERSIONS.items()}).fillna(canonical)
+    factor = canonical.map({unit: factor for unit, (_, factor) in UNIT_CONVERSIONS.items()}).fillna(1.0)
+    frame['quantity'] = pd.to_numeric(frame['quantity'], errors='coerce') * factor
+
+    totals = (
+        frame.groupby(['category', 'item', 'base_unit'], sort=False)['quantity']
+        .sum(min_count=1)
+        .reset_index()
+    )
+    quantity = totals['quantity'].to_numpy(dtype=np.float64)
+    base_unit = totals['base_unit'].to_numpy(dtype=object)
+    large = np.isin(base_unit, ["g", "ml"]) & (quantity >= 1000)
+    totals['Quantity'] = np.round(np.where(large, quantity / 1000, quantity), 2)
+    totals['Unit'] = np.where(large, np.where(base_unit == "g", "kg", "l"), base_unit)
+    totals['Category'] = pd.Categorical(totals['category'], categories=GROCERY_CATEGORIES, ordered=True)
+
+    return (
+        totals.rename(columns={'item': 'Item'})[['Category', 'Item', 'Quantity', 'Unit']]
+        .sort_values(['Category', 'Item'])
+        .reset_index(drop=True)
+    )
+
+def format_grocery_list(groceries):
+    """Render an aggregated grocery list as markdown, one section per category."""
+    if groceries.empty:
+        return ""
+    lines = ["## Grocery List"]
+    for category, rows in groceries.groupby('Category', observed=True, sort=True):
+        lines.append(f"### {category}")
+        for item, quantity, unit in zip(rows['Item'], rows['Quantity'], rows['Unit']):
+            amount = "as needed" if pd.isna(quantity) else f"{quantity:g} {unit}"
+            lines.append(f"- {item}: {amount}")
+    return "\n".join(lines)
+
+def grocery_csv(groceries):
+    """Return an aggregated grocery list as CSV text."""
+    return groceries.to_csv(index=False)
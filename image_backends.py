@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from io import BytesIO
+from functools import lru_cache
+import numpy as np
+from PIL import Image
+from profiler import timed
+from image_client import IMAGE_MODEL_INPUT_SIZE, predict_image, image_model_cache_version, warm_up_image_client
+
+# Interchangeable image classification backends, selected with IMAGE_BACKEND:
+#   gradio - the Hugging Face Space through the shared gradio client (or any
+#            Gradio server via IMAGE_MODEL_ENDPOINT, e.g. scripts/mock_gradio_server.py)
+#   onnx   - local CPU inference with ONNX Runtime on IMAGE_ONNX_MODEL_PATH
+#   mock   - deterministic fake predictions for offline development and tests
+# Every backend takes the preprocessed JPEG bytes and returns a result dict.
+IMAGE_BACKEND = os.getenv("IMAGE_BACKEND", "gradio")
+IMAGE_ONNX_MODEL_PATH = os.getenv(
+    "IMAGE_ONNX_MODEL_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "breast_cancer_classifier.onnx")
+)
+IMAGE_CLASS_LABELS = os.getenv("IMAGE_CLASS_LABELS", "benign,malignant").split(",")
+MOCK_LATENCY_SECONDS = float(os.getenv("MOCK_LATENCY_SECONDS", "0.05"))
+
+# ImageNet normalization used by most pretrained vision backbones
+IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+_onnx_warm_up_started = False
+
+def predict_with_gradio(image_bytes):
+    """Classify an image through the shared gradio client."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp_file:
+        tmp_file.write(image_bytes)
+        tmp_file_path = tmp_file.name
+    try:
+        result = predict_image(tmp_file_path)
+    finally:
+        os.unlink(tmp_file_path)
+
+    if not isinstance(result, str):
+        return {'result': str(result)}
+    # The Space returns the path of a JSON file with the prediction
+    with open(result, 'r') as json_file:
+        return json.load(json_file)
+
+@lru_cache(maxsize=2)
+def load_onnx_session(model_path=IMAGE_ONNX_MODEL_PATH):
+    """Load an ONNX model for CPU inference (once per process)."""
+    try:
+        import onnxruntime
+    except ImportError:
+        raise RuntimeError("The onnx backend needs the onnxruntime package (pip install onnxruntime)")
+    return onnxruntime.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+
+def image_to_tensor(image_bytes, input_size=IMAGE_MODEL_INPUT_SIZE):
+    """Decode an image into a normalized 1x3xHxW float32 tensor, center-cropped to input_size."""
+    with Image.open(BytesIO(image_bytes)) as image:
+        image = image.convert("RGB")
+        scale = input_size / min(image.size)
+        image = image.resize((max(input_size, round(image.width * scale)), max(input_size, round(image.height * scale))),
+                             Image.Resampling.BILINEAR)
+        left, top = (image.width - input_size) // 2, (image.height - input_size) // 2
+        pixels = np.asarray(image.crop((left, top, left + input_size, top + input_size)), dtype=np.float32)
+    pixels = (pixels / 255.0 - IMAGENET_MEAN) / IMAGENET_STD
+    return pixels.transpose(2, 0, 1)[np.newaxis]
+
+def probabilities_to_result(probabilities):
+    """Build the result dict from class probabilities."""
+    best = int(np.argmax(probabilities))
+    result = {'prediction': IMAGE_CLASS_LABELS[best], 'confidence': float(probabilities[best])}
+    for label, probability in zip(IMAGE_CLASS_LABELS, probabilities):
+        result[f"{label}_probability"] = float(probability)
+    return result
+
+def predict_with_onnx(image_bytes):
+    """Classify an image with the local ONNX model."""
+    session = load_onnx_session()
+    logits = session.run(None, {session.get_inputs()[0].name: image_to_tensor(image_bytes)})[0][0]
+    logits = logits.astype(np.float64)
+    probabilities = np.exp(logits - logits.max())
+    return probabilities_to_result(probabilities / probabilities.sum())
+
+def predict_with_mock(image_bytes):
+    """Return a deterministic fake prediction derived from the image hash."""
+    time.sleep(MOCK_LATENCY_SECONDS)
+    digest = hashlib.sha256(image_bytes).digest()
+    malignant = int.from_bytes(digest[:4], 'little') / 2 ** 32
+    probabilities = np.array([1 - malignant, malignant])
+    if len(IMAGE_CLASS_LABELS) != 2:
+        probabilities = np.full(len(IMAGE_CLASS_LABELS), 1 / len(IMAGE_CLASS_LABELS))
+    return probabilities_to_result(probabilities)
+
+BACKENDS = {
+    'gradio': predict_with_gradio,
+    'onnx': predict_with_onnx,
+    'mock': predict_with_mock
+}
+
+def backend_cache_version(backend=IMAGE_BACKEND):
+    """Return the model identity that cached predictions from a backend are keyed on."""
+    if backend == 'gradio':
+        return image_model_cache_version()
+    if backend == 'onnx':
+        try:
+            modified = int(os.path.getmtime(IMAGE_ONNX_MODEL_PATH))
+        except OSError:
+            modified = 0
+        return f"onnx:{os.path.abspath(IMAGE_ONNX_MODEL_PATH)}@{modified}/{IMAGE_MODEL_INPUT_SIZE}"
+    return backend
+
+@timed
+def run_prediction(image_bytes, backend=IMAGE_BACKEND):
+    """
+    Classify a preprocessed image with the selected backend.
+
+    Args:
+        image_bytes (bytes): JPEG bytes from image_client.preprocess_image
+        backend (str): Name of a backend in BACKENDS
+
+    Returns:
+        tuple: (result dict, inference latency in seconds)
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown image backend '{backend}', expected one of: {', '.join(BACKENDS)}")
+    start = time.perf_counter()
+    result = BACKENDS[backend](image_bytes)
+    return result, time.perf_counter() - start
+
+def warm_up_image_backend(backend=IMAGE_BACKEND):
+    """Prepare the selected backend in the background so the first prediction is fast."""
+    global _onnx_warm_up_started
+    if backend == 'gradio':
+        warm_up_image_client()
+    elif backend == 'onnx' and not _onnx_warm_up_started:
+        _onnx_warm_up_started = True
+
+        def warm_up():
+            try:
+                load_onnx_session()
+            except Exception:
+                pass  # The first prediction loads the model (and reports the error) instead
+        threading.Thread(target=warm_up, name="onnx-warm-up", daemon=True).start()
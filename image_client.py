@@ -0,0 +1,118 @@
+import os
+import re
+import threading
+from io import BytesIO
+from PIL import Image
+from gradio_client import Client
+
+# Process-wide gradio_client connection to the image classification Space.
+# Building a Client fetches the Space's API config, so it is done once (in
+# the background at startup) and shared by every session.
+IMAGE_MODEL_ENDPOINT = os.getenv(
+    "IMAGE_MODEL_ENDPOINT", "https://hasanah10105-breast-cancer-classification.hf.space/"
+)
+IMAGE_MODEL_FN_INDEX = int(os.getenv("IMAGE_MODEL_FN_INDEX", "0"))
+# Bump when the Space's model changes so cached predictions are not reused
+IMAGE_MODEL_VERSION = os.getenv("IMAGE_MODEL_VERSION", "1")
+# Uploads are downscaled so their shorter side matches the model's input
+# resolution and re-encoded as JPEG before being sent
+IMAGE_MODEL_INPUT_SIZE = int(os.getenv("IMAGE_MODEL_INPUT_SIZE", "224"))
+IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "90"))
+
+_client = None
+_client_lock = threading.Lock()
+_warm_up_started = False
+
+def base_space_url(endpoint):
+    """Strip a pinned "--replicas/<id>/" suffix so the Space resolves its current replica."""
+    return re.sub(r"--replicas/[^/]+/?$", "", endpoint.rstrip("/") + "/")
+
+def image_model_cache_version():
+    """Return the model identity that cached predictions are keyed on."""
+    return (f"{base_space_url(IMAGE_MODEL_ENDPOINT)}#{IMAGE_MODEL_FN_INDEX}@{IMAGE_MODEL_VERSION}"
+            f"/{IMAGE_MODEL_INPUT_SIZE}q{IMAGE_JPEG_QUALITY}")
+
+def preprocess_image(image_bytes, input_size=IMAGE_MODEL_INPUT_SIZE, quality=IMAGE_JPEG_QUALITY):
+    """
+    Decode an uploaded image, downscale it to the model resolution and re-encode it as JPEG in memory.
+
+    The aspect ratio is kept; images whose shorter side is already at most
+    input_size are only re-encoded.
+
+    Args:
+        image_bytes (bytes): Contents of the uploaded image
+        input_size (int): Target length of the shorter side in pixels
+        quality (int): JPEG quality (1-95)
+
+    Returns:
+        bytes: The JPEG-encoded image
+    """
+    with Image.open(BytesIO(image_bytes)) as image:
+        scale = input_size / min(image.size)
+        target = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        if scale < 1:
+            # Lets the JPEG decoder skip detail that the resize would discard anyway
+            image.draft("RGB", target)
+        image = image.convert("RGB")
+        if scale < 1:
+            image = image.resize(target, Image.Resampling.LANCZOS, reducing_gap=3.0)
+        output = BytesIO()
+        image.save(output, format="JPEG", quality=quality)
+    return output.getvalue()
+
+def get_image_client():
+    """Return the shared gradio client, connecting on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = Client(IMAGE_MODEL_ENDPOINT, verbose=False)
+    return _client
+
+def reconnect_image_client(stale_client):
+    """
+    Replace a failed client with a fresh connection to the Space's base URL.
+
+    Concurrent callers that saw the same stale client share a single reconnect.
+    """
+    global _client
+    with _client_lock:
+        if _client is stale_client or _client is None:
+            _client = Client(base_space_url(IMAGE_MODEL_ENDPOINT), verbose=False)
+        return _client
+
+def predict_image(image_path):
+    """
+    Run the classification model on an image file.
+
+    If the call fails (for example because the Space moved to another replica)
+    the client reconnects once and the prediction is retried.
+
+    Args:
+        image_path (str): Path of the image to classify
+
+    Returns:
+        The raw gradio prediction result
+    """
+    client = get_image_client()
+    try:
+        return client.predict(image_path, fn_index=IMAGE_MODEL_FN_INDEX)
+    except Exception:
+        client = reconnect_image_client(client)
+        return client.predict(image_path, fn_index=IMAGE_MODEL_FN_INDEX)
+
+def warm_up_image_client():
+    """Connect to the Space in a background thread, once per process."""
+    global _warm_up_started
+    with _client_lock:
+        if _warm_up_started:
+            return
+        _warm_up_started = True
+
+    def warm_up():
+        try:
+            get_image_client()
+        except Exception:
+            pass  # The first prediction connects (and reports the error) instead
+
+    threading.Thread(target=warm_up, name="image-client-warm-up", daemon=True).start()
@@ -0,0 +1,127 @@
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config import DATA_DIR
+
+# Versioned on-disk bundle of precomputed quiz insights, built offline by
+# scripts/build_insight_bank.py and loaded lazily on first lookup.
+INSIGHT_BANK_PATH = os.getenv("INSIGHT_BANK_PATH", os.path.join(DATA_DIR, "quiz_insights.json"))
+INSIGHT_BANK_FORMAT_VERSION = 1
+
+_bank = None
+_bank_lock = threading.Lock()
+
+def question_hash(question_text):
+    """Return the content hash used to key a question in the insight bank."""
+    return hashlib.sha256(question_text.strip().encode('utf-8')).hexdigest()
+
+def read_insight_bundle(path=INSIGHT_BANK_PATH):
+    """
+    Read an insight bundle from disk.
+
+    Args:
+        path (str): Location of the bundle
+
+    Returns:
+        dict: The bundle, or an empty bundle if the file is missing or has another format version
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as bundle_file:
+            bundle = json.load(bundle_file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'format_version': INSIGHT_BANK_FORMAT_VERSION, 'prompt_version': None, 'insights': {}}
+    if bundle.get('format_version') != INSIGHT_BANK_FORMAT_VERSION:
+        return {'format_version': INSIGHT_BANK_FORMAT_VERSION, 'prompt_version': None, 'insights': {}}
+    return bundle
+
+def write_insight_bundle(bundle, path=INSIGHT_BANK_PATH):
+    """Atomically write an insight bundle to disk."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as bundle_file:
+        json.dump(bundle, bundle_file, indent=2, sort_keys=True, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def get_precomputed_insight(question_text, prompt_version=None):
+    """
+    Look up the precomputed insight for a question, loading the bundle on first use.
+
+    Args:
+        question_text (str): The quiz question
+        prompt_version (str): Only accept insights built with this prompt version, if given
+
+    Returns:
+        str: The insight, or None if the bank has no current entry for the question
+    """
+    global _bank
+    if _bank is None:
+        with _bank_lock:
+            if _bank is None:
+                _bank = read_insight_bundle()
+    if prompt_version is not None and _bank.get('prompt_version') != prompt_version:
+        return None
+    entry = _bank['insights'].get(question_hash(question_text))
+    return entry['insight'] if entry else None
+
+def build_insight_bank(questions, generate_insight, topic_for, prompt_version,
+                       path=INSIGHT_BANK_PATH, max_workers=8, force=False):
+    """
+    Incrementally (re)generate the insight bundle for a question bank.
+
+    Only questions whose text hash is missing from the bundle are sent to the LLM;
+    entries for questions no longer in the bank are dropped. A prompt_version change
+    regenerates everything.
+
+    Args:
+        questions (list): Question dicts with a "question" key
+        generate_insight (callable): Maps a topic string to insight text
+        topic_for (callable): Maps a question dict to its topic string
+        prompt_version (str): Version of the insight prompt
+        path (str): Location of the bundle
+        max_workers (int): Number of concurrent LLM requests
+        force (bool): Regenerate every insight
+
+    Returns:
+        dict: Counts of generated, reused, removed and failed insights
+    """
+    bundle = read_insight_bundle(path)
+    if force or bundle.get('prompt_version') != prompt_version:
+        bundle['insights'] = {}
+    existing = bundle['insights']
+
+    wanted = {question_hash(question["question"]): question for question in questions}
+    removed = [key for key in existing if key not in wanted]
+    for key in removed:
+        del existing[key]
+    pending = {key: question for key, question in wanted.items() if key not in existing}
+
+    stats = {'generated': 0, 'reused': len(wanted) - len(pending), 'removed': len(removed), 'failed': 0}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(generate_insight, topic_for(question)): (key, question)
+            for key, question in pending.items()
+        }
+        for future in as_completed(futures):
+            key, question = futures[future]
+            try:
+                insight = future.result()
+            except Exception:
+                insight = None
+            if not insight or insight.startswith("Error"):
+                stats['failed'] += 1
+                continue
+            existing[key] = {
+                'question': question["question"],
+                'topic': topic_for(question),
+                'insight': insight
+            }
+            stats['generated'] += 1
+
+    bundle['format_version'] = INSIGHT_BANK_FORMAT_VERSION
+    bundle['prompt_version'] = prompt_version
+    bundle['built_at'] = datetime.now().isoformat(timespec='seconds')
+    write_insight_bundle(bundle, path)
+    return stats
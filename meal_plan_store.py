@@ -0,0 +1,142 @@
+import os
+import json
+import time
+import threading
+from config import DATA_DIR
+import sqlite_store
+
+# Persistent store of generated meal plans keyed by canonical preferences,
+# plus request counts per key so scripts/warm_meal_plans.py can pre-generate
+# the most popular combinations.
+MEAL_PLAN_STORE_PATH = os.getenv("MEAL_PLAN_STORE_PATH", os.path.join(DATA_DIR, "meal_plans.db"))
+MEAL_PLAN_MAX_AGE_DAYS = float(os.getenv("MEAL_PLAN_MAX_AGE_DAYS", "30"))
+# Bump when the text format of generated plans changes; stored plans in another
+# format are treated as missing. 1: free-text plans with an LLM grocery list,
+# 2: per-meal INGREDIENT lines aggregated into the grocery list.
+MEAL_PLAN_FORMAT_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meal_plans (
+    preference_key TEXT PRIMARY KEY,
+    plan TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    plan_format INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS meal_plan_requests (
+    preference_key TEXT PRIMARY KEY,
+    preferences TEXT NOT NULL,
+    requests INTEGER NOT NULL DEFAULT 0,
+    last_requested REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_meal_plan_requests_requests ON meal_plan_requests(requests DESC);
+"""
+
+# Sessions share one connection per store (see sqlite_store); statements
+# against it are serialized through this lock.
+_lock = threading.RLock()
+
+def migrate_store(connection):
+    """Add the plan format column to stores created before plans were versioned; their plans are format 1."""
+    columns = [row[1] for row in connection.execute("PRAGMA table_info(meal_plans)")]
+    if 'plan_format' not in columns:
+        with connection:
+            connection.execute("ALTER TABLE meal_plans ADD COLUMN plan_format INTEGER NOT NULL DEFAULT 1")
+
+def get_connection(path=MEAL_PLAN_STORE_PATH):
+    """Return the shared connection to the meal plan store, creating the schema if needed."""
+    return sqlite_store.get_connection(path, SCHEMA, migrate=migrate_store)
+
+def canonicalize_preferences(preferences):
+    """
+    Normalize meal preferences so equivalent form selections share one key.
+
+    An empty diet type means Regular and is dropped next to a specific diet;
+    an empty taste selection or one containing "All" means All.
+
+    Args:
+        preferences (dict): Dictionary containing user dietary preferences
+
+    Returns:
+        dict: Canonical preferences
+    """
+    diet_type = sorted(set(preferences['diet_type'])) or ['Regular']
+    if len(diet_type) > 1 and 'Regular' in diet_type:
+        diet_type.remove('Regular')
+    taste = sorted(set(preferences['taste_preferences']))
+    if not taste or 'All' in taste:
+        taste = ['All']
+    return {
+        'allergies': sorted(set(preferences['allergies'] or [])),
+        'diet_type': diet_type,
+        'budget': preferences['budget'],
+        'taste_preferences': taste,
+        'batch_cooking': bool(preferences.get('batch_cooking')),
+        'easy_prep': bool(preferences.get('easy_prep')),
+        'leftovers': bool(preferences.get('leftovers'))
+    }
+
+def preference_key(preferences):
+    """Return the canonical store key for a set of preferences."""
+    return json.dumps(canonicalize_preferences(preferences), sort_keys=True, separators=(',', ':'))
+
+def record_request(preferences, path=MEAL_PLAN_STORE_PATH):
+    """Count a meal plan request for these preferences."""
+    canonical = canonicalize_preferences(preferences)
+    key = preference_key(canonical)
+    with _lock:
+        connection = get_connection(path)
+        with connection:
+            connection.execute(
+                """
+                INSERT INTO meal_plan_requests (preference_key, preferences, requests, last_requested)
+                VALUES (?, ?, 1, ?)
+                ON CONFLICT(preference_key) DO UPDATE SET
+                    requests = requests + 1, last_requested = excluded.last_requested
+                """,
+                (key, json.dumps(canonical), time.time())
+            )
+
+def get_saved_meal_plan(preferences, max_age_days=MEAL_PLAN_MAX_AGE_DAYS, path=MEAL_PLAN_STORE_PATH):
+    """Return the stored plan for these preferences, or None if there is none, it is too old or in an older format."""
+    with _lock:
+        row = get_connection(path).execute(
+            "SELECT plan, created_at FROM meal_plans WHERE preference_key = ? AND plan_format = ?",
+            (preference_key(preferences), MEAL_PLAN_FORMAT_VERSION)
+        ).fetchone()
+    if row is None or time.time() - row[1] > max_age_days * 86400:
+        return None
+    return row[0]
+
+def save_meal_plan(preferences, plan, path=MEAL_PLAN_STORE_PATH):
+    """Store a generated plan for these preferences, replacing any previous one."""
+    with _lock:
+        connection = get_connection(path)
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO meal_plans (preference_key, plan, created_at, plan_format) VALUES (?, ?, ?, ?)",
+                (preference_key(preferences), plan, time.time(), MEAL_PLAN_FORMAT_VERSION)
+            )
+
+def most_requested_preferences(limit, path=MEAL_PLAN_STORE_PATH):
+    """
+    Return the most frequently requested preference combinations.
+
+    Returns:
+        list: (preferences, request count, plan age in days or None if there is no plan
+            in the current format) tuples, most requested first
+    """
+    with _lock:
+        rows = get_connection(path).execute(
+            """
+            SELECT r.preferences, r.requests, p.created_at
+            FROM meal_plan_requests r
+            LEFT JOIN meal_plans p ON p.preference_key = r.preference_key AND p.plan_format = ?
+            ORDER BY r.requests DESC LIMIT ?
+            """,
+            (MEAL_PLAN_FORMAT_VERSION, limit)
+        ).fetchall()
+    now = time.time()
+    return [
+        (json.loads(preferences), requests, (now - created_at) / 86400 if created_at else None)
+        for preferences, requests, created_at in rows
+    ]
@@ -0,0 +1,98 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from config import DATA_DIR
+import sqlite_store
+
+# Persistent content-addressed cache of image classification results, keyed by
+# the SHA-256 of the image bytes and the model endpoint version. The least
+# recently used entries are evicted once the stored results exceed
+# PREDICTION_CACHE_MAX_BYTES.
+PREDICTION_CACHE_PATH = os.getenv("PREDICTION_CACHE_PATH", os.path.join(DATA_DIR, "predictions.db"))
+PREDICTION_CACHE_MAX_BYTES = int(os.getenv("PREDICTION_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    image_hash TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    result TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (image_hash, model_version)
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_last_access ON predictions(last_access);
+"""
+
+# Sessions share one connection per store (see sqlite_store); statements
+# against it are serialized through this lock.
+_lock = threading.RLock()
+
+def get_connection(path=PREDICTION_CACHE_PATH):
+    """Return the shared connection to the prediction cache, creating the schema if needed."""
+    return sqlite_store.get_connection(path, SCHEMA)
+
+def image_hash(image_bytes):
+    """Return the content hash used to key an image in the cache."""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+def get_cached_prediction(key, model_version, path=PREDICTION_CACHE_PATH):
+    """Return the cached result for an image hash and model version, or None."""
+    with _lock:
+        connection = get_connection(path)
+        row = connection.execute(
+            "SELECT result FROM predictions WHERE image_hash = ? AND model_version = ?", (key, model_version)
+        ).fetchone()
+        if row is None:
+            return None
+        with connection:
+            connection.execute(
+                "UPDATE predictions SET last_access = ? WHERE image_hash = ? AND model_version = ?",
+                (time.time(), key, model_version)
+            )
+    return json.loads(row[0])
+
+def evict_predictions(max_bytes=PREDICTION_CACHE_MAX_BYTES, path=PREDICTION_CACHE_PATH):
+    """
+    Delete least recently used results until the cache fits in max_bytes.
+
+    Returns:
+        int: Number of evicted results
+    """
+    with _lock:
+        connection = get_connection(path)
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM predictions").fetchone()[0]
+        if total <= max_bytes:
+            return 0
+        evicted = []
+        for key, model_version, size in connection.execute(
+            "SELECT image_hash, model_version, size FROM predictions ORDER BY last_access"
+        ).fetchall():
+            if total <= max_bytes:
+                break
+            evicted.append((key, model_version))
+            total -= size
+        with connection:
+            connection.executemany(
+                "DELETE FROM predictions WHERE image_hash = ? AND model_version = ?", evicted
+            )
+    return len(evicted)
+
+def save_prediction(key, model_version, result, max_bytes=PREDICTION_CACHE_MAX_BYTES, path=PREDICTION_CACHE_PATH):
+    """Store a JSON-serializable result for an image hash and model version, evicting old entries if needed."""
+    payload = json.dumps(result)
+    now = time.time()
+    with _lock:
+        connection = get_connection(path)
+        with connection:
+            connection.execute(
+                """
+                INSERT OR REPLACE INTO predictions
+                    (image_hash, model_version, result, size, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (key, model_version, payload, len(payload), now, now)
+            )
+        evict_predictions(max_bytes, path)
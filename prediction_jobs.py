@@ -0,0 +1,75 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+from profiler import submit_in_context
+
+# Process-wide background jobs for image predictions. Sessions keep only job
+# IDs in st.session_state and poll for status, so a result survives reruns
+# and is rendered on whichever rerun finds it finished. Jobs are keyed by
+# content, so submitting the same work again returns the existing job.
+PREDICTION_JOB_WORKERS = int(os.getenv("PREDICTION_JOB_WORKERS", "4"))
+PREDICTION_JOB_TTL_SECONDS = 3600
+
+@st.cache_resource
+def get_job_registry():
+    """Process-wide prediction job pool and job table, kept across source reloads."""
+    return {
+        'executor': ThreadPoolExecutor(max_workers=PREDICTION_JOB_WORKERS, thread_name_prefix="prediction-job"),
+        'jobs': {},
+        'lock': threading.Lock()
+    }
+
+def prune_jobs(ttl_seconds=PREDICTION_JOB_TTL_SECONDS):
+    """Forget finished jobs older than the TTL."""
+    registry = get_job_registry()
+    jobs = registry['jobs']
+    cutoff = time.time() - ttl_seconds
+    with registry['lock']:
+        for job_id in [job_id for job_id, job in jobs.items() if job['future'].done() and job['submitted_at'] < cutoff]:
+            del jobs[job_id]
+
+def submit_job(job_id, fn, *args):
+    """
+    Run fn(*args) in the background under job_id, unless that job already exists.
+
+    A failed job is resubmitted; a running or finished one is reused.
+
+    Returns:
+        str: The job ID
+    """
+    prune_jobs()
+    registry = get_job_registry()
+    with registry['lock']:
+        job = registry['jobs'].get(job_id)
+        if job is None or (job['future'].done() and job['future'].exception() is not None):
+            job = registry['jobs'][job_id] = {'submitted_at': time.time(), 'finished_at': None}
+            job['future'] = submit_in_context(registry['executor'], fn, *args)
+            job['future'].add_done_callback(lambda _, job=job: job.update(finished_at=time.time()))
+    return job_id
+
+def get_job(job_id):
+    """
+    Return the status of a job.
+
+    Returns:
+        dict: status ("running", "done", "failed" or "unknown" for pruned
+            jobs), the result or error, and seconds from submission until
+            now or until the job finished
+    """
+    registry = get_job_registry()
+    with registry['lock']:
+        job = registry['jobs'].get(job_id)
+    if job is None:
+        return {'status': 'unknown', 'result': None, 'error': None, 'seconds': None}
+    future = job['future']
+    seconds = (job['finished_at'] or time.time()) - job['submitted_at']
+    status = {'status': 'running', 'result': None, 'error': None, 'seconds': seconds}
+    if future.done():
+        error = future.exception()
+        if error is None:
+            status.update(status='done', result=future.result())
+        else:
+            status.update(status='failed', error=str(error))
+    return status
@@ -0,0 +1,198 @@
+import os
+import io
+import time
+import pstats
+import cProfile
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from datetime import datetime
+from functools import wraps
+import pandas as pd
+import streamlit as st
+from config import DATA_DIR
+
+# Opt-in rerun instrumentation, selected with PROFILER:
+#   off   - (default) timed functions cost a single context variable lookup
+#   admin - a sidebar toggle turns profiling on for the current session
+#   on    - every rerun of every session is profiled
+# While a rerun is profiled, timed() functions and timed_block() sections
+# add their wall time to that rerun's breakdown, which the sidebar panel
+# shows after the page has run. Work submitted to thread pools with
+# submit_in_context() is attributed to the rerun that submitted it, even if
+# it finishes later; fragment-only reruns skip app.main and are profiled by
+# profiled_fragment() instead. A single rerun can also be captured with
+# cProfile to a .prof file (readable with pstats or snakeviz).
+PROFILER_MODE = os.getenv("PROFILER", "off").lower()
+PROFILER_OUTPUT_DIR = os.getenv("PROFILER_OUTPUT_DIR", os.path.join(DATA_DIR, "profiles"))
+PROFILER_HISTORY = 20
+PROFILER_TOP_FUNCTIONS = 20
+
+_current_profile = ContextVar("current_profile", default=None)
+# Pool threads can add to the same profile concurrently
+_sections_lock = threading.Lock()
+
+@contextmanager
+def timed_block(name):
+    """Add the wall time of the enclosed block to the current rerun's profile, if any."""
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _sections_lock:
+            section = profile['sections'].setdefault(name, {'calls': 0, 'seconds': 0.0})
+            section['calls'] += 1
+            section['seconds'] += elapsed
+
+def timed(fn):
+    """Decorator timing each call of fn while the current rerun is profiled."""
+    name = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _current_profile.get() is None:
+            return fn(*args, **kwargs)
+        with timed_block(name):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+def submit_in_context(executor, fn, *args, **kwargs):
+    """Submit fn to a thread pool so that its timed sections count towards the current rerun."""
+    return executor.submit(copy_context().run, fn, *args, **kwargs)
+
+def profiling_enabled():
+    """Return whether reruns of the current session are profiled."""
+    if PROFILER_MODE == "on":
+        return True
+    return PROFILER_MODE == "admin" and st.session_state.get('profiling', False)
+
+def save_capture(profiler, name):
+    """
+    Write a cProfile capture to PROFILER_OUTPUT_DIR.
+
+    Returns:
+        dict: path of the .prof file and a text summary of the top functions by cumulative time
+    """
+    os.makedirs(PROFILER_OUTPUT_DIR, exist_ok=True)
+    path = os.path.join(PROFILER_OUTPUT_DIR, f"rerun-{name}-{datetime.now():%Y%m%d-%H%M%S-%f}.prof")
+    profiler.dump_stats(path)
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).strip_dirs().sort_stats("cumulative").print_stats(PROFILER_TOP_FUNCTIONS)
+    return {'path': path, 'summary': summary.getvalue()}
+
+@contextmanager
+def profile_rerun(name, import_seconds=0.0):
+    """
+    Profile the enclosed rerun when profiling is enabled for this session.
+
+    The finished profile is appended to st.session_state.rerun_profiles. If a
+    capture was requested from the panel, the rerun also runs under cProfile.
+
+    Args:
+        name (str): What is rerun, e.g. "page.quiz" or "fragment.reminders_fragment"
+        import_seconds (float): Time the app script spent on its imports this rerun
+    """
+    if not profiling_enabled():
+        yield
+        return
+
+    profile_id = st.session_state.get('rerun_profile_count', 0) + 1
+    st.session_state.rerun_profile_count = profile_id
+    profile = {'id': profile_id, 'name': name, 'started_at': datetime.now(), 'imports': import_seconds,
+               'sections': {}, 'total': None, 'capture': None}
+    profiler = cProfile.Profile() if st.session_state.pop('profiler_capture_next', False) else None
+    token = _current_profile.set(profile)
+    start = time.perf_counter()
+    try:
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ValueError as e:
+                # Another profiler (e.g. a capture in a concurrent session on Python 3.12+) is active
+                profile['capture'] = {'path': None, 'summary': f"Capture skipped: {e}"}
+                profiler = None
+        with timed_block(name):
+            yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        profile['total'] = time.perf_counter() - start + import_seconds
+        _current_profile.reset(token)
+        if profiler is not None:
+            profile['capture'] = save_capture(profiler, name)
+        if 'rerun_profiles' not in st.session_state:
+            st.session_state.rerun_profiles = deque(maxlen=PROFILER_HISTORY)
+        st.session_state.rerun_profiles.append(profile)
+
+def profiled_fragment(fn):
+    """
+    Decorator, applied below @st.fragment, profiling the fragment's own reruns.
+
+    Fragment-only reruns don't go through app.main, so they are profiled
+    here as "fragment.<name>"; during a full rerun the fragment is timed as
+    a section of the page instead.
+    """
+    name = f"fragment.{fn.__name__}"
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _current_profile.get() is not None:
+            with timed_block(name):
+                return fn(*args, **kwargs)
+        with profile_rerun(name):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+def render_profiler_panel():
+    """Show the timing breakdown of a recent profiled rerun in the sidebar."""
+    if PROFILER_MODE not in ("admin", "on"):
+        return
+
+    with st.sidebar.expander("⏱️ Rerun Profiler"):
+        if PROFILER_MODE == "admin":
+            st.toggle("Profile reruns", key="profiling")
+        profiles = st.session_state.get('rerun_profiles')
+        if not profiling_enabled():
+            st.caption("Profiling is off for this session.")
+            return
+        if not profiles:
+            st.caption("Timings appear from the next rerun.")
+            return
+
+        # Newest first; fragment reruns and late pool work show up here on the next full rerun
+        by_id = {profile['id']: profile for profile in profiles}
+        labels = {profile_id: f"{profile['started_at']:%H:%M:%S} {profile['name']} ({profile['total'] * 1000:.0f} ms)"
+                  for profile_id, profile in by_id.items()}
+        selected = st.selectbox("Rerun", list(reversed(by_id)), format_func=labels.get, key="profiler_selected_rerun")
+        profile = by_id.get(selected, profiles[-1])
+        st.metric("Rerun time", f"{profile['total'] * 1000:.0f} ms", help=profile['name'])
+        rows = [{'Section': "imports", 'Calls': 1, 'ms': profile['imports'] * 1000}]
+        with _sections_lock:
+            sections = sorted(profile['sections'].items(), key=lambda item: -item[1]['seconds'])
+            rows += [{'Section': name, 'Calls': section['calls'], 'ms': section['seconds'] * 1000}
+                     for name, section in sections]
+        breakdown = pd.DataFrame(rows)
+        breakdown['% of rerun'] = breakdown['ms'] / (profile['total'] * 1000) * 100
+        st.dataframe(breakdown.round(1), hide_index=True)
+        st.caption("Sections nest (the page includes the helpers it calls) and work in thread pools is summed "
+                   "across threads, so shares can add up to more than 100%.")
+
+        if st.button("Capture next rerun with cProfile"):
+            st.session_state.profiler_capture_next = True
+            st.rerun()
+        capture = profile['capture']
+        if capture:
+            if capture['path']:
+                st.caption(f"Saved to {capture['path']}")
+                with open(capture['path'], 'rb') as capture_file:
+                    st.download_button("Download .prof", capture_file.read(),
+                                       file_name=os.path.basename(capture['path']))
+            st.code(capture['summary'])
@@ -0,0 +1,214 @@
+import os
+import json
+import random
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from insight_bank import question_hash
+from config import DATA_DIR
+import sqlite_store
+
+# SQLite question bank. Sessions only hold question ids; bodies are fetched
+# lazily by id through a bounded process-wide cache, so per-session memory
+# does not grow with the size of the bank.
+QUESTION_STORE_PATH = os.getenv("QUESTION_STORE_PATH", os.path.join(DATA_DIR, "questions.db"))
+DIFFICULTY_LEVELS = ["easy", "medium", "hard"]
+# Random id probes tried per requested question before sampling the matches directly
+SAMPLE_PROBES_PER_QUESTION = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    text_hash TEXT NOT NULL UNIQUE,
+    question TEXT NOT NULL,
+    options TEXT NOT NULL,
+    correct INTEGER NOT NULL,
+    explanation TEXT NOT NULL,
+    difficulty TEXT NOT NULL DEFAULT 'medium',
+    language TEXT NOT NULL DEFAULT 'en'
+);
+CREATE INDEX IF NOT EXISTS idx_questions_language_difficulty ON questions(language, difficulty);
+CREATE INDEX IF NOT EXISTS idx_questions_language ON questions(language);
+CREATE TABLE IF NOT EXISTS question_tags (
+    tag TEXT NOT NULL,
+    question_id INTEGER NOT NULL REFERENCES questions(id),
+    PRIMARY KEY (tag, question_id)
+) WITHOUT ROWID;
+"""
+
+# Sessions share one connection per store (see sqlite_store); statements
+# against it are serialized through this lock.
+_lock = threading.RLock()
+
+def get_connection(path=QUESTION_STORE_PATH):
+    """Return the shared connection to the question store, creating the schema if needed."""
+    return sqlite_store.get_connection(path, SCHEMA)
+
+@contextmanager
+def store_connection(path=QUESTION_STORE_PATH):
+    """Hold the store lock and yield the shared connection, for modules that keep their own tables here."""
+    with _lock:
+        yield get_connection(path)
+
+def count_questions(path=QUESTION_STORE_PATH):
+    """Return the number of questions in the store."""
+    with _lock:
+        return get_connection(path).execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+
+def add_questions(questions, path=QUESTION_STORE_PATH):
+    """
+    Insert questions into the store, skipping any whose text is already present.
+
+    Args:
+        questions (list): Question dicts (question, options, correct, explanation and
+            optionally tags, difficulty, language)
+        path (str): Location of the store
+
+    Returns:
+        list: Ids of the newly inserted questions
+    """
+    connection = get_connection(path)
+    inserted = []
+    with _lock, connection:
+        for question in questions:
+            cursor = connection.execute(
+                """
+                INSERT OR IGNORE INTO questions
+                    (text_hash, question, options, correct, explanation, difficulty, language)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    question_hash(question["question"]),
+                    question["question"],
+                    json.dumps(question["options"], ensure_ascii=False),
+                    question["correct"],
+                    question["explanation"],
+                    question.get("difficulty", "medium"),
+                    question.get("language", "en")
+                )
+            )
+            if cursor.rowcount:
+                question_id = cursor.lastrowid
+                connection.executemany(
+                    "INSERT OR IGNORE INTO question_tags (tag, question_id) VALUES (?, ?)",
+                    [(tag, question_id) for tag in question.get("tags", [])]
+                )
+                inserted.append(question_id)
+    return inserted
+
+def seed_question_store(questions, path=QUESTION_STORE_PATH):
+    """Populate an empty store with the built-in question bank."""
+    if count_questions(path) == 0:
+        add_questions(questions, path)
+
+def sample_question_ids(n, tag=None, difficulty=None, language="en", path=QUESTION_STORE_PATH):
+    """
+    Randomly sample question ids matching the given filters.
+
+    Each pick draws a random id between the smallest and largest matching id
+    and takes the first match at or after it, walking the language or tag
+    index in id order instead of sorting every match. Picks are close to
+    uniform while matching ids are spread evenly. If the probes can't find n
+    distinct matches, because few questions match, the remainder is drawn
+    from the matching rows directly.
+
+    Args:
+        n (int): Number of questions to sample
+        tag (str): Only sample questions with this tag
+        difficulty (str): Only sample questions of this difficulty
+        language (str): Only sample questions in this language
+
+    Returns:
+        list: Up to n question ids, in random order
+    """
+    clauses = ["q.language = ?"]
+    params = [language]
+    if difficulty:
+        clauses.append("q.difficulty = ?")
+        params.append(difficulty)
+    if tag:
+        query = "SELECT q.id FROM question_tags t JOIN questions q ON q.id = t.question_id WHERE t.tag = ? AND "
+        params.insert(0, tag)
+        id_column = "t.question_id"
+    else:
+        query = "SELECT q.id FROM questions q WHERE "
+        id_column = "q.id"
+    query += " AND ".join(clauses)
+    probe = f"{query} AND {id_column} >= ? ORDER BY {id_column} LIMIT 1"
+    connection = get_connection(path)
+    with _lock:
+        first = connection.execute(f"{query} ORDER BY {id_column} LIMIT 1", params).fetchone()
+        if first is None or n <= 0:
+            return []
+        low = first[0]
+        high = connection.execute(f"{query} ORDER BY {id_column} DESC LIMIT 1", params).fetchone()[0]
+        sampled = []
+        for _ in range(n * SAMPLE_PROBES_PER_QUESTION):
+            row = connection.execute(probe, params + [random.randint(low, high)]).fetchone()
+            if row is None:
+                # Wrap around past the last match
+                row = connection.execute(probe, params + [low]).fetchone()
+                if row is None:
+                    return []
+            if row[0] not in sampled:
+                sampled.append(row[0])
+                if len(sampled) == n:
+                    return sampled
+        placeholders = ", ".join("?" * len(sampled))
+        rest = connection.execute(
+            f"{query} AND q.id NOT IN ({placeholders}) ORDER BY random() LIMIT ?",
+            params + sampled + [n - len(sampled)]
+        )
+        return sampled + [row[0] for row in rest]
+
+@lru_cache(maxsize=2048)
+def get_question(question_id, path=QUESTION_STORE_PATH):
+    """
+    Fetch a question body by id.
+
+    Returns:
+        dict: The question in the QUIZ_QUESTIONS schema plus id, tags, difficulty and language,
+            or None if no question has this id
+    """
+    connection = get_connection(path)
+    with _lock:
+        row = connection.execute(
+            "SELECT id, question, options, correct, explanation, difficulty, language FROM questions WHERE id = ?",
+            (question_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        tags = [tag for (tag,) in connection.execute(
+            "SELECT tag FROM question_tags WHERE question_id = ? ORDER BY tag", (question_id,)
+        )]
+    return {
+        "id": row[0],
+        "question": row[1],
+        "options": json.loads(row[2]),
+        "correct": row[3],
+        "explanation": row[4],
+        "difficulty": row[5],
+        "language": row[6],
+        "tags": tags
+    }
+
+def list_tags(path=QUESTION_STORE_PATH):
+    """Return all distinct question tags."""
+    with _lock:
+        return [tag for (tag,) in get_connection(path).execute("SELECT DISTINCT tag FROM question_tags ORDER BY tag")]
+
+def iter_questions(batch_size=500, path=QUESTION_STORE_PATH):
+    """Yield every question in the store in id order, reading it in batches."""
+    connection = get_connection(path)
+    last_id = 0
+    while True:
+        with _lock:
+            ids = [row[0] for row in connection.execute(
+                "SELECT id FROM questions WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+            )]
+        if not ids:
+            return
+        for question_id in ids:
+            # Bypass the lookup cache so a full scan doesn't evict the hot questions
+            yield get_question.__wrapped__(question_id, path)
+        last_id = ids[-1]
@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import atexit
+import threading
+from config import DATA_DIR
+
+# Append-only log of quiz answers plus aggregates that are updated as each
+# event is recorded. Events are buffered and appended in batches; a snapshot
+# of the aggregates records how far into the log it is current, so startup
+# only replays the tail written after the last snapshot. Assumes a single
+# writer process per log file.
+QUIZ_EVENT_LOG_PATH = os.getenv("QUIZ_EVENT_LOG_PATH", os.path.join(DATA_DIR, "quiz_events.jsonl"))
+QUIZ_AGGREGATES_PATH = os.getenv("QUIZ_AGGREGATES_PATH", os.path.join(DATA_DIR, "quiz_aggregates.json"))
+EVENT_FLUSH_SIZE = 50
+EVENT_FLUSH_SECONDS = 5.0
+SNAPSHOT_EVERY_EVENTS = 1000
+
+_lock = threading.Lock()
+_state = None
+
+def empty_question_stats(option_count):
+    """Return zeroed aggregates for one question."""
+    return {'attempts': 0, 'correct': 0, 'option_counts': [0] * option_count, 'seconds_total': 0.0, 'timed': 0}
+
+def apply_event(aggregates, event):
+    """Fold a single answer event into the aggregates in place."""
+    stats = aggregates.get(str(event['question_id']))
+    if stats is None:
+        stats = aggregates[str(event['question_id'])] = empty_question_stats(event['option_count'])
+    stats['attempts'] += 1
+    stats['correct'] += int(event['is_correct'])
+    if 0 <= event['selected'] < len(stats['option_counts']):
+        stats['option_counts'][event['selected']] += 1
+    if event.get('seconds') is not None:
+        stats['seconds_total'] += event['seconds']
+        stats['timed'] += 1
+
+def load_state(log_path=QUIZ_EVENT_LOG_PATH, aggregates_path=QUIZ_AGGREGATES_PATH):
+    """Load the aggregate snapshot and replay any log entries written after it."""
+    try:
+        with open(aggregates_path, 'r', encoding='utf-8') as snapshot_file:
+            snapshot = json.load(snapshot_file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        snapshot = {'log_offset': 0, 'events': 0, 'questions': {}}
+
+    aggregates = snapshot['questions']
+    offset = snapshot['log_offset']
+    events = snapshot['events']
+    malformed = 0
+    try:
+        with open(log_path, 'r+b') as log_file:
+            log_file.seek(offset)
+            for line in log_file:
+                if not line.endswith(b'\n'):
+                    # Tail of an interrupted append; cut it off so later appends start on a fresh line
+                    log_file.truncate(offset)
+                    break
+                offset += len(line)
+                try:
+                    apply_event(aggregates, json.loads(line))
+                except (ValueError, KeyError, TypeError):
+                    malformed += 1
+                    continue
+                events += 1
+    except FileNotFoundError:
+        offset = 0
+
+    return {
+        'log_path': log_path,
+        'aggregates_path': aggregates_path,
+        'aggregates': aggregates,
+        'log_offset': offset,
+        'events': events,
+        'events_since_snapshot': events - snapshot['events'],
+        # Unreadable log lines skipped while replaying
+        'malformed_events': malformed,
+        'buffer': [],
+        'last_flush': time.monotonic()
+    }
+
+def get_state():
+    """Return the process-wide analytics state, loading it on first use."""
+    global _state
+    if _state is None:
+        with _lock:
+            if _state is None:
+                _state = load_state()
+                atexit.register(flush_events, snapshot=True)
+    return _state
+
+def write_snapshot(state):
+    """Persist the aggregates together with the log offset they cover."""
+    os.makedirs(os.path.dirname(state['aggregates_path']) or '.', exist_ok=True)
+    tmp_path = f"{state['aggregates_path']}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as snapshot_file:
+        json.dump({
+            'log_offset': state['log_offset'],
+            'events': state['events'],
+            'questions': state['aggregates']
+        }, snapshot_file)
+    os.replace(tmp_path, state['aggregates_path'])
+    state['events_since_snapshot'] = 0
+
+def _flush_locked(state, snapshot=False):
+    if state['buffer']:
+        os.makedirs(os.path.dirname(state['log_path']) or '.', exist_ok=True)
+        payload = ''.join(json.dumps(event) + '\n' for event in state['buffer']).encode('utf-8')
+        with open(state['log_path'], 'ab') as log_file:
+            log_file.write(payload)
+        state['log_offset'] += len(payload)
+        state['events_since_snapshot'] += len(state['buffer'])
+        state['buffer'] = []
+    state['last_flush'] = time.monotonic()
+    # The buffer is empty here, so the in-memory aggregates match the log up to log_offset
+    if snapshot or state['events_since_snapshot'] >= SNAPSHOT_EVERY_EVENTS:
+        write_snapshot(state)
+
+def flush_events(snapshot=False):
+    """Append buffered events to the log, writing an aggregate snapshot when due."""
+    state = get_state()
+    with _lock:
+        _flush_locked(state, snapshot)
+
+def record_answer_event(question_id, option_count, selected, is_correct, seconds=None, learner_id=None):
+    """
+    Record a quiz answer in the event log and update the aggregates.
+
+    Args:
+        question_id (int): Id of the answered question
+        option_count (int): Number of answer options of the question
+        selected (int): Index of the selected option
+        is_correct (bool): Whether the answer was correct
+        seconds (float): Time from showing the question to submitting the answer
+        learner_id (str): Learner ID, if the user provided one
+    """
+    event = {
+        'ts': round(time.time(), 3),
+        'question_id': question_id,
+        'option_count': option_count,
+        'selected': selected,
+        'is_correct': bool(is_correct),
+        'seconds': round(seconds, 3) if seconds is not None else None,
+        'learner_id': learner_id
+    }
+    state = get_state()
+    with _lock:
+        apply_event(state['aggregates'], event)
+        state['events'] += 1
+        state['buffer'].append(event)
+        if (len(state['buffer']) >= EVENT_FLUSH_SIZE
+                or time.monotonic() - state['last_flush'] >= EVENT_FLUSH_SECONDS):
+            _flush_locked(state)
+
+def get_question_stats(question_id):
+    """
+    Return answer statistics for one question in constant time.
+
+    Returns:
+        dict: attempts, correct_rate, option_distribution (share per option) and
+            mean_seconds, or None if the question has not been answered yet
+    """
+    state = get_state()
+    with _lock:
+        stats = state['aggregates'].get(str(question_id))
+        if stats is None or not stats['attempts']:
+            return None
+        return {
+            'attempts': stats['attempts'],
+            'correct_rate': stats['correct'] / stats['attempts'],
+            'option_distribution': [count / stats['attempts'] for count in stats['option_counts']],
+            'mean_seconds': stats['seconds_total'] / stats['timed'] if stats['timed'] else None
+        }
@@ -0,0 +1,170 @@
+import os
+import json
+import hashlib
+from functools import lru_cache
+import numpy as np
+
+# Bundled recipe dataset (data/recipes.json) with allergens, compatible diets
+# and tastes encoded as bitmasks in NumPy arrays, so the meal planner form's
+# selections can be applied to every recipe with a few vectorized operations.
+# It ships with the code, so it is found next to this file rather than under
+# DATA_DIR, which only moves the writable stores and logs.
+RECIPE_DATABASE_PATH = os.getenv("RECIPE_DATABASE_PATH",
+                                 os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "recipes.json"))
+ALLERGENS = ["Gluten", "Dairy", "Nuts", "Soy", "Eggs", "Shellfish", "Fish"]
+DIET_TYPES = ["Vegetarian", "Vegan", "Pescatarian", "Mediterranean", "Regular"]
+TASTES = ["Mild", "Spicy", "Sweet", "Savory"]
+BUDGET_LEVELS = ["Low", "Medium", "High"]
+MEAL_TYPES = ["breakfast", "lunch", "dinner", "snack"]
+
+# (slot name, meal type, share of the daily calorie target)
+MEAL_SLOTS = [
+    ("Breakfast", "breakfast", 0.25),
+    ("Morning Snack", "snack", 0.1),
+    ("Lunch", "lunch", 0.3),
+    ("Afternoon Snack", "snack", 0.1),
+    ("Dinner", "dinner", 0.25)
+]
+DAILY_CALORIE_TARGET = int(os.getenv("DAILY_CALORIE_TARGET", "1800"))
+
+# Scoring weights used when choosing a recipe for a slot
+TASTE_MISMATCH_PENALTY = 120.0
+REPEAT_PENALTY = 400.0
+REPEAT_WINDOW_DAYS = 3
+ROTATION_WEIGHT = 5.0
+
+def to_bitmask(values, vocabulary):
+    """Encode a list of labels as a bitmask over a fixed vocabulary."""
+    mask = 0
+    for value in values or []:
+        if value in vocabulary:
+            mask |= 1 << vocabulary.index(value)
+    return mask
+
+@lru_cache(maxsize=4)
+def load_recipe_database(path=RECIPE_DATABASE_PATH):
+    """
+    Load the recipe dataset and build its column arrays (once per process).
+
+    Returns:
+        dict: The recipe list plus allergen/diet/taste bitmasks, meal type and
+            cost codes and calories as NumPy arrays aligned with it
+    """
+    with open(path, 'r', encoding='utf-8') as recipe_file:
+        recipes = json.load(recipe_file)['recipes']
+    return {
+        'recipes': recipes,
+        'allergen_mask': np.array([to_bitmask(r['allergens'], ALLERGENS) for r in recipes], dtype=np.uint8),
+        'diet_mask': np.array([to_bitmask(r['diets'], DIET_TYPES) for r in recipes], dtype=np.uint8),
+        'taste_mask': np.array([to_bitmask(r['tastes'], TASTES) for r in recipes], dtype=np.uint8),
+        'meal': np.array([MEAL_TYPES.index(r['meal']) for r in recipes], dtype=np.int8),
+        'cost': np.array([BUDGET_LEVELS.index(r['cost']) for r in recipes], dtype=np.int8),
+        'calories': np.array([r['calories'] for r in recipes], dtype=np.int16)
+    }
+
+def compatible_recipes(db, preferences):
+    """
+    Return a boolean mask of recipes allowed by the allergies, diet types and budget.
+
+    A recipe must avoid every selected allergen, suit every selected diet type
+    and cost no more than the selected budget level.
+    """
+    allergen_bits = np.uint8(to_bitmask(preferences['allergies'], ALLERGENS))
+    diet_bits = np.uint8(to_bitmask(preferences['diet_type'] or ['Regular'], DIET_TYPES))
+    budget = BUDGET_LEVELS.index(preferences['budget'])
+    return (
+        ((db['allergen_mask'] & allergen_bits) == 0)
+        & ((db['diet_mask'] & diet_bits) == diet_bits)
+        & (db['cost'] <= budget)
+    )
+
+def preference_seed(preferences):
+    """Derive a stable integer seed from the preferences, so equal inputs give equal plans."""
+    encoded = json.dumps(preferences, sort_keys=True, default=str).encode('utf-8')
+    return int.from_bytes(hashlib.sha256(encoded).digest()[:4], 'little')
+
+def build_weekly_plan(preferences, days=7, calorie_target=DAILY_CALORIE_TARGET, db=None):
+    """
+    Deterministically assemble a meal plan from the recipe database.
+
+    Each slot takes the compatible recipe whose calories best fit the slot's
+    share of the daily target (adjusted for what earlier slots that day
+    over- or undershot), preferring matching tastes and avoiding recipes used
+    in the last few days.
+
+    Args:
+        preferences (dict): Dictionary containing user dietary preferences
+        days (int): Number of days to plan
+        calorie_target (int): Daily calorie target
+        db (dict): Recipe database, loaded from the default location if omitted
+
+    Returns:
+        list: One list per day of (slot name, recipe dict or None) tuples
+    """
+    db = db or load_recipe_database()
+    allowed = compatible_recipes(db, preferences)
+    tastes = [taste for taste in preferences.get('taste_preferences', []) if taste != 'All']
+    taste_bits = np.uint8(to_bitmask(tastes, TASTES))
+    seed = preference_seed(preferences)
+    last_used = np.full(len(db['recipes']), -REPEAT_WINDOW_DAYS - 1, dtype=np.int16)
+
+    plan = []
+    for day in range(days):
+        day_plan = []
+        remaining_share = 1.0
+        deficit = 0.0
+        for slot_index, (slot_name, meal_type, share) in enumerate(MEAL_SLOTS):
+            candidates = np.flatnonzero(allowed & (db['meal'] == MEAL_TYPES.index(meal_type)))
+            if len(candidates) == 0:
+                day_plan.append((slot_name, None))
+                remaining_share -= share
+                continue
+
+            # Spread the day's running calorie deficit over the remaining slots
+            target = calorie_target * share + deficit * share / remaining_share
+            calories = db['calories'][candidates].astype(np.float64)
+            score = np.abs(calories - target)
+            if taste_bits:
+                score += TASTE_MISMATCH_PENALTY * ((db['taste_mask'][candidates] & taste_bits) == 0)
+            score += REPEAT_PENALTY * ((day - last_used[candidates]) < REPEAT_WINDOW_DAYS)
+            score += ROTATION_WEIGHT * ((np.arange(len(candidates)) + seed + day * len(MEAL_SLOTS) + slot_index)
+                                        % len(candidates))
+
+            choice = candidates[int(np.argmin(score))]
+            last_used[choice] = day
+            deficit += calorie_target * share - float(db['calories'][choice])
+            remaining_share -= share
+            day_plan.append((slot_name, db['recipes'][choice]))
+        plan.append(day_plan)
+    return plan
+
+def format_quantity(quantity):
+    """Format an ingredient quantity without trailing zeros."""
+    return f"{quantity:g}"
+
+def format_weekly_plan(plan):
+    """Render a plan from build_weekly_plan as markdown."""
+    lines = []
+    for day_number, day_plan in enumerate(plan, start=1):
+        lines.append(f"## Day {day_number}")
+        total = 0
+        for slot_name, recipe in day_plan:
+            if recipe is None:
+                lines.append(f"### {slot_name}\nNo recipe in the database matches your restrictions for this meal.")
+                continue
+            total += recipe['calories']
+            lines.append(f"### {slot_name}: {recipe['name']} ({recipe['calories']} kcal)")
+            for ingredient in recipe['ingredients']:
+                lines.append(f"- {format_quantity(ingredient['quantity'])} {ingredient['unit']} {ingredient['item']}")
+            lines.append(f"\n*{recipe['instructions']}*\n")
+        lines.append(f"**Daily total: {total} kcal**\n")
+    return "\n".join(lines)
+
+def plan_ingredients(plan):
+    """Return the ingredients of every meal in a plan from build_weekly_plan, for grocery aggregation."""
+    return [
+        ingredient
+        for day_plan in plan
+        for _, recipe in day_plan if recipe
+        for ingredient in recipe['ingredients']
+    ]
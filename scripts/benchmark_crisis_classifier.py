@@ -0,0 +1,63 @@
+"""
+Accuracy and latency benchmark for the crisis-language pre-classifier.
+
+Runs crisis_classifier.classify_message over the labelled messages in
+data/crisis_messages.jsonl, reports precision, recall and misclassified
+messages, then times classification per message.
+
+Usage (from the repository root):
+    python -m scripts.benchmark_crisis_classifier [--repeat 200] [--max-p99-ms 1.0]
+"""
+import os
+import json
+import time
+import argparse
+import numpy as np
+from crisis_classifier import classify_message
+
+DEFAULT_DATASET_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    "data", "crisis_messages.jsonl")
+
+def load_labelled_messages(path):
+    """Read (text, label) pairs from a JSON lines file."""
+    with open(path, 'r', encoding='utf-8') as dataset_file:
+        return [(row['text'], bool(row['label'])) for row in map(json.loads, dataset_file) if row]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the crisis-language pre-classifier.")
+    parser.add_argument("--dataset", default=DEFAULT_DATASET_PATH, help="Labelled JSON lines file")
+    parser.add_argument("--repeat", type=int, default=200, help="Timing passes over the dataset")
+    parser.add_argument("--max-p99-ms", type=float, default=1.0,
+                        help="Fail if the 99th percentile latency exceeds this")
+    args = parser.parse_args()
+
+    messages = load_labelled_messages(args.dataset)
+    true_positives = false_positives = false_negatives = 0
+    for text, label in messages:
+        flagged = classify_message(text)['crisis']
+        true_positives += flagged and label
+        false_positives += flagged and not label
+        false_negatives += label and not flagged
+        if flagged != label:
+            print(f"  {'false positive' if flagged else 'false negative'}: {text}")
+
+    precision = true_positives / (true_positives + false_positives) if true_positives + false_positives else 0.0
+    recall = true_positives / (true_positives + false_negatives) if true_positives + false_negatives else 0.0
+    print(f"{len(messages)} messages: precision {precision:.3f}, recall {recall:.3f}")
+
+    timings = np.empty(len(messages) * args.repeat)
+    index = 0
+    for _ in range(args.repeat):
+        for text, _ in messages:
+            start = time.perf_counter()
+            classify_message(text)
+            timings[index] = time.perf_counter() - start
+            index += 1
+    timings *= 1000
+    p99 = np.percentile(timings, 99)
+    print(f"Latency per message: median {np.median(timings) * 1000:.1f}us, "
+          f"p99 {p99 * 1000:.1f}us, max {timings.max() * 1000:.1f}us")
+    return 1 if p99 > args.max_p99_ms else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
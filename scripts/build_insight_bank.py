@@ -0,0 +1,45 @@
+"""
+Offline build step for the quiz insight bank.
+
+Generates the "Learn More" insight for every question in the question store and
+stores them in the versioned bundle read by insight_bank.py. Only questions
+whose text changed since the last build are regenerated.
+
+Usage (from the repository root):
+    python -m scripts.build_insight_bank [--force] [--workers 8]
+"""
+import argparse
+import time
+from insight_bank import INSIGHT_BANK_PATH, build_insight_bank
+from question_store import iter_questions
+from sections.Quiz import (
+    INSIGHT_PROMPT_VERSION, get_question_store, get_educational_insight, get_question_topic
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the precomputed quiz insight bank.")
+    parser.add_argument("--path", default=INSIGHT_BANK_PATH, help="Bundle location")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent LLM requests")
+    parser.add_argument("--force", action="store_true", help="Regenerate every insight")
+    args = parser.parse_args()
+
+    get_question_store()
+    start = time.perf_counter()
+    stats = build_insight_bank(
+        iter_questions(),
+        generate_insight=get_educational_insight,
+        topic_for=get_question_topic,
+        prompt_version=INSIGHT_PROMPT_VERSION,
+        path=args.path,
+        max_workers=args.workers,
+        force=args.force
+    )
+    elapsed = time.perf_counter() - start
+    print(
+        f"{args.path}: {stats['generated']} generated, {stats['reused']} reused, "
+        f"{stats['removed']} removed, {stats['failed']} failed in {elapsed:.1f}s"
+    )
+    return 1 if stats['failed'] else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
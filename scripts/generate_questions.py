@@ -0,0 +1,219 @@
+"""
+Offline pipeline that grows the quiz question store with LLM-generated questions.
+
+Candidate questions are requested concurrently through the utils LLM helpers,
+validated against the QUIZ_QUESTIONS schema and checked for near-duplicates
+with MinHash signatures and locality-sensitive hashing, so each candidate is
+only compared against the few questions that share an LSH bucket with it.
+Accepted questions are written to the question store.
+
+Usage (from the repository root):
+    python -m scripts.generate_questions --topics screening nutrition --batches 20 --per-batch 10
+"""
+import re
+import json
+import time
+import hashlib
+import argparse
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils import initialize_groq_client, get_ai_response
+from question_store import DIFFICULTY_LEVELS, add_questions, iter_questions, list_tags
+from sections.Quiz import get_question_store
+
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 32
+DUPLICATE_THRESHOLD = 0.6
+MERSENNE_PRIME = (1 << 61) - 1
+
+def build_generation_prompt(topic, count, difficulty):
+    """Build the LLM prompt for a batch of quiz questions on a topic."""
+    return f"""
+    Write {count} new multiple-choice questions for a cancer awareness quiz.
+    Topic: {topic}
+    Difficulty: {difficulty}
+
+    Respond with only a JSON array. Each element must have exactly these keys:
+    - "question": the question text
+    - "options": a list of 4 distinct answer options
+    - "correct": the 0-based index of the correct option
+    - "explanation": one or two sentences explaining the correct answer
+
+    Questions must be factually accurate, based on current guidance from major
+    health organizations, and must not repeat each other.
+    """
+
+def parse_candidates(response):
+    """Extract the JSON array of candidate questions from an LLM response."""
+    response = re.sub(r'<think>.*?</think>', '', response, flags=re.DOTALL)
+    start, end = response.find('['), response.rfind(']')
+    if start == -1 or end <= start:
+        return []
+    try:
+        candidates = json.loads(response[start:end + 1])
+    except json.JSONDecodeError:
+        return []
+    return candidates if isinstance(candidates, list) else []
+
+def validate_question(candidate, topic, difficulty):
+    """
+    Check a candidate against the question schema.
+
+    Returns:
+        dict: A normalized question ready for the store, or None if the candidate is invalid
+    """
+    if not isinstance(candidate, dict):
+        return None
+    question = candidate.get("question")
+    options = candidate.get("options")
+    correct = candidate.get("correct")
+    explanation = candidate.get("explanation")
+    if not isinstance(question, str) or not question.strip():
+        return None
+    if not isinstance(options, list) or len(options) != 4:
+        return None
+    if not all(isinstance(option, str) and option.strip() for option in options):
+        return None
+    if len({option.strip().lower() for option in options}) != 4:
+        return None
+    if not isinstance(correct, int) or isinstance(correct, bool) or not 0 <= correct < 4:
+        return None
+    if not isinstance(explanation, str) or not explanation.strip():
+        return None
+    return {
+        "question": question.strip(),
+        "options": [option.strip() for option in options],
+        "correct": correct,
+        "explanation": explanation.strip(),
+        "tags": [topic],
+        "difficulty": difficulty
+    }
+
+def shingles(question, size=3):
+    """Return hashed word shingles of a question's text and options."""
+    words = re.findall(r'[a-z0-9%]+', (question["question"] + ' ' + ' '.join(question["options"])).lower())
+    grams = {' '.join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(gram.encode('utf-8'), digest_size=4).digest(), 'little') for gram in grams],
+        dtype=np.uint64
+    )
+
+def make_minhash(num_permutations=MINHASH_PERMUTATIONS, seed=1):
+    """Return a function mapping shingle hashes to a MinHash signature."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 32, size=(num_permutations, 1), dtype=np.uint64)
+    b = rng.integers(0, 1 << 32, size=(num_permutations, 1), dtype=np.uint64)
+
+    def minhash(shingle_hashes):
+        # (a * x + b) stays below 2^64 for 32-bit a, b and x
+        permuted = (a * shingle_hashes[np.newaxis, :] + b) % MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    return minhash
+
+def create_lsh_index(bands=LSH_BANDS):
+    """Return an empty LSH index over MinHash signatures."""
+    return {'bands': bands, 'buckets': {}, 'signatures': []}
+
+def lsh_candidates(index, signature):
+    """Return positions of indexed signatures sharing at least one band bucket with signature."""
+    candidates = set()
+    for band, chunk in enumerate(np.split(signature, index['bands'])):
+        candidates.update(index['buckets'].get((band, chunk.tobytes()), ()))
+    return candidates
+
+def lsh_insert(index, signature):
+    """Add a signature to the LSH index."""
+    position = len(index['signatures'])
+    index['signatures'].append(signature)
+    for band, chunk in enumerate(np.split(signature, index['bands'])):
+        index['buckets'].setdefault((band, chunk.tobytes()), []).append(position)
+
+def is_near_duplicate(index, signature, threshold=DUPLICATE_THRESHOLD):
+    """Check a signature against its LSH candidates using estimated Jaccard similarity."""
+    for position in lsh_candidates(index, signature):
+        if np.mean(index['signatures'][position] == signature) >= threshold:
+            return True
+    return False
+
+def generate_batch(topic, count, difficulty):
+    """Request one batch of candidate questions from the LLM."""
+    client = initialize_groq_client()
+    response = get_ai_response(client, build_generation_prompt(topic, count, difficulty))
+    if response.startswith("Error"):
+        raise RuntimeError(response)
+    return parse_candidates(response)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate new quiz questions into the question store.")
+    parser.add_argument("--topics", nargs="+", help="Topics to generate for (default: existing tags)")
+    parser.add_argument("--difficulties", nargs="+", default=DIFFICULTY_LEVELS, choices=DIFFICULTY_LEVELS)
+    parser.add_argument("--batches", type=int, default=5, help="Batches per topic and difficulty")
+    parser.add_argument("--per-batch", type=int, default=10, help="Questions requested per batch")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent LLM requests")
+    parser.add_argument("--threshold", type=float, default=DUPLICATE_THRESHOLD,
+                        help="Estimated Jaccard similarity above which a candidate is a duplicate")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and deduplicate without writing")
+    args = parser.parse_args()
+
+    get_question_store()
+    topics = args.topics or list_tags()
+    minhash = make_minhash()
+    index = create_lsh_index()
+    for question in iter_questions():
+        lsh_insert(index, minhash(shingles(question)))
+
+    stats = {'requests': 0, 'failed_requests': 0, 'candidates': 0, 'invalid': 0, 'duplicates': 0, 'accepted': 0}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(generate_batch, topic, args.per_batch, difficulty): (topic, difficulty)
+            for topic in topics
+            for difficulty in args.difficulties
+            for _ in range(args.batches)
+        }
+        for future in as_completed(futures):
+            topic, difficulty = futures[future]
+            stats['requests'] += 1
+            try:
+                candidates = future.result()
+            except Exception as e:
+                stats['failed_requests'] += 1
+                print(f"  request failed ({topic}, {difficulty}): {e}")
+                continue
+
+            accepted = []
+            for candidate in candidates:
+                stats['candidates'] += 1
+                question = validate_question(candidate, topic, difficulty)
+                if question is None:
+                    stats['invalid'] += 1
+                    continue
+                signature = minhash(shingles(question))
+                if is_near_duplicate(index, signature, args.threshold):
+                    stats['duplicates'] += 1
+                    continue
+                lsh_insert(index, signature)
+                accepted.append(question)
+
+            if args.dry_run:
+                stats['accepted'] += len(accepted)
+            elif accepted:
+                stats['accepted'] += len(add_questions(accepted))
+
+            elapsed = time.perf_counter() - start
+            print(
+                f"[{stats['requests']}/{len(futures)}] {stats['candidates']} candidates, "
+                f"{stats['accepted']} accepted ({stats['candidates'] / elapsed:.1f} candidates/s)"
+            )
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Done in {elapsed:.1f}s: {stats['accepted']} accepted, {stats['duplicates']} near-duplicates, "
+        f"{stats['invalid']} invalid, {stats['failed_requests']}/{stats['requests']} failed requests; "
+        f"{stats['candidates'] / elapsed if elapsed else 0:.1f} candidates/s"
+    )
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
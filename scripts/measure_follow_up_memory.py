@@ -0,0 +1,64 @@
+"""
+Measure the memory per follow-up record, dict records versus columnar buffers.
+
+Generates random follow-up records shaped like the monitoring form's output,
+stores them both as the former list of dicts and in a follow_up_records
+buffer, and reports the deep size of each in bytes per record.
+
+Usage (from the repository root):
+    python -m scripts.measure_follow_up_memory [--records 1000] [--notes-length 0]
+"""
+import sys
+import random
+import argparse
+from datetime import date, timedelta
+from follow_up_records import SYMPTOMS, METRIC_LEVELS, new_follow_up_buffer, append_follow_up, buffer_nbytes
+
+def deep_sizeof(value, seen=None):
+    """Return the size of a Python object including everything it references."""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(deep_sizeof(item, seen) for item in value)
+    return size
+
+def random_record(day, rng, notes_length):
+    """Build one record as the monitoring form does."""
+    return {
+        'date': date(2024, 1, 1) + timedelta(days=day),
+        'weight': rng.randint(45, 110),
+        'blood_pressure': f"{rng.randint(95, 160)}/{rng.randint(55, 100)}",
+        'temperature': round(rng.uniform(36.0, 38.5), 1),
+        'symptom_levels': {symptom: rng.randint(1, 10) for symptom in rng.sample(SYMPTOMS, rng.randint(0, 6))},
+        **{metric: rng.choice(levels) for metric, levels in METRIC_LEVELS.items()},
+        'notes': "x" * notes_length
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare follow-up record memory use.")
+    parser.add_argument("--records", type=int, default=1000, help="Number of records")
+    parser.add_argument("--notes-length", type=int, default=0, help="Characters of notes per record")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    records = [random_record(day, rng, args.notes_length) for day in range(args.records)]
+    buffer = new_follow_up_buffer()
+    for record in records:
+        append_follow_up(buffer, record)
+
+    # Small ints and interned strings are shared in CPython; count them once as the dicts do in practice
+    dict_bytes = deep_sizeof(records)
+    columnar_bytes = buffer_nbytes(buffer)
+    print(f"{args.records} records")
+    print(f"  list of dicts:     {dict_bytes / args.records:8.1f} bytes/record")
+    print(f"  columnar buffers:  {columnar_bytes / args.records:8.1f} bytes/record "
+          f"(capacity {len(buffer['date'])})")
+    print(f"  reduction:         {dict_bytes / columnar_bytes:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Local mock of the image classification Space for offline testing.
+
+Serves the mock backend's deterministic predictions through a Gradio app
+with the same shape as the Space: fn_index 0 takes an image and returns
+the path of a JSON file with the prediction, so the real client path
+(predict_with_gradio, predict_image, reconnect_image_client) runs offline.
+The app's client passes the image as a local file path, which current
+Gradio only accepts as text, so the mock (on the same machine) reads the
+image from that path. Needs the gradio package
+(pip install -r requirements-optional.txt).
+
+Usage (from the repository root):
+    python -m scripts.mock_gradio_server [--port 7860] [--latency 0.2]
+then run the app with IMAGE_MODEL_ENDPOINT=http://127.0.0.1:7860/
+"""
+import json
+import argparse
+import tempfile
+import image_backends
+
+def predict(image_path):
+    """Write the mock prediction for an image file to a JSON file and return its path."""
+    with open(image_path, 'rb') as image_file:
+        result = image_backends.predict_with_mock(image_file.read())
+    with tempfile.NamedTemporaryFile('w', delete=False, suffix=".json") as result_file:
+        json.dump(result, result_file)
+    return result_file.name
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve mock image classifications through Gradio.")
+    parser.add_argument("--port", type=int, default=7860, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=image_backends.MOCK_LATENCY_SECONDS,
+                        help="Simulated inference time per image in seconds")
+    args = parser.parse_args()
+
+    try:
+        import gradio as gr
+    except ImportError:
+        print("The mock server needs the gradio package (pip install -r requirements-optional.txt)")
+        return 1
+
+    image_backends.MOCK_LATENCY_SECONDS = args.latency
+    demo = gr.Interface(fn=predict, inputs=gr.Textbox(), outputs=gr.File())
+    demo.queue(default_concurrency_limit=None).launch(server_name="127.0.0.1", server_port=args.port)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+"""
+Local mock of the Groq chat completions API for offline and load testing.
+
+Answers POST /openai/v1/chat/completions with a canned completion after a
+simulated model latency, so the real Groq SDK path (HTTP, JSON parsing,
+retries) is exercised without network access or an API key. Meal plan day
+prompts get a few INGREDIENT lines so grocery aggregation has data.
+
+Usage (from the repository root):
+    python -m scripts.mock_groq_server [--port 8765] [--latency 0.5]
+then run the app with GROQ_BASE_URL=http://127.0.0.1:8765 GROQ_API_KEY=mock
+"""
+import json
+import time
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+MOCK_INGREDIENT_LINES = [
+    "INGREDIENT: 1/2 | cup | rolled oats | Grains and starches",
+    "INGREDIENT: 150 | grams | spinach | Produce (vegetables)",
+    "INGREDIENT: 1 | tbsp | olive oil | Pantry",
+    "INGREDIENT: 2 | | eggs | Proteins"
+]
+
+def mock_completion(messages, model):
+    """Return a chat completion payload answering the last message."""
+    prompt = messages[-1]['content'] if messages else ""
+    content = f"Mock response from {model}.\n\n{prompt[:200].strip()}"
+    if "INGREDIENT:" in prompt:
+        content += "\n\n### Breakfast\n" + "\n".join(MOCK_INGREDIENT_LINES)
+    prompt_tokens = sum(len(message.get('content', '')) for message in messages) // 4
+    completion_tokens = len(content) // 4
+    return {
+        'id': f"chatcmpl-mock-{time.time_ns()}",
+        'object': "chat.completion",
+        'created': int(time.time()),
+        'model': model,
+        'choices': [{'index': 0, 'finish_reason': "stop",
+                     'message': {'role': "assistant", 'content': content}}],
+        'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                  'total_tokens': prompt_tokens + completion_tokens}
+    }
+
+def make_handler(latency):
+    """Build a request handler class that answers after the given latency."""
+    class MockGroqHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if self.path.rstrip("/") != COMPLETIONS_PATH:
+                self.send_error(404)
+                return
+            request = json.loads(body or b"{}")
+            time.sleep(latency)
+            payload = json.dumps(mock_completion(request.get('messages', []), request.get('model', "mock"))).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', "application/json")
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockGroqHandler
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve mock Groq chat completions.")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated model latency per request in seconds")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.latency))
+    print(f"Mock Groq API on http://127.0.0.1:{args.port} ({args.latency}s latency)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
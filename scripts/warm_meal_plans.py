@@ -0,0 +1,50 @@
+"""
+Offline warming job for the meal plan store.
+
+Pre-generates plans for the most frequently requested preference combinations
+that have no stored plan yet (or whose plan is older than --max-age-days), so
+those users get their plan instantly.
+
+Usage (from the repository root):
+    python -m scripts.warm_meal_plans --top 50 [--workers 2]
+"""
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from meal_plan_store import MEAL_PLAN_MAX_AGE_DAYS, most_requested_preferences, save_meal_plan
+from sections.MealPlanner import generate_meal_plan
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate meal plans for popular preference combinations.")
+    parser.add_argument("--top", type=int, default=50, help="Number of most requested combinations to warm")
+    parser.add_argument("--max-age-days", type=float, default=MEAL_PLAN_MAX_AGE_DAYS,
+                        help="Regenerate stored plans older than this")
+    parser.add_argument("--workers", type=int, default=2,
+                        help="Plans generated concurrently (each plan already runs its days in parallel)")
+    args = parser.parse_args()
+
+    popular = most_requested_preferences(args.top)
+    pending = [
+        preferences for preferences, _, age_days in popular
+        if age_days is None or age_days > args.max_age_days
+    ]
+    print(f"{len(popular)} popular combinations, {len(pending)} need a plan")
+
+    start = time.perf_counter()
+    generated = failed = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(generate_meal_plan, preferences): preferences for preferences in pending}
+        for future in as_completed(futures):
+            plan = future.result()
+            if plan.startswith("Error"):
+                failed += 1
+                print(f"  failed: {plan}")
+                continue
+            save_meal_plan(futures[future], plan)
+            generated += 1
+
+    print(f"Warmed {generated} plans ({failed} failed) in {time.perf_counter() - start:.1f}s")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,5 +1,42 @@
+import os
 import streamlit as st
-from utils import create_sidebar_navigation, initialize_groq_client, get_ai_response
+from utils import create_sidebar_navigation, initialize_groq_client, get_ai_response, get_chat_response
+from chat_memory import (
+    CHAT_SUMMARY_MAX_TOKENS, new_conversation, add_turn, compact_conversation, build_chat_messages
+)
+from crisis_classifier import classify_message
+
+CHAT_REPLY_MAX_TOKENS = 1200
+# Messages flagged by the crisis classifier skip the reasoning model for a faster, shorter reply
+PRIORITY_SUPPORT_MODEL = os.getenv("PRIORITY_SUPPORT_MODEL", "llama-3.3-70b-versatile")
+PRIORITY_MAX_TOKENS = 500
+
+SUPPORT_SYSTEM_PROMPT = """
+You are a compassionate AI companion for someone affected by cancer, talking with them over several messages.
+
+Provide warm, empathetic responses that:
+1. Acknowledge their emotions with genuine understanding
+2. Offer specific comfort based on their situation and what they shared earlier
+3. Suggest a practical coping strategy, without repeating ones already suggested
+4. Include relevant scientific insights when appropriate
+5. End with words of encouragement
+
+Keep the tone gentle, supportive, and hopeful.
+"""
+
+CRISIS_SYSTEM_PROMPT = """
+You are a compassionate AI companion for someone affected by cancer. Their latest message suggests
+they may be thinking about suicide or self-harm.
+
+Respond briefly and warmly:
+1. Acknowledge their pain without judgement
+2. Tell them clearly that they deserve support right now and they are not alone
+3. Urge them to contact the Crisis Line (1-800-273-8255, or call or text 988 in the US) or
+   emergency services (911) if they are in immediate danger
+4. Gently ask whether they are safe right now
+
+Do not offer coping exercises or scientific insights in this reply.
+"""
 
 def analyze_emotion_and_generate_support(message):
     """
@@ -31,6 +68,87 @@ def analyze_emotion_and_generate_support(message):
     
     return get_ai_response(client, prompt)
 
+def generate_crisis_support(message):
+    """
+    Generate a short crisis-aware response on the priority model.
+    
+    Args:
+        message (str): User's message, flagged by the crisis classifier
+    
+    Returns:
+        str: Supportive AI response
+    """
+    client = initialize_groq_client()
+    if not client:
+        return "Error: Unable to initialize AI client"
+
+    messages = [
+        {'role': 'system', 'content': CRISIS_SYSTEM_PROMPT},
+        {'role': 'user', 'content': message}
+    ]
+    return get_chat_response(client, messages, model=PRIORITY_SUPPORT_MODEL, max_tokens=PRIORITY_MAX_TOKENS)
+
+def show_crisis_resources():
+    """Display the 24/7 support resources."""
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("""
+            #### Immediate Support
+            - Cancer Support Helpline: 1-800-227-2345
+            - Crisis Line: 1-800-273-8255
+            - Emergency: 911
+        """)
+    
+    with col2:
+        st.markdown("""
+            #### Online Resources
+            - [Cancer.org Support](https://www.cancer.org/support-programs-and-services.html)
+            - [CancerCare.org](https://www.cancercare.org/counseling)
+            - [Cancer Support Community](https://www.cancersupportcommunity.org/)
+        """)
+
+def show_crisis_banner():
+    """Surface the crisis resources immediately, before any AI response."""
+    st.error("💛 It sounds like you may be going through something very painful. "
+             "You don't have to face this alone — please reach out for support right now.")
+    show_crisis_resources()
+
+def continue_support_conversation(conversation, message, crisis=False):
+    """
+    Generate the next supportive reply in a multi-turn conversation.
+    
+    Older turns are folded into the conversation's rolling summary first, so
+    the prompt stays within the chat token budget.
+    
+    Args:
+        conversation (dict): Conversation state from chat_memory.new_conversation
+        message (str): User's new message
+        crisis (bool): The crisis classifier flagged the message; reply on the priority model
+    
+    Returns:
+        str: Supportive AI response
+    """
+    client = initialize_groq_client()
+    if not client:
+        return "Error: Unable to initialize AI client"
+
+    if crisis:
+        # Don't hold a crisis reply up behind a summary call
+        messages = build_chat_messages(conversation, CRISIS_SYSTEM_PROMPT, message)
+        response = get_chat_response(client, messages, model=PRIORITY_SUPPORT_MODEL,
+                                     max_tokens=PRIORITY_MAX_TOKENS)
+    else:
+        compact_conversation(
+            conversation,
+            lambda prompt: get_ai_response(client, prompt, max_tokens=CHAT_SUMMARY_MAX_TOKENS * 2)
+        )
+        messages = build_chat_messages(conversation, SUPPORT_SYSTEM_PROMPT, message)
+        response = get_chat_response(client, messages, max_tokens=CHAT_REPLY_MAX_TOKENS)
+    if not response.startswith("Error"):
+        add_turn(conversation, message, response)
+    return response
+
 def emotional_support_page():
     # Create consistent navigation
     create_sidebar_navigation()
@@ -44,23 +162,74 @@ def emotional_support_page():
     understand, and provide supportive guidance through your cancer journey.
     """)
     
-    # Message Input Section
-    with st.form("emotion_support_form"):
-        user_message = st.text_area(
-            "Share what's on your mind...",
-            height=150,
-            placeholder="I'm feeling overwhelmed with everything happening..."
-        )
-        
-        submitted = st.form_submit_button("Get Support")
-    
-    if submitted and user_message:
-        with st.spinner("Processing your message with care..."):
-            support_response = analyze_emotion_and_generate_support(user_message)
+    if 'support_conversation' not in st.session_state:
+        st.session_state.support_conversation = new_conversation()
+        st.session_state.support_messages = []
+
+    conversation_mode = st.toggle(
+        "Conversation mode",
+        help="Have an ongoing conversation; the companion remembers what you shared earlier"
+    )
+
+    if conversation_mode:
+        # The full history is only displayed; prompts carry a bounded window plus a summary
+        for role, content in st.session_state.support_messages:
+            with st.chat_message(role):
+                st.markdown(content)
+
+        user_message = st.chat_input("Share what's on your mind...")
+        if user_message:
+            with st.chat_message("user"):
+                st.markdown(user_message)
+            crisis = classify_message(user_message)['crisis']
+            if crisis:
+                show_crisis_banner()
+            with st.chat_message("assistant"):
+                with st.spinner("Processing your message with care..."):
+                    support_response = continue_support_conversation(
+                        st.session_state.support_conversation, user_message, crisis=crisis
+                    )
+                if support_response.startswith("Error"):
+                    st.error(support_response)
+                else:
+                    st.markdown(support_response)
+                    st.session_state.support_messages.append(("user", user_message))
+                    st.session_state.support_messages.append(("assistant", support_response))
+
+        if st.session_state.support_messages:
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.caption(f"Last prompt: ~{st.session_state.support_conversation['last_prompt_tokens']} tokens")
+            with col2:
+                if st.button("Start a new conversation"):
+                    st.session_state.support_conversation = new_conversation()
+                    st.session_state.support_messages = []
+                    st.rerun()
+    else:
+        # Message Input Section
+        with st.form("emotion_support_form"):
+            user_message = st.text_area(
+                "Share what's on your mind...",
+                height=150,
+                placeholder="I'm feeling overwhelmed with everything happening..."
+            )
             
-            # Display response in a styled container
-            st.markdown("### Your AI Companion's Response")
-            st.info(support_response)
+            submitted = st.form_submit_button("Get Support")
+        
+        if submitted and user_message:
+            # Checked locally before any LLM call, so resources appear without waiting
+            crisis = classify_message(user_message)['crisis']
+            if crisis:
+                show_crisis_banner()
+            with st.spinner("Processing your message with care..."):
+                if crisis:
+                    support_response = generate_crisis_support(user_message)
+                else:
+                    support_response = analyze_emotion_and_generate_support(user_message)
+                
+                # Display response in a styled container
+                st.markdown("### Your AI Companion's Response")
+                st.info(support_response)
     
     # Quick Access Support Tools
     st.markdown("### 🧘‍♀️ Support Tools")
@@ -108,23 +277,7 @@ def emotional_support_page():
     
     # Emergency Resources
     st.markdown("### 🆘 24/7 Support Resources")
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("""
-            #### Immediate Support
-            - Cancer Support Helpline: 1-800-227-2345
-            - Crisis Line: 1-800-273-8255
-            - Emergency: 911
-        """)
-    
-    with col2:
-        st.markdown("""
-            #### Online Resources
-            - [Cancer.org Support](https://www.cancer.org/support-programs-and-services.html)
-            - [CancerCare.org](https://www.cancercare.org/counseling)
-            - [Cancer Support Community](https://www.cancersupportcommunity.org/)
-        """)
+    show_crisis_resources()
 
 if __name__ == "__main__":
     emotional_support_page() 
\ No newline at end of file
@@ -1,10 +1,231 @@
 import streamlit as st
+import pandas as pd
+from PIL import UnidentifiedImageError
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from utils import create_sidebar_navigation
-from gradio_client import Client
+from profiler import submit_in_context, profiled_fragment
+from image_client import preprocess_image
+from image_backends import IMAGE_BACKEND, run_prediction, backend_cache_version
+from prediction_cache import image_hash, get_cached_prediction, save_prediction
+from slide_tiling import SLIDE_EXTENSIONS, analyze_slide, heatmap_overlay
+from prediction_jobs import submit_job, get_job
+import shutil
 import tempfile
-import json
+import time
 import os
 
+IMAGE_BATCH_WORKERS = int(os.getenv("IMAGE_BATCH_WORKERS", "4"))
+IMAGE_PREDICTION_RETRIES = 2
+RETRY_BACKOFF_SECONDS = 1.0
+JOB_POLL_SECONDS = 1.0
+
+def classify_image(image_bytes):
+    """
+    Classify an image, reusing the cached result for identical image bytes.
+    
+    The cache is checked on the original bytes. Only a cache miss decodes
+    and downscales the image and runs it through the IMAGE_BACKEND backend.
+    
+    Args:
+        image_bytes (bytes): Contents of the uploaded image
+    
+    Returns:
+        tuple: (prediction result dict, whether it came from the cache,
+            backend inference latency in seconds or None when cached)
+    """
+    key = image_hash(image_bytes)
+    model_version = backend_cache_version()
+    cached = get_cached_prediction(key, model_version)
+    if cached is not None:
+        return cached, True, None
+
+    result, latency = run_prediction(preprocess_image(image_bytes))
+    save_prediction(key, model_version, result)
+    return result, False, latency
+
+def classify_image_with_retry(image_bytes, retries=IMAGE_PREDICTION_RETRIES):
+    """
+    Classify an image, retrying failed predictions with exponential backoff.
+    
+    Returns:
+        tuple: (prediction result dict, whether it came from the cache,
+            inference latency in seconds or None, attempts made)
+
+    Raises:
+        Exception: The last prediction error, with the attempts made in its
+            attempts attribute
+    """
+    for attempt in range(retries + 1):
+        try:
+            result, cached, latency = classify_image(image_bytes)
+            return result, cached, latency, attempt + 1
+        except Exception as e:
+            # Not an image, retrying won't help
+            if isinstance(e, UnidentifiedImageError) or attempt == retries:
+                e.attempts = attempt + 1
+                raise
+            time.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+def classify_batch(images, on_result, max_workers=IMAGE_BATCH_WORKERS):
+    """
+    Classify many images through a bounded thread pool.
+    
+    Args:
+        images (list): (file name, image bytes) tuples
+        on_result (callable): Called on the calling thread with a result row
+            dict as each image completes
+        max_workers (int): Maximum concurrent predictions
+    """
+    def run(name, image_bytes):
+        start = time.perf_counter()
+        result = {}
+        try:
+            result, cached, latency, attempts = classify_image_with_retry(image_bytes)
+            row = {'File': name, 'Status': 'Done', 'Cached': cached, 'Attempts': attempts,
+                   'Latency (ms)': round(latency * 1000) if latency is not None else None}
+        except Exception as e:
+            row = {'File': name, 'Status': f"Failed: {e}", 'Cached': False, 'Attempts': getattr(e, 'attempts', 1),
+                   'Latency (ms)': None}
+        row['Seconds'] = round(time.perf_counter() - start, 2)
+        # Prediction fields are extra columns; they never replace the table's own
+        row.update({key: value for key, value in result.items() if key not in row})
+        return row
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [submit_in_context(executor, run, name, image_bytes) for name, image_bytes in images]
+        for future in as_completed(futures):
+            on_result(future.result())
+
+def batch_analysis():
+    """Render the batch upload, streaming results table and CSV export."""
+    uploaded_files = st.file_uploader(
+        "Choose image files", type=["png", "jpg", "jpeg"], accept_multiple_files=True
+    )
+
+    if uploaded_files and st.button(f"Analyze {len(uploaded_files)} Images"):
+        rows = []
+        progress = st.progress(0.0, text="Analyzing images...")
+        table = st.empty()
+        start = time.perf_counter()
+
+        def on_result(row):
+            rows.append(row)
+            progress.progress(len(rows) / len(uploaded_files), text=f"Analyzed {len(rows)} of {len(uploaded_files)} images")
+            table.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+        classify_batch([(uploaded_file.name, uploaded_file.getvalue()) for uploaded_file in uploaded_files], on_result)
+        table.empty()
+        progress.empty()
+        st.session_state.image_batch_results = {
+            'rows': rows,
+            'seconds': time.perf_counter() - start
+        }
+
+    # Kept in session state so the table and download survive reruns
+    batch = st.session_state.get('image_batch_results')
+    if batch:
+        results = pd.DataFrame(batch['rows'])
+        failed = int((results['Status'] != 'Done').sum())
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Images", len(results))
+        col2.metric("Failed", failed)
+        col3.metric("Throughput", f"{len(results) / batch['seconds'] * 60:.1f} images/min")
+        st.dataframe(results, use_container_width=True, hide_index=True)
+        st.download_button(
+            label="Download Results (CSV)",
+            data=results.to_csv(index=False),
+            file_name="batch_predictions.csv",
+            mime="text/csv"
+        )
+
+def show_prediction_result(result):
+    """Display the fields of a prediction result as metrics."""
+    st.markdown("### Analysis Results")
+    for key, value in result.items():
+        if isinstance(value, (int, float)):
+            # Format numbers to 2 decimal places
+            st.metric(key.replace('_', ' ').title(), f"{value:.2f}")
+        else:
+            st.metric(key.replace('_', ' ').title(), value)
+
+def prediction_status(job):
+    """Return the status of a prediction job, or a finished status for a prediction served from the cache."""
+    if 'result' in job:
+        return {'status': 'done', 'result': job['result'], 'error': None, 'seconds': 0}
+    return get_job(job['id'])
+
+def render_prediction_jobs():
+    """Show the status of this session's prediction jobs, newest first."""
+    statuses = [(job, prediction_status(job)) for job in reversed(st.session_state.image_jobs)]
+    for job, status in statuses:
+        with st.container(border=True):
+            st.markdown(f"**{job['name']}**")
+            if status['status'] == 'running':
+                st.info(f"Analyzing image... ({status['seconds']:.0f}s)")
+            elif status['status'] == 'failed':
+                st.error(f"An error occurred during prediction: {status['error']}")
+            elif status['status'] == 'unknown':
+                st.warning("This prediction has expired, please submit it again.")
+            else:
+                result, cached, latency, _ = status['result']
+                st.success("Analysis Complete!")
+                if cached:
+                    st.caption("Cached result")
+                else:
+                    st.caption(f"Inference latency ({IMAGE_BACKEND} backend): {latency * 1000:.0f} ms")
+                show_prediction_result(result)
+
+    # Stop polling with a full rerun once everything this fragment was waiting for has finished
+    running = any(status['status'] == 'running' for _, status in statuses)
+    if st.session_state.image_jobs_polling and not running:
+        st.session_state.image_jobs_polling = False
+        st.rerun()
+
+def show_prediction_jobs():
+    """Render the prediction jobs, polling in a fragment while any is still running."""
+    running = any(prediction_status(job)['status'] == 'running' for job in st.session_state.image_jobs)
+    st.session_state.image_jobs_polling = running
+    st.fragment(profiled_fragment(render_prediction_jobs), run_every=JOB_POLL_SECONDS if running else None)()
+
+def slide_analysis():
+    """Render the whole-slide upload, tiled analysis and heatmap."""
+    uploaded_slide = st.file_uploader("Choose a whole-slide image", type=SLIDE_EXTENSIONS)
+
+    if uploaded_slide is not None and st.button("Analyze Slide"):
+        # Slide readers need a file path; copy the upload in chunks rather than as one bytes object
+        suffix = os.path.splitext(uploaded_slide.name)[1]
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+            shutil.copyfileobj(uploaded_slide, tmp_file)
+            tmp_file_path = tmp_file.name
+
+        progress = st.progress(0.0, text="Finding tissue...")
+        start = time.perf_counter()
+        try:
+            result = analyze_slide(
+                tmp_file_path,
+                on_progress=lambda done, total: progress.progress(done / total, text=f"Analyzed {done} of {total} tissue tiles")
+            )
+        except Exception as e:
+            st.error(f"An error occurred during slide analysis: {e}")
+            return
+        finally:
+            os.unlink(tmp_file_path)
+            progress.empty()
+
+        if result['slide_score'] is None:
+            st.warning("No tissue was found on this slide.")
+            return
+
+        st.success(f"Analysis Complete! ({time.perf_counter() - start:.1f}s)")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Slide Score", f"{result['slide_score']:.2f}")
+        col2.metric("Positive Tiles", f"{result['positive_fraction']:.0%}")
+        col3.metric("Tissue Tiles", f"{result['tiles_tissue']} of {result['tiles_total']}")
+        if result['tiles_failed']:
+            st.warning(f"{result['tiles_failed']} tiles could not be classified")
+        st.image(heatmap_overlay(result['thumbnail'], result['heatmap']),
+                 caption="Tile scores (blue = low, red = high)", use_container_width=True)
+
 def image_analysis_page():
     # Create consistent navigation
     create_sidebar_navigation()
@@ -15,62 +236,45 @@ def image_analysis_page():
     This tool analyzes microscopic images of breast tissue to assist in cancer detection.
     """)
 
+    if 'image_jobs' not in st.session_state:
+        st.session_state.image_jobs = []
+
+    analysis_mode = st.radio("Mode", ["Single image", "Batch", "Whole slide"], horizontal=True)
+    if analysis_mode == "Batch":
+        batch_analysis()
+        return
+    if analysis_mode == "Whole slide":
+        slide_analysis()
+        return
+
     # File uploader widget for image input
     uploaded_file = st.file_uploader("Choose an image file", type=["png", "jpg", "jpeg"])
 
     if uploaded_file is not None:
         # Display the uploaded image
         st.image(uploaded_file, caption="Uploaded Image", use_container_width=True)
-        
-        try:
-            # Save the uploaded file to a temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as tmp_file:
-                tmp_file.write(uploaded_file.read())
-                tmp_file_path = tmp_file.name
-
-            # Button to trigger prediction
-            if st.button("Get Prediction"):
-                with st.spinner("Analyzing image..."):
-                    try:
-                        # Create a Gradio client pointing to the remote endpoint
-                        client = Client("https://hasanah10105-breast-cancer-classification.hf.space/--replicas/12gx2/")
-                        
-                        # Get prediction
-                        result = client.predict(tmp_file_path, fn_index=0)
-                        
-                        # Parse and display results
-                        if isinstance(result, str):
-                            try:
-                                # Read the JSON file that was returned
-                                with open(result, 'r') as json_file:
-                                    result_dict = json.load(json_file)
-                                    st.success("Analysis Complete!")
-                                    
-                                    # Display prediction results in a formatted way
-                                    st.markdown("### Analysis Results")
-                                    for key, value in result_dict.items():
-                                        if isinstance(value, (int, float)):
-                                            # Format numbers to 2 decimal places
-                                            st.metric(key.replace('_', ' ').title(), f"{value:.2f}")
-                                        else:
-                                            st.metric(key.replace('_', ' ').title(), value)
-                            except (json.JSONDecodeError, FileNotFoundError) as e:
-                                st.error(f"Error reading prediction results: {e}")
-                                st.write("Raw result:", result)
-                        else:
-                            st.write("Prediction Result:", result)
-                            
-                    except Exception as e:
-                        st.error(f"An error occurred during prediction: {e}")
-        except Exception as e:
-            st.error(f"An error occurred while processing the image: {e}")
-        finally:
-            # Cleanup temporary file
-            if 'tmp_file_path' in locals():
-                try:
-                    os.unlink(tmp_file_path)
-                except Exception as e:
-                    st.warning(f"Could not delete temporary file: {e}")
+
+        # Button to trigger prediction; it runs as a background job so the page stays usable
+        if st.button("Get Prediction"):
+            image_bytes = uploaded_file.getvalue()
+            key = image_hash(image_bytes)
+            model_version = backend_cache_version()
+            # Keyed by content, so resubmitting the same image joins the existing job
+            job = {'id': f"{key}:{model_version}", 'name': uploaded_file.name}
+            cached = get_cached_prediction(key, model_version)
+            if cached is not None:
+                # Shown straight away, without a background job or polling
+                job['result'] = (cached, True, None, 1)
+            else:
+                submit_job(job['id'], classify_image_with_retry, image_bytes)
+            if job['id'] not in [existing['id'] for existing in st.session_state.image_jobs]:
+                st.session_state.image_jobs.append(job)
+
+    if st.session_state.image_jobs:
+        show_prediction_jobs()
+        if st.button("Clear Results"):
+            st.session_state.image_jobs = []
+            st.rerun()
 
 if __name__ == "__main__":
-    image_analysis_page()
\ No newline at end of file
+    image_analysis_page()
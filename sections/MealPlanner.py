@@ -1,49 +1,169 @@
+import os
+import time
 import streamlit as st
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from utils import initialize_groq_client, get_ai_response, create_sidebar_navigation
+from profiler import submit_in_context
+from meal_plan_store import canonicalize_preferences, record_request, get_saved_meal_plan, save_meal_plan
+from recipes import build_weekly_plan, format_weekly_plan, plan_ingredients
+from grocery import (
+    GROCERY_CATEGORIES, parse_ingredient_lines, render_ingredient_lines, aggregate_groceries,
+    format_grocery_list, grocery_csv
+)
 
-def generate_meal_plan(preferences):
+MEAL_PLAN_DAYS = 7
+DAY_MAX_TOKENS = 1400
+# Days of all sessions share one pool, which bounds the concurrent Groq calls per process
+MEAL_PLAN_WORKERS = int(os.getenv("MEAL_PLAN_WORKERS", "8"))
+DAY_RETRIES = 2
+RETRY_BACKOFF_SECONDS = 1.0
+NOTES_MAX_TOKENS = 700
+
+PLANNING_MODES = ["AI-generated", "Recipe database with AI notes", "Recipe database only (fast)"]
+
+# Each day is generated independently, so give every day its own emphasis to keep the week varied
+DAY_FOCUS = [
+    "leafy greens and berries",
+    "legumes and whole grains",
+    "omega-3 rich foods and seeds",
+    "cruciferous vegetables",
+    "colorful root vegetables and squash",
+    "Mediterranean staples such as olive oil, tomatoes and herbs",
+    "citrus fruits, garlic and fermented foods"
+]
+
+def format_preferences(preferences):
+    """Format dietary preferences for use in meal plan prompts."""
+    restrictions = ', '.join(preferences['allergies']) if preferences['allergies'] else 'None'
+    diet_type = ', '.join(preferences['diet_type']) if preferences['diet_type'] else 'Regular'
+    return f"""
+    - Dietary Restrictions: {restrictions}
+    - Diet Type: {diet_type}
+    - Budget Level: {preferences['budget']}
+    - Taste Preferences: {preferences['taste_preferences']}
+    """
+
+def build_day_prompt(preferences, day):
+    """Build the LLM prompt for a single day of the meal plan."""
+    return f"""
+    Create Day {day} of a 7-day cancer-friendly meal plan with these specifications:
+    {format_preferences(preferences)}
+    
+    For this day:
+    1. Focus on cancer-fighting foods and nutrients, emphasizing {DAY_FOCUS[(day - 1) % len(DAY_FOCUS)]}
+    2. Include breakfast, lunch, dinner, and two snacks
+    3. Provide portion sizes and basic preparation instructions
+    4. Consider the specified budget level
+    5. Include foods known for their anti-inflammatory properties
+    
+    Start with the header "## Day {day}" and use a sub-header for each meal.
+    Under each meal, list every ingredient for one serving on its own line in exactly this format:
+    INGREDIENT: <quantity> | <unit> | <ingredient name> | <category>
+    Use a number for the quantity, one of g, ml, cup, tbsp, tsp or piece as the unit, and one of
+    these categories: {', '.join(GROCERY_CATEGORIES)}.
+    Do not include a grocery list.
+    """
+
+@st.cache_resource
+def get_meal_plan_executor():
+    """Process-wide thread pool generating meal plan days."""
+    return ThreadPoolExecutor(max_workers=MEAL_PLAN_WORKERS, thread_name_prefix="meal-plan-day")
+
+def generate_day_plan(client, preferences, day, retries=DAY_RETRIES):
+    """Generate one day of the meal plan, retrying failed completions with exponential backoff."""
+    for attempt in range(retries + 1):
+        day_plan = get_ai_response(client, build_day_prompt(preferences, day), max_tokens=DAY_MAX_TOKENS)
+        if not day_plan.startswith("Error") or attempt == retries:
+            return day_plan
+        time.sleep(RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+def generate_meal_plan(preferences, on_section=None):
     """
     Generate a cancer-friendly meal plan using Groq API.
     
+    The seven days are generated concurrently on a shared pool, and a failed
+    day is retried before the plan is given up. Each meal lists its ingredients
+    as structured INGREDIENT lines, which plan_groceries aggregates into the
+    grocery list.
+    
     Args:
         preferences (dict): Dictionary containing user dietary preferences
+        on_section (callable): Optional callback receiving (day index, text) as
+            each day finishes
     
     Returns:
-        str: Generated meal plan and grocery list
+        str: Generated meal plan
     """
     client = initialize_groq_client()
     if not client:
         return "Error: Unable to initialize AI client"
 
-    # Format dietary restrictions
-    restrictions = ', '.join(preferences['allergies']) if preferences['allergies'] else 'None'
-    diet_type = ', '.join(preferences['diet_type']) if preferences['diet_type'] else 'Regular'
+    executor = get_meal_plan_executor()
+    day_plans = [None] * MEAL_PLAN_DAYS
+    futures = {
+        submit_in_context(executor, generate_day_plan, client, preferences, day + 1): day
+        for day in range(MEAL_PLAN_DAYS)
+    }
+    for future in as_completed(futures):
+        day = futures[future]
+        day_plans[day] = future.result()
+        if day_plans[day].startswith("Error"):
+            # Days still queued are dropped; the plan can't be completed anyway
+            for pending in futures:
+                pending.cancel()
+            return day_plans[day]
+        if on_section:
+            on_section(day, day_plans[day])
 
-    prompt = f"""
-    Create a 7-day cancer-friendly meal plan and grocery list with these specifications:
-    - Dietary Restrictions: {restrictions}
-    - Diet Type: {diet_type}
-    - Budget Level: {preferences['budget']}
-    - Taste Preferences: {preferences['taste_preferences']}
-    
-    The meal plan should:
-    1. Focus on cancer-fighting foods and nutrients
-    2. Include breakfast, lunch, dinner, and two snacks for each day
-    3. Provide portion sizes and basic preparation instructions
-    4. Consider the specified budget level
-    5. Include foods known for their anti-inflammatory properties
+    return "\n\n".join(day_plans)
+
+def plan_groceries(meal_plan):
+    """Aggregate the INGREDIENT lines of a generated meal plan into a grocery list DataFrame."""
+    return aggregate_groceries(parse_ingredient_lines(meal_plan))
+
+def build_plan_notes_prompt(preferences, plan):
+    """Build the LLM prompt for a short narrative introduction to a recipe database plan."""
+    menu = "\n".join(
+        f"Day {day}: " + ", ".join(recipe['name'] for _, recipe in day_plan if recipe)
+        for day, day_plan in enumerate(plan, start=1)
+    )
+    return f"""
+    Here is the menu of a 7-day cancer-friendly meal plan for someone with these specifications:
+    {format_preferences(preferences)}
+    - Batch Cooking: {'Yes' if preferences.get('batch_cooking') else 'No'}
+    - Easy Preparation: {'Yes' if preferences.get('easy_prep') else 'No'}
+    - Plan for Leftovers: {'Yes' if preferences.get('leftovers') else 'No'}
     
-    Also generate a comprehensive grocery list organized by:
-    1. Produce (fruits and vegetables)
-    2. Proteins
-    3. Grains and starches
-    4. Pantry items
-    5. Herbs and spices
+    {menu}
     
-    Format the response clearly with section headers and daily breakdowns.
+    Write a short, encouraging introduction (3-4 sentences) about the nutritional benefits
+    of this week, followed by 5 practical preparation tips for these meals.
+    Start with the header "## About Your Week". Do not repeat the menu.
     """
+
+def generate_recipe_meal_plan(preferences, with_notes=True):
+    """
+    Assemble a meal plan from the local recipe database.
+    
+    Args:
+        preferences (dict): Dictionary containing user dietary preferences
+        with_notes (bool): Prepend a short AI-written introduction and tips
     
-    return get_ai_response(client, prompt)
+    Returns:
+        tuple: Meal plan text and aggregated grocery list DataFrame
+    """
+    plan = build_weekly_plan(preferences, days=MEAL_PLAN_DAYS)
+    meal_plan = format_weekly_plan(plan)
+    groceries = aggregate_groceries(plan_ingredients(plan))
+    if not with_notes:
+        return meal_plan, groceries
+
+    client = initialize_groq_client()
+    notes = get_ai_response(client, build_plan_notes_prompt(preferences, plan), max_tokens=NOTES_MAX_TOKENS)
+    # The plan itself doesn't depend on the notes, so fall back to it without them
+    if notes.startswith("Error"):
+        return meal_plan, groceries
+    return f"{notes}\n\n{meal_plan}", groceries
 
 def meal_planner_page():
     # Create consistent navigation
@@ -57,8 +177,8 @@ def meal_planner_page():
     Our AI considers the latest nutritional research for cancer prevention and recovery.
     """)
     
-    # Initialize meal_plan outside the form
-    meal_plan = None
+    # Initialize preferences outside the form
+    preferences = None
     
     # User Preferences Form
     with st.form("meal_preferences_form"):
@@ -85,6 +205,12 @@ def meal_planner_page():
                 value="Medium",
                 help="Select your preferred budget level"
             )
+
+            planning_mode = st.radio(
+                "Planning Mode",
+                PLANNING_MODES,
+                help="Recipe database plans are built instantly from our recipe collection"
+            )
         
         with col2:
             taste_preferences = st.multiselect(
@@ -98,11 +224,16 @@ def meal_planner_page():
             batch_cooking = st.checkbox("Include batch cooking options", value=True)
             easy_prep = st.checkbox("Focus on easy-to-prepare meals", value=True)
             leftovers = st.checkbox("Plan for leftovers", value=True)
+            fresh_plan = st.checkbox(
+                "Create a brand-new plan",
+                value=False,
+                help="By default you may receive a plan already prepared for the same preferences"
+            )
         
         submitted = st.form_submit_button("Generate Meal Plan")
         
         if submitted:
-            preferences = {
+            preferences = canonicalize_preferences({
                 'allergies': allergies,
                 'diet_type': diet_type,
                 'budget': budget,
@@ -110,27 +241,60 @@ def meal_planner_page():
                 'batch_cooking': batch_cooking,
                 'easy_prep': easy_prep,
                 'leftovers': leftovers
-            }
-            
-            with st.spinner("Creating your personalized meal plan..."):
-                meal_plan = generate_meal_plan(preferences)
+            })
     
-    # Move meal plan display and download button outside the form
-    if meal_plan:
-        if "Error" in meal_plan:
+    # Generate outside the form, streaming each day into the expander as it finishes
+    if preferences:
+        with st.expander("📅 Your 7-Day Meal Plan", expanded=True):
+            if planning_mode != "AI-generated":
+                with_notes = planning_mode == "Recipe database with AI notes"
+                with st.spinner("Creating your personalized meal plan..."):
+                    meal_plan, groceries = generate_recipe_meal_plan(preferences, with_notes=with_notes)
+                grocery_list = format_grocery_list(groceries)
+                st.markdown(meal_plan)
+                st.markdown(grocery_list)
+            else:
+                # Request counts drive scripts/warm_meal_plans.py
+                record_request(preferences)
+                meal_plan = None if fresh_plan else get_saved_meal_plan(preferences)
+                if meal_plan:
+                    st.markdown(render_ingredient_lines(meal_plan))
+                else:
+                    # One slot per day, so days appear in order as they finish
+                    sections = [st.empty() for _ in range(MEAL_PLAN_DAYS)]
+                    with st.spinner("Creating your personalized meal plan..."):
+                        meal_plan = generate_meal_plan(
+                            preferences,
+                            on_section=lambda index, text: sections[index].markdown(render_ingredient_lines(text))
+                        )
+                    if not meal_plan.startswith("Error"):
+                        save_meal_plan(preferences, meal_plan)
+                if not meal_plan.startswith("Error"):
+                    groceries = plan_groceries(meal_plan)
+                    grocery_list = format_grocery_list(groceries)
+                    st.markdown(grocery_list)
+                    meal_plan = render_ingredient_lines(meal_plan)
+        
+        if meal_plan.startswith("Error"):
             st.error(meal_plan)
         else:
-            # Display the meal plan in an expandable container
-            with st.expander("📅 Your 7-Day Meal Plan", expanded=True):
-                st.markdown(meal_plan)
-            
-            # Add download button for the meal plan
-            st.download_button(
-                label="Download Meal Plan",
-                data=meal_plan,
-                file_name="cancer_friendly_meal_plan.txt",
-                mime="text/plain"
-            )
+            # Add download buttons for the meal plan and the grocery list
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button(
+                    label="Download Meal Plan",
+                    data=f"{meal_plan}\n\n{grocery_list}",
+                    file_name="cancer_friendly_meal_plan.txt",
+                    mime="text/plain"
+                )
+            with col2:
+                st.download_button(
+                    label="Download Grocery List (CSV)",
+                    data=grocery_csv(groceries),
+                    file_name="grocery_list.csv",
+                    mime="text/csv",
+                    disabled=groceries.empty
+                )
 
     # Nutritional Guidelines Section
     with st.expander("ℹ️ Cancer-Fighting Nutrition Guidelines"):
@@ -1,30 +1,154 @@
 import streamlit as st
-import pandas as pd
+import numpy as np
+import os
+import re
+import json
+import hashlib
+import threading
+import warnings
+from collections import OrderedDict
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
 from utils import initialize_groq_client, get_ai_response, create_sidebar_navigation
+from profiler import timed, timed_block, profiled_fragment
+from follow_up_records import (
+    SYMPTOMS, SYMPTOM_GROUPS, METRIC_LEVELS, new_follow_up_buffer,
+    append_follow_up, follow_up_columns
+)
 
 # Initialize session state variables if they don't exist
 if 'follow_up_data' not in st.session_state:
-    st.session_state.follow_up_data = []
+    st.session_state.follow_up_data = new_follow_up_buffer()
 if 'reminders' not in st.session_state:
     st.session_state.reminders = []
 
-def generate_treatment_plan(patient_data):
+# Strictness levels for reusing cached treatment plans across near-identical profiles.
+# age_bucket is the width of the age bracket in years; free_text controls how the
+# medical history text fields take part in the profile signature.
+PROFILE_MATCH_STRICTNESS = {
+    'exact': {'age_bucket': 1, 'free_text': 'whitespace'},
+    'normal': {'age_bucket': 5, 'free_text': 'normalized'},
+    'loose': {'age_bucket': 10, 'free_text': 'ignored'},
+}
+DEFAULT_TREATMENT_PLAN_CACHE_STRICTNESS = "normal"
+TREATMENT_PLAN_CACHE_STRICTNESS = os.getenv("TREATMENT_PLAN_CACHE_STRICTNESS", DEFAULT_TREATMENT_PLAN_CACHE_STRICTNESS)
+if TREATMENT_PLAN_CACHE_STRICTNESS not in PROFILE_MATCH_STRICTNESS:
+    warnings.warn(
+        f"Unknown TREATMENT_PLAN_CACHE_STRICTNESS '{TREATMENT_PLAN_CACHE_STRICTNESS}', expected one of: "
+        f"{', '.join(PROFILE_MATCH_STRICTNESS)}; using '{DEFAULT_TREATMENT_PLAN_CACHE_STRICTNESS}'"
+    )
+    TREATMENT_PLAN_CACHE_STRICTNESS = DEFAULT_TREATMENT_PLAN_CACHE_STRICTNESS
+TREATMENT_PLAN_CACHE_SIZE = int(os.getenv("TREATMENT_PLAN_CACHE_SIZE", "256"))
+
+LIST_FIELDS = ['current_treatment', 'symptoms']
+HISTORY_LIST_FIELDS = ['comorbidities']
+HISTORY_ITEM_FIELDS = ['allergies', 'current_medications']
+HISTORY_TEXT_FIELDS = ['family_history', 'additional_notes']
+
+def normalize_free_text(text):
+    """Lowercase text and collapse runs of whitespace and trailing punctuation."""
+    if not text:
+        return ''
+    text = re.sub(r'\s+', ' ', str(text).lower()).strip()
+    return text.strip(' .,;')
+
+def normalize_item_list(text):
+    """Normalize a free-text list such as allergies into a sorted list of unique items."""
+    items = (normalize_free_text(item) for item in re.split(r'[,;\n]+', text or ''))
+    return sorted({item for item in items if item and item not in ('none', 'n/a', 'no')})
+
+def normalize_choice_list(values):
+    """Sort a multiselect value and drop the 'None' placeholder when real choices exist."""
+    if isinstance(values, str):
+        values = [values]
+    choices = sorted(set(values or []))
+    if len(choices) > 1 and 'None' in choices:
+        choices.remove('None')
+    return choices
+
+def canonicalize_patient_data(patient_data, strictness=TREATMENT_PLAN_CACHE_STRICTNESS):
     """
-    Generate a personalized treatment plan using the DeepSeek model via Groq API.
+    Reduce patient data to the fields that matter for a treatment plan, in canonical form.
     
     Args:
         patient_data (dict): Dictionary containing patient information
+        strictness (str): One of the PROFILE_MATCH_STRICTNESS levels
     
     Returns:
-        str: Generated treatment plan
+        dict: Canonical profile with sorted lists, normalized text and a bucketed age
     """
-    client = initialize_groq_client()
-    if not client:
-        return "Error: Unable to initialize AI client"
+    level = PROFILE_MATCH_STRICTNESS[strictness]
+    bucket = level['age_bucket']
+    age_low = (int(patient_data['age']) // bucket) * bucket
 
-    prompt = f"""
+    profile = {
+        'age': age_low if bucket == 1 else f"{age_low}-{age_low + bucket - 1}",
+        'gender': patient_data['gender'],
+        'cancer_type': patient_data['cancer_type'],
+        'stage': patient_data['stage'],
+    }
+    for field in LIST_FIELDS:
+        profile[field] = normalize_choice_list(patient_data.get(field))
+
+    history = patient_data.get('medical_history', {})
+    canonical_history = {'smoking_status': history.get('smoking_status')}
+    for field in HISTORY_LIST_FIELDS:
+        canonical_history[field] = normalize_choice_list(history.get(field))
+
+    if level['free_text'] == 'whitespace':
+        for field in HISTORY_ITEM_FIELDS + HISTORY_TEXT_FIELDS:
+            canonical_history[field] = re.sub(r'\s+', ' ', history.get(field) or '').strip()
+    elif level['free_text'] == 'normalized':
+        for field in HISTORY_ITEM_FIELDS:
+            canonical_history[field] = normalize_item_list(history.get(field))
+        for field in HISTORY_TEXT_FIELDS:
+            canonical_history[field] = normalize_free_text(history.get(field))
+    else:
+        # Loose matching still keeps allergies and medications, which change the plan itself
+        for field in HISTORY_ITEM_FIELDS:
+            canonical_history[field] = normalize_item_list(history.get(field))
+
+    profile['medical_history'] = canonical_history
+    return profile
+
+def build_profile_signature(patient_data, strictness=TREATMENT_PLAN_CACHE_STRICTNESS, profile=None):
+    """Return a stable hash of the canonical patient profile (computed unless given)."""
+    if profile is None:
+        profile = canonicalize_patient_data(patient_data, strictness)
+    encoded = json.dumps(profile, sort_keys=True, default=str).encode('utf-8')
+    return f"{strictness}:{hashlib.sha256(encoded).hexdigest()}"
+
+@st.cache_resource
+def get_treatment_plan_cache():
+    """Process-wide LRU cache of treatment plans keyed by profile signature."""
+    return {
+        'plans': OrderedDict(),
+        'hits': 0,
+        'misses': 0,
+        'lock': threading.Lock()
+    }
+
+def get_treatment_plan_cache_stats():
+    """Return hit/miss counters and the hit rate of the treatment plan cache."""
+    cache = get_treatment_plan_cache()
+    with cache['lock']:
+        lookups = cache['hits'] + cache['misses']
+        return {
+            'hits': cache['hits'],
+            'misses': cache['misses'],
+            'hit_rate': cache['hits'] / lookups if lookups else 0.0,
+            'size': len(cache['plans'])
+        }
+
+def build_treatment_plan_prompt(patient_data):
+    """
+    Build the LLM prompt for a personalized treatment plan.
+
+    Cached plans are shared by every profile with the same signature, so
+    generate_treatment_plan passes the canonical profile here: the prompt
+    then holds nothing (exact age, free-text notes) that the key leaves out.
+    """
+    return f"""
     Generate a comprehensive cancer treatment plan for a patient with the following characteristics:
     - Age: {patient_data['age']}
     - Gender: {patient_data['gender']}
@@ -41,8 +165,53 @@ def generate_treatment_plan(patient_data):
     4. Follow-up schedule
     5. Potential side effects and management strategies
     """
+
+@timed
+def generate_treatment_plan(patient_data, strictness=TREATMENT_PLAN_CACHE_STRICTNESS):
+    """
+    Generate a personalized treatment plan using the DeepSeek model via Groq API.
     
-    return get_ai_response(client, prompt)
+    Plans are reused for near-identical profiles (see canonicalize_patient_data)
+    and are generated from the canonical profile alone; pass strictness=None to
+    bypass the cache and prompt with the full patient data.
+    
+    Args:
+        patient_data (dict): Dictionary containing patient information
+        strictness (str): Profile matching level, or None to disable caching
+    
+    Returns:
+        str: Generated treatment plan
+    """
+    cache = get_treatment_plan_cache()
+    signature = None
+    prompt_data = patient_data
+    if strictness:
+        prompt_data = canonicalize_patient_data(patient_data, strictness)
+        signature = build_profile_signature(patient_data, strictness, profile=prompt_data)
+
+    if signature:
+        with cache['lock']:
+            plan = cache['plans'].get(signature)
+            if plan is not None:
+                cache['plans'].move_to_end(signature)
+                cache['hits'] += 1
+                return plan
+            cache['misses'] += 1
+
+    client = initialize_groq_client()
+    if not client:
+        return "Error: Unable to initialize AI client"
+
+    plan = get_ai_response(client, build_treatment_plan_prompt(prompt_data))
+
+    # Never cache failed completions
+    if signature and not plan.startswith("Error"):
+        with cache['lock']:
+            cache['plans'][signature] = plan
+            cache['plans'].move_to_end(signature)
+            while len(cache['plans']) > TREATMENT_PLAN_CACHE_SIZE:
+                cache['plans'].popitem(last=False)
+    return plan
 
 def generate_support_recommendations(patient_data, symptoms):
     """
@@ -78,47 +247,33 @@ def generate_support_recommendations(patient_data, symptoms):
     
     return get_ai_response(client, prompt)
 
+@timed
 def create_symptom_tracker_chart(follow_up_data):
     """
     Create a line chart showing symptom severity over time.
     
     Args:
-        follow_up_data (list): List of follow-up records
+        follow_up_data (dict): Columnar follow-up buffer
     
     Returns:
         plotly.graph_objects.Figure: Line chart of symptom progression
     """
-    if not follow_up_data:
+    if not follow_up_data['size']:
         return None
         
-    df = pd.DataFrame(follow_up_data)
-    df['date'] = pd.to_datetime(df['date'])
-    
+    columns = follow_up_columns(follow_up_data)
     fig = go.Figure()
     
-    # Get all unique symptoms across all records
-    all_symptoms = set()
-    for record in follow_up_data:
-        if 'symptom_levels' in record:
-            all_symptoms.update(record['symptom_levels'].keys())
-    
-    # Create traces for each symptom
-    for symptom in all_symptoms:
-        symptom_values = []
-        dates = []
-        
-        for record in follow_up_data:
-            if 'symptom_levels' in record and symptom in record['symptom_levels']:
-                symptom_values.append(record['symptom_levels'][symptom])
-                dates.append(record['date'])
-        
-        if symptom_values:  # Only add trace if there are values
-            fig.add_trace(go.Scatter(
-                x=dates,
-                y=symptom_values,
-                name=symptom.capitalize(),
-                mode='lines+markers'
-            ))
+    # One trace per symptom that was reported at least once, over the visits it was reported on
+    for symptom_index in np.flatnonzero(columns['symptoms'].any(axis=0)):
+        levels = columns['symptoms'][:, symptom_index]
+        reported = levels > 0
+        fig.add_trace(go.Scatter(
+            x=columns['date'][reported],
+            y=levels[reported],
+            name=SYMPTOMS[symptom_index].capitalize(),
+            mode='lines+markers'
+        ))
     
     fig.update_layout(
         title="Symptom Progression Over Time",
@@ -129,13 +284,13 @@ def create_symptom_tracker_chart(follow_up_data):
     
     return fig
 
+@timed
 def create_vitals_tracker_charts(follow_up_data):
     """Create line charts showing vital signs progression over time."""
-    if not follow_up_data:
+    if not follow_up_data['size']:
         return None
     
-    df = pd.DataFrame(follow_up_data)
-    df['date'] = pd.to_datetime(df['date'])
+    columns = follow_up_columns(follow_up_data)
     
     # Create separate figures for each vital sign
     weight_fig = go.Figure()
@@ -144,8 +299,8 @@ def create_vitals_tracker_charts(follow_up_data):
     
     # Weight progression
     weight_fig.add_trace(go.Scatter(
-        x=df['date'],
-        y=df['weight'],
+        x=columns['date'],
+        y=columns['weight'],
         mode='lines+markers',
         name='Weight'
     ))
@@ -159,8 +314,8 @@ def create_vitals_tracker_charts(follow_up_data):
     
     # Temperature progression
     temp_fig.add_trace(go.Scatter(
-        x=df['date'],
-        y=df['temperature'],
+        x=columns['date'],
+        y=columns['temperature'],
         mode='lines+markers',
         name='Temperature'
     ))
@@ -172,30 +327,19 @@ def create_vitals_tracker_charts(follow_up_data):
         yaxis=dict(range=[35, 42])
     )
     
-    # Blood Pressure progression
-    systolic = []
-    diastolic = []
-    valid_dates = []
-    
-    for idx, row in df.iterrows():
-        try:
-            sys, dia = map(int, row['blood_pressure'].split('/'))
-            systolic.append(sys)
-            diastolic.append(dia)
-            valid_dates.append(row['date'])
-        except (ValueError, AttributeError):
-            continue
+    # Blood Pressure progression, skipping visits without a valid reading
+    valid = columns['systolic'] > 0
     
-    if valid_dates:
+    if valid.any():
         bp_fig.add_trace(go.Scatter(
-            x=valid_dates,
-            y=systolic,
+            x=columns['date'][valid],
+            y=columns['systolic'][valid],
             mode='lines+markers',
             name='Systolic'
         ))
         bp_fig.add_trace(go.Scatter(
-            x=valid_dates,
-            y=diastolic,
+            x=columns['date'][valid],
+            y=columns['diastolic'][valid],
             mode='lines+markers',
             name='Diastolic'
         ))
@@ -209,30 +353,20 @@ def create_vitals_tracker_charts(follow_up_data):
     
     return weight_fig, temp_fig, bp_fig
 
+@timed
 def create_health_metrics_chart(follow_up_data):
     """Create a line chart showing health metrics progression over time."""
-    if not follow_up_data:
+    if not follow_up_data['size']:
         return None
     
-    df = pd.DataFrame(follow_up_data)
-    df['date'] = pd.to_datetime(df['date'])
-    
-    # Convert string values to numeric
-    metric_values = {
-        'energy_level': ["Very Low", "Low", "Moderate", "Good", "Excellent"],
-        'appetite': ["Poor", "Fair", "Normal", "Good", "Excellent"],
-        'mobility': ["Bed-bound", "Limited", "With Assistance", "Independent", "Fully Active"],
-        'sleep_quality': ["Very Poor", "Poor", "Fair", "Good", "Excellent"],
-        'mood': ["Very Low", "Low", "Neutral", "Good", "Excellent"]
-    }
-    
+    columns = follow_up_columns(follow_up_data)
     fig = go.Figure()
     
-    for metric, values in metric_values.items():
-        numeric_values = [values.index(val) for val in df[metric]]
+    # Metrics are stored as ordinal codes into METRIC_LEVELS
+    for metric in METRIC_LEVELS:
         fig.add_trace(go.Scatter(
-            x=df['date'],
-            y=numeric_values,
+            x=columns['date'],
+            y=columns[metric],
             name=metric.replace('_', ' ').title(),
             mode='lines+markers'
         ))
@@ -250,19 +384,208 @@ def create_health_metrics_chart(follow_up_data):
     
     return fig
 
-def parse_blood_pressure(bp_string):
-    """Parse blood pressure string and return systolic and diastolic values."""
-    try:
-        sys, dia = map(int, bp_string.strip().split('/'))
-        if 60 <= sys <= 200 and 40 <= dia <= 130:
-            return sys, dia
-        return None, None
-    except (ValueError, AttributeError):
-        return None, None
+@timed
+def get_monitoring_figures(follow_up_data, version):
+    """
+    Return the monitoring chart figures, rebuilding them only when the follow-up data changes.
+    
+    Args:
+        follow_up_data (dict): Columnar follow-up buffer
+        version (int): Follow-up data version, bumped whenever a record is added
+    
+    Returns:
+        dict: vitals (weight, temperature, blood pressure figures), symptoms and metrics figures
+    """
+    cached = st.session_state.get('monitoring_figures')
+    if cached is None or cached['version'] != version:
+        cached = st.session_state.monitoring_figures = {
+            'version': version,
+            'vitals': create_vitals_tracker_charts(follow_up_data),
+            'symptoms': create_symptom_tracker_chart(follow_up_data),
+            'metrics': create_health_metrics_chart(follow_up_data)
+        }
+    return cached
+
+# The monitoring tab is split into fragments so interacting with one part
+# (e.g. setting a reminder) reruns only that part, not the charts or the
+# treatment form.
+@st.fragment
+@profiled_fragment
+def follow_up_entry_fragment():
+    """Render the follow-up data entry form."""
+    with st.form("follow_up_form"):
+        st.subheader("Record Follow-up Data")
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            date = st.date_input("Follow-up Date", datetime.now())
+            weight = st.number_input("Weight (kg)", min_value=30, max_value=200, value=70)
+            blood_pressure = st.text_input("Blood Pressure (e.g., 120/80)")
+            temperature = st.number_input("Temperature (°C)", min_value=35.0, max_value=42.0, value=37.0)
+
+        # Symptom Severity Section
+        st.markdown("### Symptom Severity")
+        severity_col1, severity_col2, severity_col3 = st.columns(3)
+
+        # All symptoms in three groups
+        symptom_groups = SYMPTOM_GROUPS
+
+        symptom_levels = {}  # Initialize dictionary for symptom levels
+
+        with severity_col1:
+            for symptom in symptom_groups[0]:
+                symptom_levels[symptom] = st.slider(
+                    f"{symptom} Level",
+                    0, 10, 0,
+                    help="0 = None, 10 = Severe",
+                    key=f"slider_{symptom.lower().replace('/', '_')}"
+                )
+
+        with severity_col2:
+            for symptom in symptom_groups[1]:
+                symptom_levels[symptom] = st.slider(
+                    f"{symptom} Level",
+                    0, 10, 0,
+                    help="0 = None, 10 = Severe",
+                    key=f"slider_{symptom.lower().replace('/', '_')}"
+                )
+
+        with severity_col3:
+            for symptom in symptom_groups[2]:
+                symptom_levels[symptom] = st.slider(
+                    f"{symptom} Level",
+                    0, 10, 0,
+                    help="0 = None, 10 = Severe",
+                    key=f"slider_{symptom.lower().replace('/', '_')}"
+                )
+
+        # Additional Health Metrics
+        st.markdown("### Additional Health Metrics")
+        col3, col4 = st.columns(2)
+
+        with col3:
+            energy_level = st.select_slider(
+                "Energy Level",
+                options=["Very Low", "Low", "Moderate", "Good", "Excellent"],
+                value="Moderate"
+            )
+            appetite = st.select_slider(
+                "Appetite",
+                options=["Poor", "Fair", "Normal", "Good", "Excellent"],
+                value="Normal"
+            )
+            mobility = st.select_slider(
+                "Mobility Level",
+                options=["Bed-bound", "Limited", "With Assistance", "Independent", "Fully Active"],
+                value="Independent"
+            )
+
+        with col4:
+            sleep_quality = st.select_slider(
+                "Sleep Quality",
+                options=["Very Poor", "Poor", "Fair", "Good", "Excellent"],
+                value="Fair"
+            )
+            mood = st.select_slider(
+                "Mood",
+                options=["Very Low", "Low", "Neutral", "Good", "Excellent"],
+                value="Neutral"
+            )
+
+        notes = st.text_area("Additional Notes/Observations", height=100)
+
+        submitted = st.form_submit_button("Record Follow-up")
+
+        if submitted:
+            # Filter out symptoms with zero severity
+            active_symptoms = {k: v for k, v in symptom_levels.items() if v > 0}
+
+            follow_up_record = {
+                'date': date,
+                'weight': weight,
+                'blood_pressure': blood_pressure,
+                'temperature': temperature,
+                'symptom_levels': active_symptoms,
+                'energy_level': energy_level,
+                'appetite': appetite,
+                'mobility': mobility,
+                'sleep_quality': sleep_quality,
+                'mood': mood,
+                'notes': notes
+            }
+            append_follow_up(st.session_state.follow_up_data, follow_up_record)
+            st.session_state.follow_up_version += 1
+            st.session_state.follow_up_recorded = True
+            # New data changes the charts, which live in another fragment
+            st.rerun()
+
+    if st.session_state.pop('follow_up_recorded', False):
+        st.success("Follow-up data recorded successfully!")
+
+@st.fragment
+@profiled_fragment
+def monitoring_charts_fragment():
+    """Render the progression charts for the recorded follow-up data."""
+    if st.session_state.follow_up_data['size']:
+        figures = get_monitoring_figures(st.session_state.follow_up_data, st.session_state.follow_up_version)
+
+        # Plotly figure serialization happens inside st.plotly_chart
+        with timed_block("PatientManagement.plotly_chart"):
+            # Vital Signs Charts
+            st.subheader("Vital Signs Progression")
+            weight_fig, temp_fig, bp_fig = figures['vitals']
+        
+            if weight_fig and temp_fig and bp_fig:
+                st.plotly_chart(weight_fig, use_container_width=True)
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.plotly_chart(temp_fig, use_container_width=True)
+                with col2:
+                    st.plotly_chart(bp_fig, use_container_width=True)
+        
+            # Symptom Progression
+            st.subheader("Symptom Progression")
+            if figures['symptoms']:
+                st.plotly_chart(figures['symptoms'])
+        
+            # Health Metrics Progression
+            st.subheader("Health Metrics Progression")
+            if figures['metrics']:
+                st.plotly_chart(figures['metrics'])
+
+@st.fragment
+@profiled_fragment
+def reminders_fragment():
+    """Render the reminder form and the list of upcoming follow-ups."""
+    # Reminder Setup
+    st.subheader("Follow-up Reminders")
+    with st.form("reminder_form"):
+        reminder_date = st.date_input(
+            "Next Follow-up Date",
+            datetime.now() + timedelta(days=30)
+        )
+        reminder_note = st.text_input("Reminder Note")
+
+        if st.form_submit_button("Set Reminder"):
+            st.session_state.reminders.append({
+                'date': reminder_date,
+                'note': reminder_note
+            })
+            st.success("Reminder set successfully!")
+
+    # Display Reminders
+    if st.session_state.reminders:
+        st.markdown("### Upcoming Follow-ups")
+        for reminder in st.session_state.reminders:
+            st.info(f"Date: {reminder['date'].strftime('%Y-%m-%d')} - {reminder['note']}")
 
 def patient_management_page():
     # Create consistent navigation
     create_sidebar_navigation()
+
+    if 'follow_up_version' not in st.session_state:
+        st.session_state.follow_up_version = 0
     
     # Rest of your existing patient management code
     st.title("Patient Management Module")
@@ -367,6 +690,12 @@ def patient_management_page():
                     treatment_plan = generate_treatment_plan(patient_data)
                     st.markdown("### Recommended Treatment Plan")
                     st.write(treatment_plan)
+
+                cache_stats = get_treatment_plan_cache_stats()
+                st.caption(
+                    f"Plan cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                    f"({cache_stats['hit_rate']:.0%} hit rate, {TREATMENT_PLAN_CACHE_STRICTNESS} matching)"
+                )
                     
         # Quick Support Resources (always visible)
         st.markdown("### Quick Support Resources")
@@ -393,162 +722,9 @@ def patient_management_page():
     with tabs[1]:
         st.header("Post-Treatment Monitoring")
         
-        # Follow-up Data Entry
-        with st.form("follow_up_form"):
-            st.subheader("Record Follow-up Data")
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                date = st.date_input("Follow-up Date", datetime.now())
-                weight = st.number_input("Weight (kg)", min_value=30, max_value=200, value=70)
-                blood_pressure = st.text_input("Blood Pressure (e.g., 120/80)")
-                temperature = st.number_input("Temperature (°C)", min_value=35.0, max_value=42.0, value=37.0)
-            
-            # Symptom Severity Section
-            st.markdown("### Symptom Severity")
-            severity_col1, severity_col2, severity_col3 = st.columns(3)
-            
-            # Define all symptoms in three groups
-            symptom_groups = [
-                ["Pain", "Fatigue", "Nausea", "Fever", "Infection", "Bleeding"],
-                ["Breathing Difficulties", "Sleep Issues", "Anxiety/Depression", "Loss of Appetite", "Diarrhea"],
-                ["Constipation", "Skin Changes", "Memory Issues", "Numbness/Tingling", "Other Symptoms"]
-            ]
-            
-            symptom_levels = {}  # Initialize dictionary for symptom levels
-            
-            with severity_col1:
-                for symptom in symptom_groups[0]:
-                    symptom_levels[symptom] = st.slider(
-                        f"{symptom} Level",
-                        0, 10, 0,
-                        help="0 = None, 10 = Severe",
-                        key=f"slider_{symptom.lower().replace('/', '_')}"
-                    )
-
-            with severity_col2:
-                for symptom in symptom_groups[1]:
-                    symptom_levels[symptom] = st.slider(
-                        f"{symptom} Level",
-                        0, 10, 0,
-                        help="0 = None, 10 = Severe",
-                        key=f"slider_{symptom.lower().replace('/', '_')}"
-                    )
-
-            with severity_col3:
-                for symptom in symptom_groups[2]:
-                    symptom_levels[symptom] = st.slider(
-                        f"{symptom} Level",
-                        0, 10, 0,
-                        help="0 = None, 10 = Severe",
-                        key=f"slider_{symptom.lower().replace('/', '_')}"
-                    )
-
-            # Additional Health Metrics
-            st.markdown("### Additional Health Metrics")
-            col3, col4 = st.columns(2)
-            
-            with col3:
-                energy_level = st.select_slider(
-                    "Energy Level",
-                    options=["Very Low", "Low", "Moderate", "Good", "Excellent"],
-                    value="Moderate"
-                )
-                appetite = st.select_slider(
-                    "Appetite",
-                    options=["Poor", "Fair", "Normal", "Good", "Excellent"],
-                    value="Normal"
-                )
-                mobility = st.select_slider(
-                    "Mobility Level",
-                    options=["Bed-bound", "Limited", "With Assistance", "Independent", "Fully Active"],
-                    value="Independent"
-                )
-
-            with col4:
-                sleep_quality = st.select_slider(
-                    "Sleep Quality",
-                    options=["Very Poor", "Poor", "Fair", "Good", "Excellent"],
-                    value="Fair"
-                )
-                mood = st.select_slider(
-                    "Mood",
-                    options=["Very Low", "Low", "Neutral", "Good", "Excellent"],
-                    value="Neutral"
-                )
-                
-            notes = st.text_area("Additional Notes/Observations", height=100)
-            
-            submitted = st.form_submit_button("Record Follow-up")
-            
-            if submitted:
-                # Filter out symptoms with zero severity
-                active_symptoms = {k: v for k, v in symptom_levels.items() if v > 0}
-                
-                follow_up_record = {
-                    'date': date,
-                    'weight': weight,
-                    'blood_pressure': blood_pressure,
-                    'temperature': temperature,
-                    'symptom_levels': active_symptoms,
-                    'energy_level': energy_level,
-                    'appetite': appetite,
-                    'mobility': mobility,
-                    'sleep_quality': sleep_quality,
-                    'mood': mood,
-                    'notes': notes
-                }
-                st.session_state.follow_up_data.append(follow_up_record)
-                st.success("Follow-up data recorded successfully!")
-        
-        # Display Progression Charts
-        if st.session_state.follow_up_data:
-            # Vital Signs Charts
-            st.subheader("Vital Signs Progression")
-            weight_fig, temp_fig, bp_fig = create_vitals_tracker_charts(st.session_state.follow_up_data)
-            
-            if weight_fig and temp_fig and bp_fig:
-                st.plotly_chart(weight_fig, use_container_width=True)
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.plotly_chart(temp_fig, use_container_width=True)
-                with col2:
-                    st.plotly_chart(bp_fig, use_container_width=True)
-            
-            # Symptom Progression
-            st.subheader("Symptom Progression")
-            symptom_fig = create_symptom_tracker_chart(st.session_state.follow_up_data)
-            if symptom_fig:
-                st.plotly_chart(symptom_fig)
-            
-            # Health Metrics Progression
-            st.subheader("Health Metrics Progression")
-            metrics_fig = create_health_metrics_chart(st.session_state.follow_up_data)
-            if metrics_fig:
-                st.plotly_chart(metrics_fig)
-        
-        # Reminder Setup
-        st.subheader("Follow-up Reminders")
-        with st.form("reminder_form"):
-            reminder_date = st.date_input(
-                "Next Follow-up Date",
-                datetime.now() + timedelta(days=30)
-            )
-            reminder_note = st.text_input("Reminder Note")
-            
-            if st.form_submit_button("Set Reminder"):
-                st.session_state.reminders.append({
-                    'date': reminder_date,
-                    'note': reminder_note
-                })
-                st.success("Reminder set successfully!")
-        
-        # Display Reminders
-        if st.session_state.reminders:
-            st.markdown("### Upcoming Follow-ups")
-            for reminder in st.session_state.reminders:
-                st.info(f"Date: {reminder['date'].strftime('%Y-%m-%d')} - {reminder['note']}")
+        follow_up_entry_fragment()
+        monitoring_charts_fragment()
+        reminders_fragment()
     
     # # Support Services Tab
     # with tabs[2]:
@@ -1,8 +1,18 @@
 import streamlit as st
-import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from utils import create_sidebar_navigation, initialize_groq_client, get_ai_response
+from profiler import submit_in_context
+from insight_bank import get_precomputed_insight
+from question_store import DIFFICULTY_LEVELS, seed_question_store, sample_question_ids, get_question, list_tags
+from adaptive_quiz import get_item_bank, select_next_question, load_learner_ability, record_response
+from quiz_analytics import record_answer_event, get_question_stats
 
-# Expanded quiz questions database
+# Bump when the insight prompt changes so the offline insight bank is rebuilt
+INSIGHT_PROMPT_VERSION = "1"
+QUIZ_LENGTH = 5
+
+# Built-in question bank, used to seed the question store on first run
 QUIZ_QUESTIONS = [
     # Original 5 questions...
     {
@@ -14,7 +24,9 @@ QUIZ_QUESTIONS = [
             "PSA test for prostate cancer"
         ],
         "correct": 2,
-        "explanation": "Blood pressure checks are not used for cancer screening. Regular cancer screening tests include mammograms, colonoscopies, PSA tests, and low-dose CT scans for lung cancer in high-risk individuals."
+        "explanation": "Blood pressure checks are not used for cancer screening. Regular cancer screening tests include mammograms, colonoscopies, PSA tests, and low-dose CT scans for lung cancer in high-risk individuals.",
+        "tags": ["screening"],
+        "difficulty": "easy"
     },
     # ... adding 15 more questions for a total of 20
     {
@@ -26,7 +38,9 @@ QUIZ_QUESTIONS = [
             "About 90%"
         ],
         "correct": 3,
-        "explanation": "Approximately 90% of lung cancer cases are linked to smoking, making it the leading cause of preventable cancer deaths."
+        "explanation": "Approximately 90% of lung cancer cases are linked to smoking, making it the leading cause of preventable cancer deaths.",
+        "tags": ["risk factors"],
+        "difficulty": "medium"
     },
     {
         "question": "Which of these foods has been shown to have cancer-fighting properties?",
@@ -37,7 +51,9 @@ QUIZ_QUESTIONS = [
             "White bread"
         ],
         "correct": 2,
-        "explanation": "Turmeric contains curcumin, which has shown anti-inflammatory and potential anti-cancer properties in numerous studies."
+        "explanation": "Turmeric contains curcumin, which has shown anti-inflammatory and potential anti-cancer properties in numerous studies.",
+        "tags": ["nutrition"],
+        "difficulty": "easy"
     },
     {
         "question": "What is the recommended age to begin regular mammogram screenings for women at average risk?",
@@ -48,7 +64,9 @@ QUIZ_QUESTIONS = [
             "60 years old"
         ],
         "correct": 1,
-        "explanation": "The American Cancer Society recommends women at average risk start mammogram screenings at age 40, though some may choose to start between ages 40-44. Women aged 45-54 should get mammograms every year."
+        "explanation": "The American Cancer Society recommends women at average risk start mammogram screenings at age 40, though some may choose to start between ages 40-44. Women aged 45-54 should get mammograms every year.",
+        "tags": ["screening"],
+        "difficulty": "medium"
     },
     {
         "question": "Which of these lifestyle changes can help reduce cancer risk?",
@@ -59,7 +77,9 @@ QUIZ_QUESTIONS = [
             "All of the above"
         ],
         "correct": 3,
-        "explanation": "All these lifestyle changes can help reduce cancer risk. Regular exercise, maintaining a healthy weight, and avoiding tobacco are key preventive measures recommended by health organizations."
+        "explanation": "All these lifestyle changes can help reduce cancer risk. Regular exercise, maintaining a healthy weight, and avoiding tobacco are key preventive measures recommended by health organizations.",
+        "tags": ["prevention"],
+        "difficulty": "easy"
     },
     {
         "question": "What is immunotherapy in cancer treatment?",
@@ -70,7 +90,9 @@ QUIZ_QUESTIONS = [
             "A vitamin supplement regimen"
         ],
         "correct": 1,
-        "explanation": "Immunotherapy is a type of cancer treatment that helps your immune system fight cancer. It works by boosting or changing how your immune system works to better find and destroy cancer cells."
+        "explanation": "Immunotherapy is a type of cancer treatment that helps your immune system fight cancer. It works by boosting or changing how your immune system works to better find and destroy cancer cells.",
+        "tags": ["treatment"],
+        "difficulty": "easy"
     },
     {
         "question": "Which cancer has the highest survival rate when detected early?",
@@ -81,7 +103,9 @@ QUIZ_QUESTIONS = [
             "Liver cancer"
         ],
         "correct": 2,
-        "explanation": "Thyroid cancer generally has one of the highest survival rates when detected early, with a 5-year survival rate of over 98% for localized thyroid cancer."
+        "explanation": "Thyroid cancer generally has one of the highest survival rates when detected early, with a 5-year survival rate of over 98% for localized thyroid cancer.",
+        "tags": ["statistics"],
+        "difficulty": "hard"
     },
     {
         "question": "How often should adults get a colonoscopy screening (average risk)?",
@@ -92,7 +116,9 @@ QUIZ_QUESTIONS = [
             "Every 15 years"
         ],
         "correct": 2,
-        "explanation": "For people at average risk, colonoscopy screening is recommended every 10 years starting at age 45. Those with higher risk factors may need more frequent screenings."
+        "explanation": "For people at average risk, colonoscopy screening is recommended every 10 years starting at age 45. Those with higher risk factors may need more frequent screenings.",
+        "tags": ["screening"],
+        "difficulty": "medium"
     },
     {
         "question": "Which of these is a warning sign of skin cancer?",
@@ -103,7 +129,9 @@ QUIZ_QUESTIONS = [
             "Freckles"
         ],
         "correct": 0,
-        "explanation": "Changes in moles, including size, color, or shape, are important warning signs of skin cancer. The ABCDE rule (Asymmetry, Border, Color, Diameter, Evolving) helps identify suspicious moles."
+        "explanation": "Changes in moles, including size, color, or shape, are important warning signs of skin cancer. The ABCDE rule (Asymmetry, Border, Color, Diameter, Evolving) helps identify suspicious moles.",
+        "tags": ["warning signs"],
+        "difficulty": "easy"
     },
     {
         "question": "What percentage of cancers are estimated to be preventable through lifestyle changes?",
@@ -114,7 +142,9 @@ QUIZ_QUESTIONS = [
             "About 50%"
         ],
         "correct": 3,
-        "explanation": "According to the World Health Organization, about 50% of all cancers are preventable through lifestyle changes such as healthy diet, regular exercise, avoiding tobacco, and limiting alcohol consumption."
+        "explanation": "According to the World Health Organization, about 50% of all cancers are preventable through lifestyle changes such as healthy diet, regular exercise, avoiding tobacco, and limiting alcohol consumption.",
+        "tags": ["prevention", "statistics"],
+        "difficulty": "hard"
     },
     {
         "question": "Which vitamin is important for reducing cancer risk and is primarily obtained through sun exposure?",
@@ -125,7 +155,9 @@ QUIZ_QUESTIONS = [
             "Vitamin D"
         ],
         "correct": 3,
-        "explanation": "Vitamin D, primarily obtained through sun exposure, has been linked to reduced risk of several cancers. Many people need supplements to maintain adequate levels, especially in less sunny climates."
+        "explanation": "Vitamin D, primarily obtained through sun exposure, has been linked to reduced risk of several cancers. Many people need supplements to maintain adequate levels, especially in less sunny climates.",
+        "tags": ["nutrition", "prevention"],
+        "difficulty": "medium"
     },
     {
         "question": "What is metastasis in cancer?",
@@ -136,7 +168,9 @@ QUIZ_QUESTIONS = [
             "Cancer treatment method"
         ],
         "correct": 2,
-        "explanation": "Metastasis occurs when cancer cells spread from their original location to other parts of the body through the bloodstream or lymphatic system, forming secondary tumors."
+        "explanation": "Metastasis occurs when cancer cells spread from their original location to other parts of the body through the bloodstream or lymphatic system, forming secondary tumors.",
+        "tags": ["biology"],
+        "difficulty": "easy"
     },
     {
         "question": "Which of these foods is associated with increased cancer risk?",
@@ -147,21 +181,26 @@ QUIZ_QUESTIONS = [
             "Fish"
         ],
         "correct": 0,
-        "explanation": "Processed meats (like bacon, hot dogs, and deli meats) have been classified as Group 1 carcinogens by the World Health Organization, meaning there is strong evidence they can cause cancer."
+        "explanation": "Processed meats (like bacon, hot dogs, and deli meats) have been classified as Group 1 carcinogens by the World Health Organization, meaning there is strong evidence they can cause cancer.",
+        "tags": ["nutrition", "risk factors"],
+        "difficulty": "easy"
     }
 ]
 
-def get_random_questions(n=5):
-    """Get n random questions from the question bank."""
-    return random.sample(QUIZ_QUESTIONS, n)
+@st.cache_resource
+def get_question_store():
+    """Make sure the question store exists and holds the built-in questions (once per process)."""
+    seed_question_store(QUIZ_QUESTIONS)
+    return True
 
-def get_educational_insight(topic):
-    """Get additional educational insight about a cancer-related topic using Groq API."""
-    client = initialize_groq_client()
-    if not client:
-        return "Unable to fetch additional information."
+def get_random_questions(n=QUIZ_LENGTH, tag=None, difficulty=None):
+    """Get the ids of n random questions from the question store, optionally filtered."""
+    get_question_store()
+    return sample_question_ids(n, tag=tag, difficulty=difficulty)
 
-    prompt = f"""
+def build_insight_prompt(topic):
+    """Build the LLM prompt for an educational insight about a topic."""
+    return f"""
     Provide a brief, educational insight about {topic} in cancer awareness.
     Focus on:
     1. Recent research or statistics
@@ -169,8 +208,61 @@ def get_educational_insight(topic):
     3. Common misconceptions
     Keep the response concise and encouraging.
     """
+
+def get_educational_insight(topic):
+    """Get additional educational insight about a cancer-related topic using Groq API."""
+    client = initialize_groq_client()
+    if not client:
+        return "Unable to fetch additional information."
+
+    return get_ai_response(client, build_insight_prompt(topic))
+
+def select_adaptive_question(ability, asked_ids):
+    """Pick the most informative unanswered question for the learner's current ability."""
+    get_question_store()
+    return select_next_question(get_item_bank(), ability['theta'], asked_ids)
+
+def get_question_topic(question):
+    """Derive the insight topic from a quiz question."""
+    return question["question"].split("?")[0]
+
+@st.cache_resource
+def get_insight_executor():
+    """Process-wide thread pool used to prefetch educational insights."""
+    return ThreadPoolExecutor(max_workers=8, thread_name_prefix="quiz-insight")
+
+def prefetch_educational_insights(questions):
+    """
+    Start fetching the educational insight for every quiz question in the background.
+    
+    Args:
+        questions (list): Quiz questions selected for this session
     
-    return get_ai_response(client, prompt)
+    Returns:
+        dict: Futures keyed by question text
+    """
+    executor = get_insight_executor()
+    return {
+        question["question"]: submit_in_context(executor, get_educational_insight, get_question_topic(question))
+        for question in questions
+        if get_precomputed_insight(question["question"], INSIGHT_PROMPT_VERSION) is None
+    }
+
+def resolve_educational_insight(question):
+    """Return the precomputed or prefetched insight for a question, falling back to a live request."""
+    insight = get_precomputed_insight(question["question"], INSIGHT_PROMPT_VERSION)
+    if insight is not None:
+        return insight
+
+    future = (st.session_state.get('insight_futures') or {}).get(question["question"])
+    if future is not None:
+        try:
+            insight = future.result()
+            if not insight.startswith("Error"):
+                return insight
+        except Exception:
+            pass
+    return get_educational_insight(get_question_topic(question))
 
 def cancer_quiz_page():
     # Create consistent navigation
@@ -191,6 +283,16 @@ def cancer_quiz_page():
         st.session_state.quiz_questions = None
     if 'answer_submitted' not in st.session_state:
         st.session_state.answer_submitted = False
+    if 'insight_futures' not in st.session_state:
+        st.session_state.insight_futures = {}
+    if 'quiz_length' not in st.session_state:
+        st.session_state.quiz_length = QUIZ_LENGTH
+    if 'adaptive_quiz' not in st.session_state:
+        st.session_state.adaptive_quiz = False
+    if 'quiz_ability' not in st.session_state:
+        st.session_state.quiz_ability = None
+    if 'question_shown_at' not in st.session_state:
+        st.session_state.question_shown_at = None
 
     # Quiz introduction
     if not st.session_state.quiz_started:
@@ -205,29 +307,74 @@ def cancer_quiz_page():
         - Immediate feedback and explanations
         - Educational insights after each question
         """)
+
+        get_question_store()
+        adaptive = st.toggle(
+            "Adaptive mode",
+            help="Each question is chosen to match your estimated ability, based on your previous answers"
+        )
+        learner_id = ""
+        if adaptive:
+            learner_id = st.text_input(
+                "Learner ID (optional)",
+                help="Enter the same ID next time to continue from your current ability estimate"
+            ).strip()
+
+        col1, col2 = st.columns(2)
+        with col1:
+            topic = st.selectbox("Topic", ["All topics"] + list_tags(), disabled=adaptive)
+        with col2:
+            difficulty = st.selectbox("Difficulty", ["Any"] + DIFFICULTY_LEVELS, disabled=adaptive)
         
         if st.button("Start Quiz"):
-            st.session_state.quiz_started = True
-            st.session_state.current_question = 0
-            st.session_state.score = 0
-            st.session_state.answers = []
-            st.session_state.quiz_questions = get_random_questions()
-            st.session_state.answer_submitted = False
-            st.rerun()
+            if adaptive:
+                theta, responses = load_learner_ability(learner_id) if learner_id else (0.0, 0)
+                ability = {'learner_id': learner_id or None, 'theta': theta, 'responses': responses}
+                first_question = select_adaptive_question(ability, [])
+                question_ids = [first_question] if first_question is not None else []
+            else:
+                ability = None
+                question_ids = get_random_questions(
+                    tag=None if topic == "All topics" else topic,
+                    difficulty=None if difficulty == "Any" else difficulty
+                )
+            if not question_ids:
+                st.warning("No questions match these filters yet. Try another topic or difficulty.")
+            else:
+                st.session_state.quiz_started = True
+                st.session_state.current_question = 0
+                # Otherwise the first answer would be timed from the previous quiz's first question
+                st.session_state.question_shown_at = None
+                st.session_state.score = 0
+                st.session_state.answers = []
+                st.session_state.quiz_questions = question_ids
+                st.session_state.quiz_length = QUIZ_LENGTH if adaptive else len(question_ids)
+                st.session_state.adaptive_quiz = adaptive
+                st.session_state.quiz_ability = ability
+                st.session_state.insight_futures = prefetch_educational_insights(
+                    [get_question(question_id) for question_id in question_ids]
+                )
+                st.session_state.answer_submitted = False
+                st.rerun()
     
     # Quiz in progress
-    elif st.session_state.current_question < len(st.session_state.quiz_questions):
+    elif st.session_state.current_question < st.session_state.quiz_length:
         # Progress bar
-        progress = (st.session_state.current_question / len(st.session_state.quiz_questions))
+        progress = (st.session_state.current_question / st.session_state.quiz_length)
         st.progress(progress)
         
         # Score display
-        st.markdown(f"**Score: {st.session_state.score}/{len(st.session_state.quiz_questions)}**")
+        st.markdown(f"**Score: {st.session_state.score}/{st.session_state.quiz_length}**")
         
         # Display current question
-        question = st.session_state.quiz_questions[st.session_state.current_question]
+        question = get_question(st.session_state.quiz_questions[st.session_state.current_question])
         st.markdown(f"### Question {st.session_state.current_question + 1}")
         st.markdown(question["question"])
+
+        # Remember when this question was first shown, for time-to-answer analytics
+        shown_at = st.session_state.question_shown_at
+        if not shown_at or shown_at[0] != st.session_state.current_question:
+            st.session_state.question_shown_at = (st.session_state.current_question, time.time())
         
         # Answer selection
         answer = st.radio("Select your answer:", 
@@ -265,16 +412,43 @@ def cancer_quiz_page():
             
             # Store answer
             st.session_state.answers.append({
+                "question_id": question["id"],
                 "question": question["question"],
                 "selected": answer,
                 "correct": question["options"][question["correct"]],
                 "is_correct": is_correct
             })
+            ability = st.session_state.quiz_ability
+            record_answer_event(
+                question["id"],
+                len(question["options"]),
+                selected_index,
+                is_correct,
+                seconds=time.time() - st.session_state.question_shown_at[1],
+                learner_id=ability['learner_id'] if ability else None
+            )
+
+            # In adaptive mode, update the ability estimate and queue the next question now
+            # so its insight can be prefetched while this one is being read
+            if st.session_state.adaptive_quiz:
+                st.session_state.quiz_ability = record_response(
+                    get_item_bank(), st.session_state.quiz_ability, question["id"], is_correct
+                )
+                if len(st.session_state.quiz_questions) < st.session_state.quiz_length:
+                    next_question = select_adaptive_question(
+                        st.session_state.quiz_ability, st.session_state.quiz_questions
+                    )
+                    if next_question is None:
+                        st.session_state.quiz_length = len(st.session_state.quiz_questions)
+                    else:
+                        st.session_state.quiz_questions.append(next_question)
+                        st.session_state.insight_futures.update(
+                            prefetch_educational_insights([get_question(next_question)])
+                        )
             
             # Get and display additional educational insights
             with st.expander("🔍 Learn More", expanded=True):
-                topic = question["question"].split("?")[0]  # Use question topic for insights
-                insight = get_educational_insight(topic)
+                insight = resolve_educational_insight(question)  # Prefetched when the quiz started
                 st.markdown(insight)
         
         # Handle next click
@@ -285,7 +459,10 @@ def cancer_quiz_page():
 
     # Quiz completed
     else:
-        st.success(f"🎉 Quiz Completed! Final Score: {st.session_state.score}/{len(st.session_state.quiz_questions)}")
+        st.success(f"🎉 Quiz Completed! Final Score: {st.session_state.score}/{st.session_state.quiz_length}")
+        if st.session_state.adaptive_quiz and st.session_state.quiz_ability:
+            st.metric("Estimated Ability", f"{st.session_state.quiz_ability['theta']:+.2f}",
+                      help="0 is an average learner; higher means you can handle harder questions")
         
         # Performance summary
         st.markdown("### Your Performance Summary")
@@ -298,11 +475,26 @@ def cancer_quiz_page():
                     st.success("✅ Correct")
                 else:
                     st.error("❌ Incorrect")
+
+                # How everyone else has answered this question so far
+                stats = get_question_stats(answer['question_id'])
+                if stats:
+                    question = get_question(answer['question_id'])
+                    col1, col2 = st.columns(2)
+                    col1.metric("Answered Correctly (All Users)", f"{stats['correct_rate']:.0%}",
+                                help=f"Based on {stats['attempts']} answers")
+                    if stats['mean_seconds'] is not None:
+                        col2.metric("Average Time to Answer", f"{stats['mean_seconds']:.0f}s")
+                    st.bar_chart(
+                        {"Share of answers": dict(zip(question["options"], stats['option_distribution']))},
+                        horizontal=True
+                    )
         
         # Restart quiz button
         if st.button("Take Another Quiz"):
             st.session_state.quiz_started = False
             st.session_state.quiz_questions = None
+            st.session_state.insight_futures = {}
             st.rerun()
 
 if __name__ == "__main__":
@@ -0,0 +1,293 @@
+import os
+import threading
+from io import BytesIO
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image
+from image_client import IMAGE_MODEL_INPUT_SIZE, IMAGE_JPEG_QUALITY
+from image_backends import run_prediction
+from profiler import submit_in_context
+
+# Tiled analysis of large whole-slide images. Slides are read region by
+# region (with OpenSlide, or tifffile for memory-mapped and tiled TIFFs; see
+# requirements-optional.txt), background tiles are skipped using a tissue
+# mask computed on a low-resolution thumbnail, and tissue tiles are
+# classified concurrently with a bounded number in flight, so peak memory
+# stays at a few tiles plus the thumbnail.
+SLIDE_TILE_SIZE = int(os.getenv("SLIDE_TILE_SIZE", "512"))
+SLIDE_WORKERS = int(os.getenv("SLIDE_WORKERS", "4"))
+SLIDE_THUMBNAIL_MAX = 1024
+SLIDE_MIN_TISSUE_FRACTION = 0.25
+SLIDE_TOP_FRACTION = 0.1
+SLIDE_POSITIVE_LABEL = os.getenv("SLIDE_POSITIVE_LABEL", "malignant")
+SLIDE_EXTENSIONS = ["svs", "ndpi", "mrxs", "scn", "tif", "tiff", "png", "jpg", "jpeg"]
+# Images the region-wise readers can't handle are decoded whole, but only up to this size
+SLIDE_MAX_DECODED_PIXELS = int(os.getenv("SLIDE_MAX_DECODED_PIXELS", str(64 * 1024 * 1024)))
+
+# A pixel counts as tissue when it is coloured (stained) and not near-white
+TISSUE_MIN_SATURATION = 20
+TISSUE_MAX_BRIGHTNESS = 220
+
+def open_array_slide(pixels, name):
+    """Wrap an (optionally memory-mapped) HxWx3 array in the slide reader interface."""
+    def read_region(x, y, width, height):
+        return np.ascontiguousarray(pixels[y:y + height, x:x + width, :3])
+
+    def thumbnail(max_size):
+        step = max(1, -(-max(pixels.shape[:2]) // max_size))
+        return np.ascontiguousarray(pixels[::step, ::step, :3])
+
+    return {'format': name, 'size': (pixels.shape[1], pixels.shape[0]),
+            'read_region': read_region, 'thumbnail': thumbnail, 'close': lambda: None}
+
+def open_tiled_tiff(tiff):
+    """
+    Wrap a tiled RGB TIFF in the slide reader interface, decoding only the tiles a read touches.
+
+    The thumbnail is built from the smallest pyramid level that is at least
+    the requested size, again one tile at a time.
+
+    Args:
+        tiff (tifffile.TiffFile): The open TIFF file
+
+    Returns:
+        dict: Slide reader, or None if the base level is not a tiled, interleaved RGB image
+    """
+    levels = [level.keyframe for level in tiff.series[0].levels]
+    base = levels[0]
+    if not base.is_tiled or len(base.shape) != 3 or base.shape[2] < 3 or base.planarconfig != 1:
+        return None
+    lock = threading.Lock()
+
+    def read_tile(page, index):
+        # Tiles are read from the shared file handle (one thread at a time) and decoded in parallel
+        if not page.databytecounts[index]:
+            return np.zeros((page.tilelength, page.tilewidth, 3), dtype=np.uint8)
+        with lock:
+            tiff.filehandle.seek(page.dataoffsets[index])
+            data = tiff.filehandle.read(page.databytecounts[index])
+        tile = page.decode(data, index, jpegtables=page.jpegtables)[0]
+        return tile.reshape(page.tilelength, page.tilewidth, -1)[:, :, :3]
+
+    def read_page_region(page, x, y, width, height, step=1):
+        # Region of a tiled page, keeping every step-th pixel of it
+        pixels = np.zeros((-(-height // step), -(-width // step), 3), dtype=np.uint8)
+        tiles_across = -(-page.shape[1] // page.tilewidth)
+        for row in range(y // page.tilelength, (y + height - 1) // page.tilelength + 1):
+            for col in range(x // page.tilewidth, (x + width - 1) // page.tilewidth + 1):
+                tile_y, tile_x = row * page.tilelength, col * page.tilewidth
+                top = max(y, tile_y) + (y - max(y, tile_y)) % step
+                left = max(x, tile_x) + (x - max(x, tile_x)) % step
+                bottom = min(y + height, tile_y + page.tilelength)
+                right = min(x + width, tile_x + page.tilewidth)
+                if top >= bottom or left >= right:
+                    continue
+                tile = read_tile(page, row * tiles_across + col)
+                pixels[(top - y) // step:(bottom - y + step - 1) // step,
+                       (left - x) // step:(right - x + step - 1) // step] = \
+                    tile[top - tile_y:bottom - tile_y:step, left - tile_x:right - tile_x:step]
+        return pixels
+
+    def read_region(x, y, width, height):
+        return read_page_region(base, x, y, width, height)
+
+    def thumbnail(max_size):
+        candidates = [page for page in levels if page.is_tiled and max(page.shape[:2]) >= max_size] or [base]
+        page = min(candidates, key=lambda page: page.shape[0] * page.shape[1])
+        height, width = page.shape[:2]
+        return read_page_region(page, 0, 0, width, height, step=max(1, -(-max(height, width) // max_size)))
+
+    return {'format': 'tiff-tiled', 'size': (base.shape[1], base.shape[0]),
+            'read_region': read_region, 'thumbnail': thumbnail, 'close': tiff.close}
+
+def open_slide(path):
+    """
+    Open a slide for region-wise reading.
+
+    OpenSlide is used for whole-slide formats when installed. With tifffile
+    installed, uncompressed TIFFs are memory-mapped and tiled TIFFs (most
+    compressed pyramidal slides) are decoded tile by tile. Any other image
+    is decoded once with Pillow, which holds it whole in memory, so it is
+    rejected above SLIDE_MAX_DECODED_PIXELS.
+
+    Args:
+        path (str): Location of the slide
+
+    Returns:
+        dict: format, size (width, height), read_region(x, y, width, height)
+            and thumbnail(max_size) returning RGB uint8 arrays, and close()
+    """
+    try:
+        import openslide
+        slide = openslide.OpenSlide(path)
+    except Exception:
+        slide = None
+    if slide is not None:
+        def read_region(x, y, width, height):
+            return np.asarray(slide.read_region((x, y), 0, (width, height)).convert("RGB"))
+
+        def thumbnail(max_size):
+            return np.asarray(slide.get_thumbnail((max_size, max_size)).convert("RGB"))
+
+        return {'format': 'openslide', 'size': slide.dimensions,
+                'read_region': read_region, 'thumbnail': thumbnail, 'close': slide.close}
+
+    try:
+        import tifffile
+        tiff = tifffile.TiffFile(path)
+    except Exception:
+        tiff = None
+    if tiff is not None:
+        try:
+            pixels = tifffile.memmap(path, mode='r')
+        except Exception:
+            pixels = None
+        if pixels is not None and pixels.ndim == 3 and pixels.shape[2] >= 3:
+            tiff.close()
+            return open_array_slide(pixels, 'tiff-memmap')
+        reader = open_tiled_tiff(tiff)
+        if reader is not None:
+            return reader
+        tiff.close()
+
+    too_large = (f"The slide is larger than {SLIDE_MAX_DECODED_PIXELS} pixels and can't be read region by region; "
+                 "save it as a tiled TIFF and install tifffile, or install openslide-python "
+                 "(see requirements-optional.txt)")
+    try:
+        image = Image.open(path)
+    except Image.DecompressionBombError:
+        raise ValueError(too_large)
+    with image:
+        if image.width * image.height > SLIDE_MAX_DECODED_PIXELS:
+            raise ValueError(too_large)
+        return open_array_slide(np.asarray(image.convert("RGB")), 'decoded')
+
+def tissue_mask(pixels):
+    """Return a boolean mask of tissue pixels in an RGB array."""
+    channels = pixels.astype(np.int16)
+    saturation = channels.max(axis=2) - channels.min(axis=2)
+    return (saturation >= TISSUE_MIN_SATURATION) & (channels.mean(axis=2) <= TISSUE_MAX_BRIGHTNESS)
+
+def tissue_tiles(slide, tile_size=SLIDE_TILE_SIZE, min_fraction=SLIDE_MIN_TISSUE_FRACTION):
+    """
+    Find the tiles of a slide that contain enough tissue, using the thumbnail.
+
+    Returns:
+        tuple: (thumbnail array, grid shape (rows, cols), list of (row, col) tissue tiles)
+    """
+    width, height = slide['size']
+    rows, cols = -(-height // tile_size), -(-width // tile_size)
+    thumbnail = slide['thumbnail'](SLIDE_THUMBNAIL_MAX)
+    mask = tissue_mask(thumbnail)
+
+    # Tissue fraction per tile: average the thumbnail mask over each tile's footprint
+    row_index = np.minimum(np.arange(mask.shape[0]) * height // mask.shape[0] // tile_size, rows - 1)
+    col_index = np.minimum(np.arange(mask.shape[1]) * width // mask.shape[1] // tile_size, cols - 1)
+    flat_index = (row_index[:, np.newaxis] * cols + col_index[np.newaxis, :]).ravel()
+    tissue = np.bincount(flat_index, weights=mask.ravel(), minlength=rows * cols)
+    pixels = np.bincount(flat_index, minlength=rows * cols)
+    fraction = np.divide(tissue, pixels, out=np.zeros(rows * cols), where=pixels > 0)
+
+    selected = np.flatnonzero(fraction >= min_fraction)
+    return thumbnail, (rows, cols), [(int(index // cols), int(index % cols)) for index in selected]
+
+def encode_tile(pixels, input_size=IMAGE_MODEL_INPUT_SIZE, quality=IMAGE_JPEG_QUALITY):
+    """Downscale a tile to the model resolution and encode it as JPEG."""
+    image = Image.fromarray(pixels)
+    if min(image.size) > input_size:
+        scale = input_size / min(image.size)
+        image = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                             Image.Resampling.BILINEAR)
+    output = BytesIO()
+    image.save(output, format="JPEG", quality=quality)
+    return output.getvalue()
+
+def tile_score(result, positive_label=SLIDE_POSITIVE_LABEL):
+    """Return the positive-class probability from a backend result dict."""
+    probability = result.get(f"{positive_label}_probability")
+    if probability is not None:
+        return float(probability)
+    label = str(result.get('prediction', result.get('label', ''))).lower()
+    confidence = float(result.get('confidence', 1.0))
+    return confidence if positive_label in label else 1.0 - confidence
+
+def analyze_slide(path, tile_size=SLIDE_TILE_SIZE, max_workers=SLIDE_WORKERS, on_progress=None):
+    """
+    Classify the tissue tiles of a slide and aggregate them into a slide-level result.
+
+    Tiles are read and classified by a thread pool with at most
+    2 * max_workers tiles in flight.
+
+    Args:
+        path (str): Location of the slide
+        tile_size (int): Tile edge length in slide pixels
+        max_workers (int): Concurrent tile predictions
+        on_progress (callable): Called with (tiles done, tissue tiles) on the calling thread
+
+    Returns:
+        dict: slide_score (mean of the top SLIDE_TOP_FRACTION tile scores),
+            positive_fraction, tile counts, failed tiles, the heatmap grid
+            (NaN for background) and the thumbnail
+    """
+    slide = open_slide(path)
+    try:
+        thumbnail, grid, tiles = tissue_tiles(slide, tile_size)
+        width, height = slide['size']
+        heatmap = np.full(grid, np.nan)
+        failed = 0
+
+        def classify_tile(row, col):
+            x, y = col * tile_size, row * tile_size
+            pixels = slide['read_region'](x, y, min(tile_size, width - x), min(tile_size, height - y))
+            result, _ = run_prediction(encode_tile(pixels))
+            return tile_score(result)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            remaining = iter(tiles)
+            done = 0
+            while True:
+                while len(pending) < 2 * max_workers:
+                    tile = next(remaining, None)
+                    if tile is None:
+                        break
+                    pending.append((tile, submit_in_context(executor, classify_tile, *tile)))
+                if not pending:
+                    break
+                (row, col), future = pending.popleft()
+                try:
+                    heatmap[row, col] = future.result()
+                except Exception:
+                    failed += 1
+                done += 1
+                if on_progress:
+                    on_progress(done, len(tiles))
+    finally:
+        slide['close']()
+
+    scores = np.sort(heatmap[~np.isnan(heatmap)])[::-1]
+    top = scores[:max(1, int(np.ceil(len(scores) * SLIDE_TOP_FRACTION)))]
+    return {
+        'slide_score': float(top.mean()) if len(scores) else None,
+        'positive_fraction': float((scores >= 0.5).mean()) if len(scores) else None,
+        'tiles_total': grid[0] * grid[1],
+        'tiles_tissue': len(tiles),
+        'tiles_failed': failed,
+        'heatmap': heatmap,
+        'thumbnail': thumbnail
+    }
+
+def heatmap_overlay(thumbnail, heatmap, alpha=0.45):
+    """Blend the tile score heatmap (blue = low, red = high) over the slide thumbnail."""
+    scores = np.nan_to_num(heatmap, nan=0.0)
+    colors = np.stack([scores * 255, np.zeros_like(scores), (1 - scores) * 255], axis=2).astype(np.uint8)
+    weights = np.where(np.isnan(heatmap), 0.0, alpha)[:, :, np.newaxis]
+    size = (thumbnail.shape[1], thumbnail.shape[0])
+    colors = np.asarray(Image.fromarray(colors).resize(size, Image.Resampling.NEAREST), dtype=np.float32)
+    weights = np.asarray(
+        Image.fromarray((weights[:, :, 0] * 255).astype(np.uint8)).resize(size, Image.Resampling.NEAREST),
+        dtype=np.float32
+    )[:, :, np.newaxis] / 255
+    blended = thumbnail.astype(np.float32) * (1 - weights) + colors * weights
+    return Image.fromarray(blended.astype(np.uint8))
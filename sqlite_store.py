@@ -0,0 +1,36 @@
+import os
+import sqlite3
+import threading
+
+# Streamlit runs every rerun on a new thread, so each SQLite store gets one
+# connection shared across threads. Stores serialize their own statements
+# through a module lock; this lock only guards opening connections.
+_connections = {}
+_lock = threading.RLock()
+
+def get_connection(path, schema, migrate=None):
+    """
+    Return the shared connection to the SQLite store at path, opening it on first use.
+
+    A new connection is switched to WAL mode and the store's schema is created
+    if needed before it is handed out.
+
+    Args:
+        path (str): Location of the database file
+        schema (str): SQL script creating the store's tables and indexes
+        migrate (callable): Optional function upgrading an existing database,
+            called once with the new connection after the schema is applied
+
+    Returns:
+        sqlite3.Connection: The connection shared by all threads
+    """
+    with _lock:
+        if path not in _connections:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            connection = sqlite3.connect(path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(schema)
+            if migrate:
+                migrate(connection)
+            _connections[path] = connection
+        return _connections[path]
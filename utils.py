@@ -2,10 +2,12 @@ import os
 from dotenv import load_dotenv
 from groq import Groq
 import streamlit as st
+from profiler import timed
 
 # Load environment variables
 load_dotenv()
 
+@timed
 def initialize_groq_client():
     """Initialize and return Groq client."""
     api_key = os.getenv("GROQ_API_KEY")
@@ -13,24 +15,31 @@ def initialize_groq_client():
         raise ValueError("GROQ_API_KEY not found in environment variables")
     return Groq(api_key=api_key)
 
-def get_ai_response(client, prompt, model="deepseek-r1-distill-llama-70b"):
-    """Get response from DeepSeek AI via Groq."""
+@timed
+def get_chat_response(client, messages, model="deepseek-r1-distill-llama-70b", max_tokens=3500):
+    """Get response from DeepSeek AI via Groq for a list of chat messages."""
     try:
         chat_completion = client.chat.completions.create(
-            messages=[{"role": "user", "content": prompt}],
+            messages=messages,
             model=model,
             temperature=0.7,
-            max_tokens=3500
+            max_tokens=max_tokens
         )
         return chat_completion.choices[0].message.content
     except Exception as e:
         return f"Error getting AI response: {str(e)}"
 
+@timed
+def get_ai_response(client, prompt, model="deepseek-r1-distill-llama-70b", max_tokens=3500):
+    """Get response from DeepSeek AI via Groq."""
+    return get_chat_response(client, [{"role": "user", "content": prompt}], model=model, max_tokens=max_tokens)
+
 def validate_patient_data(data):
     """Validate patient data inputs."""
     required_fields = ['name', 'age', 'cancer_type']
     return all(field in data and data[field] for field in required_fields)
 
+@timed
 def generate_treatment_plan(patient_data):
     """Generate a treatment plan based on patient data."""
     prompt = f"""
@@ -43,6 +52,7 @@ def generate_treatment_plan(patient_data):
     client = initialize_groq_client()
     return get_ai_response(client, prompt)
 
+@timed
 def create_sidebar_navigation():
     """Create consistent sidebar navigation across all pages."""
     import streamlit as st